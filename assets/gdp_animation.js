@@ -0,0 +1,27 @@
+/* assets/gdp_animation.js */
+
+/*
+ * Clientside callbacks for the animated GDP map on the home page.
+ * The values of every year are shipped once in the "gdp-frames" store and the
+ * browser cycles through them, so the interval never calls the server.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    gdp: {
+        cycle_year: function (n_intervals, frames, figure) {
+            if (!frames || !figure || !frames.years.length) {
+                return window.dash_clientside.no_update;
+            }
+
+            var index = (n_intervals || 0) % frames.years.length;
+            var trace = Object.assign({}, figure.data[0], { z: frames.z[index] });
+            var title = Object.assign({}, figure.layout.title, {
+                text: "USA GDP in " + frames.years[index],
+            });
+
+            return Object.assign({}, figure, {
+                data: [trace].concat(figure.data.slice(1)),
+                layout: Object.assign({}, figure.layout, { title: title }),
+            });
+        },
+    },
+});
@@ -0,0 +1,101 @@
+/* assets/market_overview.js */
+
+/*
+ * Clientside callbacks for the market overview.
+ * The series are computed once on the server (utils/market_overview.py) and
+ * shipped, downsampled, in the "indices-data" store; the four graphs are drawn
+ * from it in the browser. The trace
+ * order must match overview_traces / comparison_traces, which the zoom
+ * callbacks in pages/market_analysis.py use to patch the visible window.
+ */
+(function () {
+    function line(series, name, xaxis, yaxis) {
+        return {
+            x: series.x, y: series.y, name: name, mode: "lines", type: "scatter",
+            xaxis: xaxis, yaxis: yaxis,
+        };
+    }
+
+    function subplotTitle(text, x, y) {
+        return {
+            text: text, x: x, y: y, xref: "paper", yref: "paper",
+            xanchor: "center", yanchor: "bottom", showarrow: false, font: { size: 16 },
+        };
+    }
+
+    function message(text) {
+        return {
+            data: [],
+            layout: {
+                xaxis: { visible: false },
+                yaxis: { visible: false },
+                annotations: [{ text: text, showarrow: false, xref: "paper", yref: "paper", x: 0.5, y: 0.5 }],
+            },
+        };
+    }
+
+    var grid = { showgrid: true, gridcolor: "lightgrey", zerolinecolor: "lightgrey" };
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        market: {
+            overview: function (data) {
+                if (!data || !Object.keys(data.close).length) {
+                    return message("Failed to load stock data. Please try again later.");
+                }
+                var traces = Object.keys(data.close).map(function (symbol) {
+                    return line(data.close[symbol], symbol);
+                });
+                return {
+                    data: traces,
+                    layout: {
+                        title: { text: "Performance of Major Stock Indices" },
+                        xaxis: { title: { text: "date" } },
+                        yaxis: { title: { text: "close" } },
+                        legend: { title: { text: "Index" } },
+                    },
+                };
+            },
+
+            comparison: function (data, symbol, title) {
+                if (!data || !data.rolling_corr || !data.rolling_corr[symbol]) {
+                    return message("No data available for " + symbol + ".");
+                }
+                var benchmark = data.benchmark;
+                return {
+                    data: [
+                        line(data.rolling_corr[symbol], "50-Day Rolling Correlation", "x", "y"),
+                        line(data.price_ratio[symbol], "Price Ratio", "x2", "y2"),
+                        line(data.volatility[benchmark], "IBOV Volatility", "x3", "y3"),
+                        line(data.volatility[symbol], "Index Volatility", "x3", "y3"),
+                        line(data.cumulative_returns[benchmark], "IBOV Cumulative Returns", "x4", "y4"),
+                        line(data.cumulative_returns[symbol], "Index Cumulative Returns", "x4", "y4"),
+                    ],
+                    layout: {
+                        height: 800,
+                        width: 1000,
+                        title: { text: title },
+                        paper_bgcolor: "white",
+                        plot_bgcolor: "white",
+                        font: { color: "black" },
+                        legend: { bgcolor: "white", bordercolor: "lightgrey" },
+                        // Same 2x2 grid as make_subplots(horizontal_spacing=0.1, vertical_spacing=0.2)
+                        xaxis: Object.assign({ domain: [0, 0.45], anchor: "y" }, grid),
+                        yaxis: Object.assign({ domain: [0.6, 1], anchor: "x" }, grid),
+                        xaxis2: Object.assign({ domain: [0.55, 1], anchor: "y2" }, grid),
+                        yaxis2: Object.assign({ domain: [0.6, 1], anchor: "x2" }, grid),
+                        xaxis3: Object.assign({ domain: [0, 0.45], anchor: "y3" }, grid),
+                        yaxis3: Object.assign({ domain: [0, 0.4], anchor: "x3" }, grid),
+                        xaxis4: Object.assign({ domain: [0.55, 1], anchor: "y4" }, grid),
+                        yaxis4: Object.assign({ domain: [0, 0.4], anchor: "x4" }, grid),
+                        annotations: [
+                            subplotTitle("50-Day Rolling Correlation", 0.225, 1),
+                            subplotTitle("Price Ratio", 0.775, 1),
+                            subplotTitle("Volatility", 0.225, 0.4),
+                            subplotTitle("Cumulative Returns", 0.775, 0.4),
+                        ],
+                    },
+                };
+            },
+        },
+    });
+})();
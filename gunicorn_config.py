@@ -13,3 +13,22 @@ bind = f'{APP_HOST}:{APP_PORT}'
 workers = 2
 threads = 4
 timeout = 120
+
+# Import the app (and load the local datasets) once in the master before forking
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Move the preloaded objects out of the garbage collector's reach so the
+    # workers do not touch (and copy) their memory pages
+    import gc
+
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Threads do not survive the fork, start the background warm-up per worker
+    from utils.data_service import data_service
+    from utils.settings import WARM_UP_DATASETS
+
+    data_service.warm_up(WARM_UP_DATASETS)
@@ -4,8 +4,15 @@ from dash import Dash, html, dcc
 from flask import Flask
 import dash_bootstrap_components as dbc
 
-from utils.settings import APP_HOST, APP_PORT, APP_DEBUG, DEV_TOOLS_PROPS_CHECK
+from utils.settings import (
+    APP_HOST,
+    APP_PORT,
+    APP_DEBUG,
+    DEV_TOOLS_PROPS_CHECK,
+    WARM_UP_DATASETS,
+)
 from components import navbar, footer
+from utils.data_service import data_service
 
 # Create Dash app
 server = Flask(__name__)
@@ -44,7 +51,13 @@ def serve_layout():
 app.layout = serve_layout  # set the layout to the serve_layout function
 server = app.server  # the server is needed to deploy the application
 
+# Load the local datasets registered by the pages. Under gunicorn (preload_app)
+# this runs once in the master so the workers share them copy-on-write; the
+# network-backed datasets are warmed up in each worker, see gunicorn_config.py
+data_service.preload()
+
 if __name__ == "__main__":
+    data_service.warm_up(WARM_UP_DATASETS)
     app.run_server(
         host=APP_HOST,
         port=APP_PORT,
@@ -1,13 +1,21 @@
 import dash
 from dash import html, dcc, callback, Input, Output, State
-import requests
 import json
 import dash_bootstrap_components as dbc
 from dotenv import load_dotenv
 import os
 import random
 
-from utils.settings import FMP_API_KEY, APP_PORT
+from utils.data_service import data_service
+from utils.fmp import get_company_profile, get_shared_company_profiles, get_sp500_constituents
+from utils.settings import (
+    FMP_API_KEY,
+    APP_PORT,
+    HOME_DATA_TIMEOUT,
+    FMP_PREFETCH_PROFILES,
+    FMP_PROFILE_REFRESH_INTERVAL,
+    FMP_PROFILE_SNAPSHOT,
+)
 
 # Load environment variables from .env file
 load_dotenv("../.env")
@@ -23,18 +31,13 @@ dash.register_page(__name__, path="/company-analysis", title="Company Analysis")
 
 # Function to fetch top 20 companies from S&P 500 constituents
 def fetch_top_companies():
-    url = f"https://financialmodelingprep.com/api/v3/sp500_constituent?apikey={FMP_API_KEY}"
-    response = requests.get(url)
-    data = response.json()
-    
     # Return the first 20 companies from the S&P 500
-    return data[:20]  # Assuming the API returns a list of dictionaries
+    return get_sp500_constituents()[:20]
 
 # Function to fetch detailed company information
 def fetch_company_info(symbol):
-    url = f"https://financialmodelingprep.com/api/v3/profile/{symbol}?apikey={FMP_API_KEY}"  # Use the loaded API key
-    response = requests.get(url)
-    return response.json()[0]  # Return the first company info
+    # Profiles are cached by utils.fmp, so repeat views do not hit the API
+    return get_company_profile(symbol)
 
 # Function to generate a random gradient color
 def random_gradient():
@@ -42,68 +45,111 @@ def random_gradient():
     color2 = "#{:06x}".format(random.randint(0, 0xFFFFFF))
     return f"linear-gradient(135deg, {color1}, {color2})"
 
-# Fetch the top companies' data
-top_companies = fetch_top_companies()  # Fetch detailed info for each symbol
+# The constituents are fetched in the background instead of at import time
+data_service.register("top_companies", fetch_top_companies)
+
+
+def get_top_companies(timeout=None):
+    """
+    Return the companies shown on the page, or an empty list if they are not loaded yet.
+
+    :param timeout: Maximum number of seconds to wait for the upstream API
+    :return: List of company dictionaries
+    """
+    return data_service.get("top_companies", timeout=timeout, default=[])
+
+
+def prefetch_company_profiles():
+    """
+    Fetch the profiles of every displayed company in bulk, filling the profile cache.
+
+    Every worker runs this on the same schedule; the snapshot is reused for half
+    the refresh interval, so only the first worker of each round calls the API.
+    """
+    symbols = [company["symbol"] for company in get_top_companies()]
+    if not symbols:
+        # Fail so the data service retries, instead of caching (and sharing) no profiles
+        raise RuntimeError("The companies to prefetch are not loaded yet")
+    return get_shared_company_profiles(
+        symbols, FMP_PROFILE_SNAPSHOT, max_age=FMP_PROFILE_REFRESH_INTERVAL / 2
+    )
+
+
+# Profiles are fetched at startup and refreshed on a schedule, so opening a
+# company's details is served from the cache instead of the network
+if FMP_PREFETCH_PROFILES:
+    data_service.register(
+        "company_profiles",
+        prefetch_company_profiles,
+        refresh_interval=FMP_PROFILE_REFRESH_INTERVAL,
+    )
+
 
 # Layout for the company analysis page
-layout = html.Div(
-    className="company-analysis-container",
-    children=[
-        html.H1("S&P 500 Constituents", className="title"),
-        dcc.Loading(  # Add loading component
-            id="loading",
-            type="default",  # You can change this to "circle", "dot", or "default"
-            children=[
-                html.Div(
-                    className="company-cards",
-                    children=[
-                        dbc.Card(
-                            [
-                                dbc.CardBody(
-                                    [
-                                        html.Div(
-                                            style={
-                                                "height": "150px",  # Set a fixed height for the gradient area
-                                                "background": random_gradient(),  # Set random gradient background
-                                                "borderRadius": "10px",  # Rounded corners
-                                            },
-                                        ),
-                                        html.H4(company["symbol"], className="card-title"),  # Use symbol for the title
-                                        html.P(f"Price: ${company.get('price', 'N/A')}", className="card-text"),  # Use get to avoid KeyError
-                                        dbc.Button(
-                                            "View Details",
-                                            id={
-                                                "type": "detail-button",
-                                                "index": company["symbol"],
-                                            },
-                                            color="primary",
-                                        ),
-                                    ]
-                                ),
-                            ],
-                            style={"width": "18rem", "margin": "10px"},
-                        )
-                        for company in top_companies
-                    ],
-                    style={"display": "flex", "flexWrap": "wrap", "justifyContent": "center"},
-                ),
-                html.Div(id="company-details", style={"marginTop": "20px"}),
-            ],
-        ),
-        # Modal for displaying company details
-        dbc.Modal(
-            [
-                dbc.ModalHeader(id="modal-header"),
-                dbc.ModalBody(id="modal-body"),
-                dbc.ModalFooter(
-                    dbc.Button("Close", id="close", className="ml-auto")
-                ),
-            ],
-            id="modal",
-            size="lg",
-        ),
-    ],
-)
+def layout(**kwargs):
+    """Build the company analysis page from the shared list of companies."""
+    top_companies = get_top_companies(timeout=HOME_DATA_TIMEOUT)
+
+    return html.Div(
+        className="company-analysis-container",
+        children=[
+            html.H1("S&P 500 Constituents", className="title"),
+            dcc.Loading(  # Add loading component
+                id="loading",
+                type="default",  # You can change this to "circle", "dot", or "default"
+                children=[
+                    html.Div(
+                        className="company-cards",
+                        children=[
+                            dbc.Card(
+                                [
+                                    dbc.CardBody(
+                                        [
+                                            html.Div(
+                                                style={
+                                                    "height": "150px",  # Set a fixed height for the gradient area
+                                                    "background": random_gradient(),  # Set random gradient background
+                                                    "borderRadius": "10px",  # Rounded corners
+                                                },
+                                            ),
+                                            html.H4(company["symbol"], className="card-title"),  # Use symbol for the title
+                                            html.P(f"Price: ${company.get('price', 'N/A')}", className="card-text"),  # Use get to avoid KeyError
+                                            dbc.Button(
+                                                "View Details",
+                                                id={
+                                                    "type": "detail-button",
+                                                    "index": company["symbol"],
+                                                },
+                                                color="primary",
+                                            ),
+                                        ]
+                                    ),
+                                ],
+                                style={"width": "18rem", "margin": "10px"},
+                            )
+                            for company in top_companies
+                        ]
+                        # The upstream API has not answered yet
+                        or [html.P("Company data is still loading, refresh the page in a moment.")],
+                        style={"display": "flex", "flexWrap": "wrap", "justifyContent": "center"},
+                    ),
+                    html.Div(id="company-details", style={"marginTop": "20px"}),
+                ],
+            ),
+            # Modal for displaying company details
+            dbc.Modal(
+                [
+                    dbc.ModalHeader(id="modal-header"),
+                    dbc.ModalBody(id="modal-body"),
+                    dbc.ModalFooter(
+                        dbc.Button("Close", id="close", className="ml-auto")
+                    ),
+                ],
+                id="modal",
+                size="lg",
+            ),
+        ],
+    )
 
 # Callback to update company details when a card is clicked
 @callback(
@@ -126,6 +172,9 @@ def display_company_details(n_clicks, close_click, is_open):
                 return False, "", ""
 
             index = filtered_clicks.index(max(filtered_clicks))  # Get the first button that was clicked
+            top_companies = get_top_companies(timeout=HOME_DATA_TIMEOUT)
+            if index >= len(top_companies):  # The companies are not loaded (anymore)
+                return False, "", ""
             symbol = top_companies[index]["symbol"]  # Get the corresponding symbol
             company_info = fetch_company_info(symbol)  # Fetch detailed info
 
@@ -0,0 +1,161 @@
+import dash
+from dash import (
+    html,
+    dcc,
+    callback,
+    clientside_callback,
+    ClientsideFunction,
+    Input,
+    Output,
+    Patch,
+    no_update,
+)
+
+from utils.data_loader import load_main_indices_stock_data
+from utils.data_service import data_service
+from utils.graphs import relayout_range
+from utils.market_overview import (
+    build_market_overview,
+    comparison_traces,
+    market_overview_view,
+    overview_traces,
+    series_window,
+)
+from utils.settings import HOME_DATA_TIMEOUT, MARKET_OVERVIEW_REFRESH_INTERVAL
+
+dash.register_page(__name__, path="/market-analysis", title="Market Analysis")
+
+# Graph id -> (index compared to the IBOVESPA, title)
+MARKET_COMPARISONS = {
+    "grid1-bvsp-vs-gspc": ("^GSPC", "Grid 1: S&P 500 vs IBOVESPA"),
+    "grid2-bvsp-vs-ixic": ("^IXIC", "Grid 2: NASDAQ vs IBOVESPA"),
+    "grid3-bvsp-vs-dji": ("^DJI", "Grid 3: Dow Jones vs IBOVESPA"),
+}
+
+# The indices are loaded and the derived series computed once per refresh interval
+data_service.register(
+    "market_overview",
+    lambda: build_market_overview(load_main_indices_stock_data()),
+    refresh_interval=MARKET_OVERVIEW_REFRESH_INTERVAL,
+)
+
+
+def refine_market_graph(payload, relayout_data, traces):
+    """
+    Patch the lines of a market graph with the window visible after a zoom.
+
+    :param payload: Full-resolution payload from build_market_overview
+    :param relayout_data: relayoutData of the graph
+    :param traces: (series, symbol, x axis) of each trace, see utils.market_overview
+    :return: Patch of the figure, or no_update if no x axis changed
+    """
+    patch = Patch()
+    changed = False
+    for k, (series, symbol, axis) in enumerate(traces):
+        window = relayout_range(relayout_data, axis)
+        if window is None:
+            continue
+        line = series_window(payload, series, symbol, *window)
+        patch["data"][k]["x"] = line["x"]
+        patch["data"][k]["y"] = line["y"]
+        changed = True
+    return patch if changed else no_update
+
+
+def layout(**kwargs):
+    """Build the market analysis page, the graphs are drawn in the browser."""
+    return html.Div(
+        [
+            # Store component to hold the indices data
+            dcc.Store(id="indices-data"),
+            html.H1("Brazilian Stock Market Analysis"),
+            html.H2("Market Overview"),
+            dcc.Loading(dcc.Graph(id="market-overview-graph")),
+            html.Div(
+                [
+                    # Arrange the grids in a 3x1 layout
+                    html.Div(
+                        dcc.Graph(id=graph_id),
+                        style={
+                            "flex": "1",
+                            "padding": "5px",
+                            "border": "1px solid #444",
+                        },
+                    )
+                    for graph_id in MARKET_COMPARISONS
+                ],
+                style={
+                    "display": "flex",
+                    "flexDirection": "column",
+                    "alignItems": "center",
+                    "justifyContent": "center",
+                    "width": "100%",
+                    "marginTop": "30px",
+                },
+            ),
+        ],
+        style={
+            "width": "80%",
+            "margin": "auto",
+        },
+    )
+
+
+# Ship the shared market overview to the browser once per page load. The
+# indices are fetched once per refresh interval by the data service, not
+# once per viewer
+@callback(
+    Output("indices-data", "data"),
+    Input("market-overview-graph", "id"),
+)
+def load_indices_data(_):
+    payload = data_service.get("market_overview", timeout=HOME_DATA_TIMEOUT)
+    return market_overview_view(payload) if payload else None
+
+
+# The four graphs are drawn in the browser from the store, see assets/market_overview.js
+clientside_callback(
+    ClientsideFunction("market", "overview"),
+    Output("market-overview-graph", "figure"),
+    Input("indices-data", "data"),
+)
+for graph_id, (symbol, title) in MARKET_COMPARISONS.items():
+    clientside_callback(
+        f"""
+        function (data) {{
+            return window.dash_clientside.market.comparison(data, "{symbol}", "{title}");
+        }}
+        """,
+        Output(graph_id, "figure"),
+        Input("indices-data", "data"),
+    )
+
+
+# Zooming asks the server for the visible window only, at full resolution
+# when it holds fewer points than DOWNSAMPLE_MAX_POINTS
+@callback(
+    Output("market-overview-graph", "figure", allow_duplicate=True),
+    Input("market-overview-graph", "relayoutData"),
+    prevent_initial_call=True,
+)
+def refine_market_overview(relayout_data):
+    payload = data_service.get("market_overview", timeout=HOME_DATA_TIMEOUT)
+    if not payload:
+        return no_update
+    return refine_market_graph(payload, relayout_data, overview_traces(payload))
+
+
+for graph_id, (symbol, _) in MARKET_COMPARISONS.items():
+
+    @callback(
+        Output(graph_id, "figure", allow_duplicate=True),
+        Input(graph_id, "relayoutData"),
+        prevent_initial_call=True,
+    )
+    def refine_market_comparison(relayout_data, symbol=symbol):
+        payload = data_service.get("market_overview", timeout=HOME_DATA_TIMEOUT)
+        if not payload or symbol not in payload.get("rolling_corr", {}):
+            return no_update
+        return refine_market_graph(
+            payload, relayout_data, comparison_traces(payload, symbol)
+        )
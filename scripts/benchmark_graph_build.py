@@ -0,0 +1,77 @@
+import argparse
+import math
+import time
+
+import pandas as pd
+
+from preprocessing import DATASETS_ROOT, build_company_graph, build_company_graph_iterrows
+from utils.datasets import load_dataset
+
+
+def scale_mna(mna, factor):
+    """
+    Enlarge the M&A dataset by repeating it with renamed companies.
+
+    :param mna: M&A rows from mna_with_symbols.csv
+    :param factor: Number of copies
+    :return: DataFrame with factor times as many rows
+    """
+    copies = []
+    for i in range(factor):
+        copy = mna.copy()
+        if i:
+            copy["Parent"] = copy["Parent"] + f" #{i}"
+            copy["Child"] = copy["Child"] + f" #{i}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def _same_value(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def same_graph(G, H):
+    """Check that two graphs have the same nodes, edges and node attributes, in the same order."""
+    if list(G.nodes()) != list(H.nodes()) or list(G.edges()) != list(H.edges()):
+        return False
+    for node in G.nodes():
+        a, b = G.nodes[node], H.nodes[node]
+        if a.keys() != b.keys() or not all(_same_value(a[k], b[k]) for k in a):
+            return False
+    return True
+
+
+def best_time(builder, mna, us_market_data, repeat):
+    """Return the best wall time of repeat runs of a graph builder, and the last graph built."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        G = builder(mna, us_market_data)
+        timings.append(time.perf_counter() - start)
+    return min(timings), G
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the row-by-row and bulk company graph builders."
+    )
+    parser.add_argument("--scale", type=int, default=1, help="Copies of the M&A rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per builder")
+    args = parser.parse_args()
+
+    mna = scale_mna(load_dataset("mna_with_symbols", root=DATASETS_ROOT), args.scale)
+    us_market_data = load_dataset("us_market_data", root=DATASETS_ROOT)
+
+    loop_time, loop_graph = best_time(
+        build_company_graph_iterrows, mna, us_market_data, args.repeat
+    )
+    bulk_time, bulk_graph = best_time(
+        build_company_graph, mna, us_market_data, args.repeat
+    )
+
+    print(f"Rows: {len(mna)}, nodes: {len(bulk_graph)}, edges: {bulk_graph.number_of_edges()}")
+    print(f"iterrows: {loop_time:.3f}s")
+    print(f"bulk:     {bulk_time:.3f}s ({loop_time / bulk_time:.1f}x faster)")
+    print(f"Identical graphs: {same_graph(loop_graph, bulk_graph)}")
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+# Local ollama model used by the enrichment scripts
+DEFAULT_MODEL = "llama3.1:latest"
+DEFAULT_BASE_URL = "http://localhost:11434/v1/"
+DEFAULT_API_KEY = "ollama"
+DEFAULT_CACHE_PATH = "../datasets/.enrichment_cache.sqlite"
+
+BATCH_INSTRUCTIONS = """\
+You will receive several items, one per line. Reply with a single JSON object
+mapping each ticker to its answer, for example {"AAPL": "..."}, and nothing else.
+"""
+
+
+class EnrichmentCache:
+    """
+    On-disk cache of model answers keyed by (ticker, prompt hash, model).
+
+    Answers are written as soon as a batch completes, so an interrupted run
+    resumes where it stopped.
+
+    :param path: Path of the SQLite database
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "ticker TEXT, prompt_hash TEXT, model TEXT, answer TEXT, "
+            "PRIMARY KEY (ticker, prompt_hash, model))"
+        )
+        self._connection.commit()
+
+    def get(self, ticker, prompt_hash, model):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT answer FROM answers WHERE ticker = ? AND prompt_hash = ? AND model = ?",
+                (ticker, prompt_hash, model),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_many(self, rows):
+        """Store (ticker, prompt_hash, model, answer) rows."""
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)", rows
+            )
+            self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+
+def prompt_hash(system_prompt, item):
+    """Hash the prompt sent for one item, so edited prompts or inputs are asked again."""
+    return hashlib.sha256(f"{system_prompt}\n{item}".encode("utf-8")).hexdigest()[:16]
+
+
+def parse_answers(content):
+    """
+    Parse the JSON object of a batch reply, ignoring any text around it.
+
+    :return: Dictionary mapping tickers to answers (empty if the reply is not valid JSON)
+    """
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end < start:
+        return {}
+    try:
+        answers = json.loads(content[start : end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(answers, dict):
+        return {}
+    return {str(ticker): str(answer).strip() for ticker, answer in answers.items()}
+
+
+def run_enrichment(
+    items,
+    system_prompt,
+    model=DEFAULT_MODEL,
+    base_url=DEFAULT_BASE_URL,
+    api_key=DEFAULT_API_KEY,
+    batch_size=25,
+    max_concurrency=4,
+    cache_path=DEFAULT_CACHE_PATH,
+):
+    """
+    Ask an OpenAI-compatible model one question per ticker, in batches.
+
+    Cached answers are reused, the remaining tickers are sent batch_size at a
+    time with at most max_concurrency requests in flight, and tickers missing
+    from a batch reply are asked again on their own.
+
+    :param items: Dictionary mapping each ticker to the text describing it in the prompt
+    :param system_prompt: Instructions of the task
+    :param model: Model name
+    :param base_url: URL of the OpenAI-compatible API (e.g. ollama)
+    :param api_key: API key of that server
+    :param batch_size: Number of tickers per request
+    :param max_concurrency: Maximum number of requests in flight
+    :param cache_path: Path of the answer cache
+    :return: Dictionary mapping tickers to answers (tickers without an answer are left out)
+    """
+    client = OpenAI(base_url=base_url, api_key=api_key)
+    cache = EnrichmentCache(cache_path)
+    hashes = {ticker: prompt_hash(system_prompt, item) for ticker, item in items.items()}
+
+    answers = {}
+    for ticker in items:
+        cached = cache.get(ticker, hashes[ticker], model)
+        if cached is not None:
+            answers[ticker] = cached
+
+    def ask(tickers):
+        response = client.chat.completions.create(
+            model=model,
+            temperature=0,
+            messages=[
+                {"role": "system", "content": system_prompt + BATCH_INSTRUCTIONS},
+                {
+                    "role": "user",
+                    "content": "# Data processing task\n"
+                    + "\n".join(items[ticker] for ticker in tickers),
+                },
+            ],
+        )
+        reply = parse_answers(response.choices[0].message.content or "")
+        found = {ticker: reply[ticker] for ticker in tickers if ticker in reply}
+        cache.set_many(
+            [(ticker, hashes[ticker], model, answer) for ticker, answer in found.items()]
+        )
+        return found
+
+    def process_batch(tickers):
+        try:
+            found = ask(tickers)
+        except Exception as e:
+            logger.warning(f"Batch starting at {tickers[0]} failed: {e}")
+            found = {}
+        # Ask again, one by one, for the tickers the model skipped
+        if len(tickers) > 1:
+            for ticker in tickers:
+                if ticker not in found:
+                    try:
+                        found.update(ask([ticker]))
+                    except Exception as e:
+                        logger.warning(f"{ticker} failed: {e}")
+        return found
+
+    missing = [ticker for ticker in items if ticker not in answers]
+    logger.info(f"{len(items) - len(missing)} answers cached, asking the model for {len(missing)}")
+    batches = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            for i, found in enumerate(executor.map(process_batch, batches), start=1):
+                answers.update(found)
+                logger.info(f"Processed batch {i}/{len(batches)}")
+    finally:
+        cache.close()
+
+    unanswered = len(items) - len(answers)
+    if unanswered:
+        logger.warning(f"{unanswered} tickers have no answer, run the script again to retry them")
+    return answers
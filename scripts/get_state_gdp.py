@@ -1,3 +1,5 @@
+import argparse
+import json
 import requests
 import zipfile
 import os
@@ -6,60 +8,195 @@ import pandas as pd
 # Step 1: Download the ZIP file
 url = "https://apps.bea.gov/regional/zip/SAGDP.zip"
 zip_file_path = "SAGDP.zip"
+extract_dir = "../datasets/SAGDP_data"
+output_path = "../datasets/combined_summary_2000_2023.csv"
+manifest_path = "../datasets/SAGDP_manifest.json"
 
-response = requests.get(url)
-with open(zip_file_path, 'wb') as file:
-    file.write(response.content)
+# List of valid state abbreviations
+valid_states = {'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
+                'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
+                'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
+                'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
+                'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'}
 
-# Step 2: Unzip the file
-with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-    zip_ref.extractall("../datasets/SAGDP_data")
+years = [str(year) for year in range(2000, 2024)]
+info_columns = ['GeoFIPS', 'GeoName', 'Unit']
 
-# Step 3: Summarize data from each CSV file
-summary_data = []
 
-# List of valid state abbreviations
-valid_states = {'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 
-                'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD', 
-                'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 
-                'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 
-                'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'}
+def state_of(filename):
+    """Return the state of a SAGDP2N state file name (e.g. SAGDP2N_AL_1997_2023.csv), or None."""
+    if not filename.endswith(".csv"):
+        return None
+    # Split the filename and check if the second part is a valid state
+    filename_split = filename.split('_')
+    if len(filename_split) < 2:
+        return None
+    type, state = filename_split[0], filename_split[1]
+    if state in valid_states and type == "SAGDP2N":
+        return state
+    return None
+
+
+def summarize(df, state):
+    """
+    Summarize the LineCode 1 rows of a state file (e.g. sum or mean).
+
+    :param df: Rows of the state file, already filtered on LineCode 1
+    :param state: State acronym
+    :return: Dictionary with one value per year plus the state information
+    """
+    # Filter for years 2000 to 2023
+    summary = {
+        year: pd.to_numeric(df[year], errors="coerce").sum(min_count=1) for year in years
+    }
+    summary = {year: (None if pd.isna(value) else float(value)) for year, value in summary.items()}
+
+    # Add the state information to the summary (as plain Python values for the manifest)
+    summary['GeoFIPS'] = df['GeoFIPS'].tolist()[0]  # Add GeoFIPS
+    summary['GeoName'] = df['GeoName'].tolist()[0]  # Add GeoName
+    summary['Unit'] = df['Unit'].tolist()[0]  # Add Unit
+    summary['State'] = state  # Add State Acronym
+    return summary
+
 
-# Loop through each CSV file in the extracted folder
-for filename in os.listdir("../datasets/SAGDP_data"):
-    if filename.endswith(".csv"):
-        # Split the filename and check if the last part is a valid state
-        filename_split = filename.split('_')
-        type = filename_split[0]
-        state = filename_split[1]
-        print(type)
-        if state in valid_states and type == "SAGDP2N":  # Check if the last part is a valid state abbreviation
-            file_path = os.path.join("../datasets/SAGDP_data", filename)
-            
+def build_extract():
+    """Download the archive into memory, extract every file and summarize the state files."""
+    response = requests.get(url)
+    with open(zip_file_path, 'wb') as file:
+        file.write(response.content)
+
+    # Step 2: Unzip the file
+    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+        zip_ref.extractall(extract_dir)
+
+    # Step 3: Summarize data from each CSV file
+    summary_data = []
+
+    # Loop through each CSV file in the extracted folder
+    for filename in os.listdir(extract_dir):
+        state = state_of(filename)
+        if state:
             # Read the CSV file
-            df = pd.read_csv(file_path)
-            
+            df = pd.read_csv(os.path.join(extract_dir, filename))
+
             # Filter for rows where LineCode is 1
-            df = df[df['LineCode'] == 1.0]  # Add this line to filter
-            print(df.head())
-            
-            # Filter for years 2000 to 2023
-            df_filtered = df.loc[:, ['GeoFIPS', 'GeoName', 'Unit'] + [str(year) for year in range(2000, 2024)]]
-            
-            # Summarize the data (e.g., sum or mean)
-            summary = df_filtered.sum(numeric_only=True)
-            
-            # Add the state information to the summary
-            summary['GeoFIPS'] = df_filtered['GeoFIPS'].iloc[0]  # Add GeoFIPS
-            summary['GeoName'] = df_filtered['GeoName'].iloc[0]  # Add GeoName
-            summary['Unit'] = df_filtered['Unit'].iloc[0]  # Add Unit
-            summary['State'] = state  # Add State Acronym
+            df = df[df['LineCode'] == 1.0]
+            summary_data.append(summarize(df, state))
+
+    return summary_data
+
+
+def download_archive(manifest):
+    """
+    Stream the archive to disk, skipping the download if the server reports it unchanged.
+
+    :param manifest: Manifest of the previous run, updated with the new ETag / Last-Modified
+    """
+    headers = {}
+    if os.path.exists(zip_file_path):
+        if manifest.get("etag"):
+            headers["If-None-Match"] = manifest["etag"]
+        if manifest.get("last_modified"):
+            headers["If-Modified-Since"] = manifest["last_modified"]
+
+    with requests.get(url, headers=headers, stream=True, timeout=60) as response:
+        if response.status_code == 304:
+            print("Archive unchanged since the last run.")
+            return
+        response.raise_for_status()
+
+        tmp_path = f"{zip_file_path}.tmp"
+        with open(tmp_path, 'wb') as file:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                file.write(chunk)
+        os.replace(tmp_path, zip_file_path)
+
+        manifest["etag"] = response.headers.get("ETag")
+        manifest["last_modified"] = response.headers.get("Last-Modified")
+
+
+def read_member(archive, info, chunksize=10_000):
+    """
+    Read the LineCode 1 rows of a state file straight from the archive.
+
+    Only the needed columns are parsed and rows are filtered chunk by chunk,
+    so the file is never extracted nor fully loaded.
+    """
+    wanted = set(info_columns + years + ['LineCode'])
+    with archive.open(info) as member:
+        chunks = pd.read_csv(member, usecols=lambda column: column in wanted, chunksize=chunksize)
+        rows = [chunk[chunk['LineCode'] == 1.0] for chunk in chunks]
+    if not rows:
+        return pd.DataFrame()
+    return pd.concat(rows, ignore_index=True)
+
+
+def build_stream():
+    """
+    Summarize the state files streamed out of the archive.
+
+    Members are identified by the CRC-32 and size stored in the archive; the
+    summary of a member whose content is unchanged since the last run is
+    reused from the manifest instead of being read again.
+    """
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    members = manifest.get("members", {})
+
+    download_archive(manifest)
+
+    summary_data = []
+    new_members = {}
+    skipped = 0
+    with zipfile.ZipFile(zip_file_path) as archive:
+        for info in archive.infolist():
+            filename = os.path.basename(info.filename)
+            state = state_of(filename)
+            if not state:
+                continue
+
+            content_hash = f"{info.CRC:08x}-{info.file_size}"
+            previous = members.get(filename)
+            if previous and previous["hash"] == content_hash:
+                summary = previous["summary"]
+                skipped += 1
+            else:
+                df = read_member(archive, info)
+                if df.empty:
+                    print(f"No LineCode 1 rows in {filename}, skipping.")
+                    continue
+                summary = summarize(df, state)
+
+            new_members[filename] = {"hash": content_hash, "summary": summary}
             summary_data.append(summary)
 
-# Step 4: Create a DataFrame from the summary data
-summary_df = pd.DataFrame(summary_data)
+    manifest["members"] = new_members
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"{len(summary_data)} state files summarized, {skipped} unchanged since the last run.")
+    return summary_data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the BEA state GDP archive.")
+    parser.add_argument(
+        "--mode",
+        choices=["stream", "extract"],
+        default="stream",
+        help="stream: read the state files out of the archive and skip unchanged ones; "
+        "extract: extract the whole archive to disk first",
+    )
+    args = parser.parse_args()
+
+    summary_data = build_stream() if args.mode == "stream" else build_extract()
+
+    # Step 4: Create a DataFrame from the summary data
+    summary_df = pd.DataFrame(summary_data)
 
-# Step 5: Save the combined summary data to a single CSV file
-summary_df.to_csv("../datasets/combined_summary_2000_2023.csv", index=False)
+    # Step 5: Save the combined summary data to a single CSV file
+    summary_df.to_csv(output_path, index=False)
 
-print("Data summarization complete. Combined summary file saved as 'combined_summary_2000_2023.csv'.")
+    print("Data summarization complete. Combined summary file saved as 'combined_summary_2000_2023.csv'.")
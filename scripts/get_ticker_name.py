@@ -1,26 +1,19 @@
-from magentic.chat_model.retry_chat_model import RetryChatModel
-from pydantic import BaseModel, Field, ValidationError
-from typing import List
-from magentic import (
-    OpenaiChatModel,
-    UserMessage,
-    chatprompt,
-    SystemMessage,
-    prompt_chain,
-)
+import argparse
 import logging
+import os
+import sys
 import pandas as pd
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from enrichment import DEFAULT_MODEL, run_enrichment
 
+# Allow importing the app utilities when running from the scripts folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# Read the existing CSV file
-df = pd.read_csv('../datasets/us_market_data.csv')
+from utils.datasets import load_dataset
 
-# Create a new DataFrame with only the 'symbol' and 'name' columns
-ticker_to_name_df = df[['symbol', 'name']]
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # Define a system prompt for the ollama model
 GENERATE_TICKER_TO_NAME_PROMPT_TEMPLATE = """\
@@ -28,34 +21,42 @@ You are a data processing agent. Your task is to map stock tickers to company na
 Don't return any comments, or "Notes". Return only the company name.
 """
 
-@chatprompt(
-    SystemMessage(GENERATE_TICKER_TO_NAME_PROMPT_TEMPLATE),
-    UserMessage("# Data processing task\nTicker: {ticker}, Name: {name}"),
-    model=OpenaiChatModel(
-        model="llama3.1:latest",
-        api_key="ollama",
-        base_url="http://localhost:11434/v1/",
-    ),
-)
-def process_ticker_to_name(ticker: str, name: str) -> str: ...
-
-# Initialize an empty dictionary to store the results
-ticker_to_name_dict = {}
-
-# Iterate over each row in the DataFrame
-for index, row in ticker_to_name_df.iterrows():
-    ticker = row['symbol']
-    name = row['name']
-    # Process each ticker and name using the ollama model
-    response = process_ticker_to_name(ticker=ticker, name=name)
-    # Store the result in the dictionary
-    ticker_to_name_dict[ticker] = response
-
-# Convert the dictionary to a DataFrame
-processed_df = pd.DataFrame(list(ticker_to_name_dict.items()), columns=['symbol', 'name'])
-
-# Save the processed DataFrame to a CSV file
-processed_df.to_csv('./datasets/ticker_to_name.csv', index=False)
-
-# Log the completion
-logger.info("Created ticker_to_name.csv with ticker to company name mapping.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map stock tickers to company names.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    # Read the columns we need from the market data
+    df = load_dataset('us_market_data', columns=['symbol', 'name'], root='../datasets')
+
+    # Create a new DataFrame with only the 'symbol' and 'name' columns
+    ticker_to_name_df = df[['symbol', 'name']]
+
+    # One prompt line per ticker (later duplicates win, as before)
+    items = {
+        ticker: f"Ticker: {ticker}, Name: {name}"
+        for ticker, name in zip(ticker_to_name_df['symbol'], ticker_to_name_df['name'])
+    }
+
+    # Process the tickers with the ollama model, reusing cached answers
+    ticker_to_name_dict = run_enrichment(
+        items,
+        GENERATE_TICKER_TO_NAME_PROMPT_TEMPLATE,
+        model=args.model,
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+    )
+
+    # Convert the dictionary to a DataFrame, in the order of the market data
+    processed_df = pd.DataFrame(
+        [(ticker, ticker_to_name_dict[ticker]) for ticker in items if ticker in ticker_to_name_dict],
+        columns=['symbol', 'name'],
+    )
+
+    # Save the processed DataFrame to a CSV file
+    processed_df.to_csv('../datasets/ticker_to_name.csv', index=False)
+
+    # Log the completion
+    logger.info("Created ticker_to_name.csv with ticker to company name mapping.")
@@ -1,60 +1,59 @@
-from magentic.chat_model.retry_chat_model import RetryChatModel
-from pydantic import BaseModel, Field, ValidationError
-from typing import List
-from magentic import (
-    OpenaiChatModel,
-    UserMessage,
-    chatprompt,
-    SystemMessage,
-)
+import argparse
 import logging
+import os
+import sys
 import pandas as pd
 
+from enrichment import DEFAULT_MODEL, run_enrichment
+
+# Allow importing the app utilities when running from the scripts folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.datasets import load_dataset
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Read the existing CSV file
-df = pd.read_csv('../datasets/us_market_data.csv')
-
-# Create a new DataFrame with only the 'symbol' column
-ticker_to_sector_df = df[['symbol']]
-
 # Define a system prompt for the ollama model
 GENERATE_TICKER_TO_SECTOR_PROMPT_TEMPLATE = """\
 You are a data processing agent. Your task is to map stock tickers to their respective sectors from a given dataset.
 Don't return any comments, or "Notes". Return only the sector.
 """
 
-@chatprompt(
-    SystemMessage(GENERATE_TICKER_TO_SECTOR_PROMPT_TEMPLATE),
-    UserMessage("# Data processing task\nTicker: {ticker}"),
-    model=OpenaiChatModel(
-        model="llama3.1:latest",
-        api_key="ollama",
-        base_url="http://localhost:11434/v1/",
-    ),
-)
-def process_ticker_to_sector(ticker: str) -> str: ...
-
-# Initialize an empty dictionary to store the results
-ticker_to_sector_dict = {}
-
-# Iterate over each row in the DataFrame
-for index, row in ticker_to_sector_df.iterrows():
-    ticker = row['symbol']
-
-    # Process each ticker using the ollama model to get the sector
-    sector = process_ticker_to_sector(ticker=ticker)
-    
-    # Store the result in the dictionary
-    ticker_to_sector_dict[ticker] = sector
-
-# Convert the dictionary to a DataFrame
-processed_df = pd.DataFrame(list(ticker_to_sector_dict.items()), columns=['symbol', 'sector'])
-
-# Save the processed DataFrame to a CSV file
-processed_df.to_csv('../datasets/ticker_to_sector.csv', index=False)
-
-# Log the completion
-logger.info("Created ticker_to_sector.csv with ticker to sector mapping.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map stock tickers to sectors.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    # Read the columns we need from the market data
+    df = load_dataset('us_market_data', columns=['symbol'], root='../datasets')
+
+    # Create a new DataFrame with only the 'symbol' column
+    ticker_to_sector_df = df[['symbol']]
+
+    # One prompt line per ticker
+    items = {ticker: f"Ticker: {ticker}" for ticker in ticker_to_sector_df['symbol']}
+
+    # Process the tickers with the ollama model, reusing cached answers
+    ticker_to_sector_dict = run_enrichment(
+        items,
+        GENERATE_TICKER_TO_SECTOR_PROMPT_TEMPLATE,
+        model=args.model,
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+    )
+
+    # Convert the dictionary to a DataFrame, in the order of the market data
+    processed_df = pd.DataFrame(
+        [(ticker, ticker_to_sector_dict[ticker]) for ticker in items if ticker in ticker_to_sector_dict],
+        columns=['symbol', 'sector'],
+    )
+
+    # Save the processed DataFrame to a CSV file
+    processed_df.to_csv('../datasets/ticker_to_sector.csv', index=False)
+
+    # Log the completion
+    logger.info("Created ticker_to_sector.csv with ticker to sector mapping.")
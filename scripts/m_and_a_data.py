@@ -1,8 +1,13 @@
-import pandas as pd
-import os
-from urllib.request import urlopen
+import argparse
 import json
-import certifi
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from dotenv import load_dotenv
 load_dotenv("../.env")
@@ -11,21 +16,197 @@ API_KEY = os.getenv("FMP_API_KEY")
 # Constants
 BASE_URL = "https://financialmodelingprep.com/api/v4/mergers-acquisitions-rss-feed"
 TOTAL_PAGES = 45
-data = []
+OUTPUT_PATH = "../datasets/mergers_acquisitions_data.csv"
+CHECKPOINT_DIR = "../datasets/.mergers_acquisitions_pages"
+STATE_FILE = "state.json"
+# Rows of the pages written so far, moved over the output once every page is in
+PARTIAL_FILE = "partial.csv"
+
+
+def create_session(pool_size, retries=3):
+    """
+    Create an HTTP session reusing up to pool_size connections, with retries on transient errors.
+
+    :param pool_size: Maximum number of pooled connections
+    :param retries: Number of retries per request
+    :return: requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_page(session, base_url, api_key, page, timeout=30):
+    """
+    Fetch one page of the M&A feed.
+
+    :return: List of deal dictionaries
+    """
+    response = session.get(base_url, params={"page": page, "apikey": api_key}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def _write_json(path, data):
+    # Write next to the destination and rename, so a crash never leaves a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _page_path(checkpoint_dir, page):
+    return os.path.join(checkpoint_dir, f"page_{page:04d}.json")
+
+
+def _load_state(checkpoint_dir):
+    """
+    Load the progress of a previous run and drop anything appended to the partial output after it.
+
+    :return: Dictionary with the last page written, the CSV columns and the size of the partial output
+    """
+    partial_path = os.path.join(checkpoint_dir, PARTIAL_FILE)
+    state_path = os.path.join(checkpoint_dir, STATE_FILE)
+    if os.path.exists(state_path) and os.path.exists(partial_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        # Rows appended after the last saved state belong to a page that will be written again
+        with open(partial_path, "r+b") as f:
+            f.truncate(state["size"])
+        return state
+
+    # Fresh start, the partial output is rebuilt from the checkpointed pages
+    open(partial_path, "w").close()
+    return {"written_through": 0, "columns": [], "size": 0}
+
+
+def _append_page(rows, state, checkpoint_dir):
+    """Append the rows of the next page to the partial output and record the progress."""
+    partial_path = os.path.join(checkpoint_dir, PARTIAL_FILE)
+    if rows:
+        df = pd.DataFrame(rows)
+        # Keys seen for the first time become new trailing columns; earlier
+        # rows are padded when the output is finalized
+        state["columns"] += [column for column in df.columns if column not in state["columns"]]
+        df = df.reindex(columns=state["columns"])
+        df.to_csv(partial_path, mode="a", header=False, index=False)
+
+    state["written_through"] += 1
+    state["size"] = os.path.getsize(partial_path)
+    _write_json(os.path.join(checkpoint_dir, STATE_FILE), state)
+
+
+def _finalize(state, checkpoint_dir, output_path):
+    """Write the complete output with the union of the columns, replacing the previous file."""
+    partial_path = os.path.join(checkpoint_dir, PARTIAL_FILE)
+    if state["columns"]:
+        # Values are kept as the text of the feed, only the header and padding change
+        df = pd.read_csv(
+            partial_path, header=None, names=state["columns"], dtype=str, na_filter=False
+        )
+    else:
+        df = pd.DataFrame()
+
+    tmp_path = f"{output_path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+    # The next run downloads the feed again
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+
+def download(
+    total_pages=TOTAL_PAGES,
+    output_path=OUTPUT_PATH,
+    checkpoint_dir=CHECKPOINT_DIR,
+    base_url=BASE_URL,
+    api_key=API_KEY,
+    max_workers=8,
+):
+    """
+    Download every page of the M&A feed into a CSV file.
+
+    Pages are fetched concurrently over a pooled session and each one is
+    checkpointed to disk as soon as it arrives. Rows are appended in page
+    order to a partial file in the checkpoint folder as soon as the next page
+    is available, so an interrupted run resumes from its checkpoints and only
+    fetches the missing pages. The output is replaced only once every page
+    is in; until then the previous output is left untouched.
+
+    :param total_pages: Number of pages to fetch (pages 1 to total_pages)
+    :param output_path: Destination CSV file
+    :param checkpoint_dir: Folder holding the downloaded pages and the progress
+    :param base_url: URL of the feed
+    :param api_key: FMP API key
+    :param max_workers: Maximum number of pages fetched at the same time
+    :return: List of the pages that could not be fetched
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    state = _load_state(checkpoint_dir)
+
+    pages = range(state["written_through"] + 1, total_pages + 1)
+    pending = [page for page in pages if not os.path.exists(_page_path(checkpoint_dir, page))]
+    failed = []
+
+    def flush_ready_pages():
+        # Append every page that directly follows the last written one
+        while state["written_through"] < total_pages:
+            path = _page_path(checkpoint_dir, state["written_through"] + 1)
+            if not os.path.exists(path):
+                break
+            with open(path, encoding="utf-8") as f:
+                _append_page(json.load(f), state, checkpoint_dir)
+
+    flush_ready_pages()
+    with create_session(max_workers) as session, ThreadPoolExecutor(max_workers) as executor:
+        futures = {
+            executor.submit(fetch_page, session, base_url, api_key, page): page
+            for page in pending
+        }
+        for future in as_completed(futures):
+            page = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"Failed to fetch page {page}: {e}")
+                failed.append(page)
+                continue
+
+            _write_json(_page_path(checkpoint_dir, page), rows)
+            flush_ready_pages()
+
+    if state["written_through"] == total_pages:
+        _finalize(state, checkpoint_dir, output_path)
+    return sorted(failed)
 
-def get_jsonparsed_data(url):
-    response = urlopen(url, cafile=certifi.where())
-    data = response.read().decode("utf-8")
-    return json.loads(data)
 
-# Fetch data from the API
-for page in range(1, TOTAL_PAGES + 1):
-    url = f"{BASE_URL}?page={page}&apikey={API_KEY}"
-    data.extend(get_jsonparsed_data(url))
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download the FMP M&A feed.")
+    parser.add_argument("--pages", type=int, default=TOTAL_PAGES)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+    parser.add_argument("--restart", action="store_true", help="Ignore previous checkpoints")
+    args = parser.parse_args()
 
-# Convert to DataFrame
-df = pd.DataFrame(data)
+    if args.restart:
+        shutil.rmtree(args.checkpoint_dir, ignore_errors=True)
 
-# Save to CSV
-df.to_csv("../datasets/mergers_acquisitions_data.csv", index=False)
-print("Data saved to mergers_acquisitions_data.csv")
+    failed = download(
+        total_pages=args.pages,
+        output_path=args.output,
+        checkpoint_dir=args.checkpoint_dir,
+        base_url=args.base_url,
+        max_workers=args.workers,
+    )
+    if failed:
+        raise SystemExit(f"Pages {failed} failed, run the script again to resume.")
+    print(f"Data saved to {args.output}")
@@ -1,14 +1,85 @@
+import argparse
 import pandas as pd
 import numpy as np
 import re
 import networkx as nx
 import pickle
+import hashlib
+import os
+import sys
+
+# Allow importing the app utilities when running from the scripts folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.compact_graph import CompactGraph
+from utils.datasets import load_dataset
+from utils.graph_layout import graph_layout
+
+DATASETS_ROOT = "../datasets"
+
+
+class NameIndex:
+    r"""
+    Inverted index of company names by word token.
+
+    match(query) returns the same rows as
+    names.str.contains(r"\b" + re.escape(query) + r"\b", case=False, na=False)
+    but only runs the regular expression on the names containing every word
+    of the query, instead of on every name. Case-insensitive matching of
+    non-ASCII text does not follow str.lower() ("ſ" matches "s", "İ" matches
+    "i"), so non-ASCII names are always checked and non-ASCII queries check
+    every name.
+
+    :param names: Series of company names
+    """
+
+    TOKEN = re.compile(r"\w+")
+
+    def __init__(self, names):
+        self.names = names.tolist()
+        self.postings = {}
+        self.non_ascii = []
+        for position, name in enumerate(self.names):
+            if not isinstance(name, str):
+                continue
+            if not name.isascii():
+                self.non_ascii.append(position)
+                continue
+            for token in set(self.TOKEN.findall(name.lower())):
+                self.postings.setdefault(token, []).append(position)
+
+    def match(self, query):
+        """
+        Find the names containing the query as a whole word, case-insensitively.
+
+        :param query: Company name to look for
+        :return: Sorted list of matching row positions
+        """
+        pattern = re.compile(r"\b" + re.escape(query) + r"\b", re.IGNORECASE)
+
+        # Every word of the query appears as a whole token in a matching name
+        tokens = set(self.TOKEN.findall(query.lower()))
+        if tokens and query.isascii():
+            postings = sorted(
+                (self.postings.get(token, []) for token in tokens), key=len
+            )
+            candidates = set(postings[0]).intersection(*postings[1:])
+            candidates.update(self.non_ascii)
+        else:
+            candidates = range(len(self.names))
+
+        return [
+            position
+            for position in sorted(candidates)
+            if isinstance(self.names[position], str)
+            and pattern.search(self.names[position])
+        ]
 
 
 def preprocess_mna_data():
-    ticker_to_name = pd.read_csv("../datasets/ticker_to_name.csv")
-    ticker_to_sector = pd.read_csv("../datasets/ticker_to_sector.csv")
-    mna = pd.read_csv("../datasets/Acquisitions.csv")
+    ticker_to_name = load_dataset("ticker_to_name", root=DATASETS_ROOT)
+    ticker_to_sector = load_dataset("ticker_to_sector", root=DATASETS_ROOT)
+    mna = load_dataset("acquisitions", root=DATASETS_ROOT)
     mna = mna.rename(
         columns={
             "Acquired Company": "Child",
@@ -22,43 +93,48 @@ def preprocess_mna_data():
     mna["Location"] = "USA"  # Placeholder, update with actual data if available
     mna["City"] = "Unknown"  # Placeholder, update with actual data if available
 
+    # Index the company names once instead of scanning all of them per parent
+    name_index = NameIndex(ticker_to_name["name"])
+    symbols = ticker_to_name["symbol"].tolist()
+
     # Create a list to store the results
     results = []
 
     # Iterate over each row in the mna DataFrame
-    for _, mna_row in mna.iterrows():
+    for mna_row in mna.to_dict("records"):
         parent = mna_row["Parent"]
 
-        # Use a regular expression to match the parent name as a whole word
-        match = ticker_to_name[
-            ticker_to_name["name"].str.contains(
-                r"\b" + re.escape(parent) + r"\b", case=False, na=False
-            )
-        ]
-
-        # If a match is found, append the combined data to results
-        if not match.empty:
-            for _, ticker_row in match.iterrows():
-                combined_row = {**mna_row, "symbol": ticker_row["symbol"]}
-                results.append(combined_row)
+        # Rows whose name contains the parent name as a whole word
+        for position in name_index.match(parent):
+            combined_row = {**mna_row, "symbol": symbols[position]}
+            results.append(combined_row)
 
     mna_ = pd.DataFrame(results)
 
     # Merge with ticker_to_sector to get the sector information
     mna_ = mna_.merge(ticker_to_sector, on="symbol", how="left").rename(columns={"sector": "Industry"})
 
-    # Fill missing sectors with "Unknown"
-    mna_["Industry"] = mna_["Industry"].fillna("Unknown")
+    # Fill missing sectors with "Unknown" (the sector column is categorical)
+    industry = mna_["Industry"]
+    if "Unknown" not in industry.cat.categories:
+        industry = industry.cat.add_categories("Unknown")
+    mna_["Industry"] = industry.fillna("Unknown")
 
     # Save the updated DataFrame
     mna_.to_csv("../datasets/mna_with_symbols.csv", index=False)
 
 
-def create_company_graph():
-    # Load datasets
-    mna = pd.read_csv("../datasets/mna_with_symbols.csv")
-    us_market_data = pd.read_csv("../datasets/us_market_data.csv")
+def build_company_graph_iterrows(mna, us_market_data):
+    """
+    Build the company graph row by row (reference implementation).
+
+    Kept to check and benchmark build_company_graph, see
+    scripts/benchmark_graph_build.py.
 
+    :param mna: M&A rows from mna_with_symbols.csv
+    :param us_market_data: Market data from us_market_data.csv
+    :return: networkx DiGraph
+    """
     # Initialize graph
     G = nx.DiGraph()
 
@@ -93,11 +169,138 @@ def create_company_graph():
         if row["Parent"]:
             G.add_edge(row["Parent"], row["Child"])
 
+    return G
+
+
+def build_company_graph(mna, us_market_data):
+    """
+    Build the company graph in bulk.
+
+    Produces the same graph as build_company_graph_iterrows: each row adds
+    its parent then its child, so a node keeps its first-appearance position
+    and, for every attribute, the value of the last row that set it.
+
+    :param mna: M&A rows from mna_with_symbols.csv
+    :param us_market_data: Market data from us_market_data.csv
+    :return: networkx DiGraph
+    """
+
+    def column(name, default):
+        if name in mna:
+            return mna[name]
+        return pd.Series(default, index=mna.index, dtype=object)
+
+    symbol = column("symbol", None)
+    industry = column("Industry", "Unknown")
+
+    # Join the market cap of every parent once, 0 when its symbol is unknown
+    market_caps = us_market_data.drop_duplicates("symbol", keep="last").set_index(
+        "symbol"
+    )["market_cap"]
+    known = symbol.notna() & symbol.isin(market_caps.index)
+    market_cap = symbol.map(market_caps).where(known, 0)
+
+    # Each row sets the parent attributes first, then the child attributes
+    order = np.arange(len(mna))
+    parents = pd.DataFrame(
+        {
+            "node": mna["Parent"],
+            "order": 2 * order,
+            "Industry": industry,
+            "Market_Cap": market_cap,
+            "Ticker": symbol,
+        }
+    )
+    children = pd.DataFrame(
+        {
+            "node": mna["Child"],
+            "order": 2 * order + 1,
+            "Industry": industry,
+            "Year_Acquired": column("Year Acquired", 0),
+            "Deal_Date": column("Deal Date", 0),
+            "Parent": mna["Parent"],
+        }
+    )
+    events = pd.concat(
+        [parents[["node", "order", "Industry"]], children[["node", "order", "Industry"]]]
+    ).sort_values("order", kind="stable")
+
+    # Nodes in order of first appearance, with the last value of each attribute
+    attributes = {node: {} for node in events["node"].drop_duplicates().tolist()}
+    last_industry = events.drop_duplicates("node", keep="last")
+    for node, value in zip(last_industry["node"], last_industry["Industry"]):
+        attributes[node]["Industry"] = value
+
+    last_parent = parents.drop_duplicates("node", keep="last")
+    for node, cap, ticker in zip(
+        last_parent["node"], last_parent["Market_Cap"], last_parent["Ticker"]
+    ):
+        attributes[node].update(Market_Cap=cap, Ticker=ticker)
+
+    last_child = children.drop_duplicates("node", keep="last")
+    for node, year, date, parent in zip(
+        last_child["node"],
+        last_child["Year_Acquired"],
+        last_child["Deal_Date"],
+        last_child["Parent"],
+    ):
+        attributes[node].update(Year_Acquired=year, Deal_Date=date, Parent=parent)
+
+    G = nx.DiGraph()
+    G.add_nodes_from(attributes.items())
+
+    # Add edges from parent to child
+    has_parent = mna["Parent"].astype(bool)
+    G.add_edges_from(zip(mna["Parent"][has_parent], mna["Child"][has_parent]))
+
+    return G
+
+
+def create_company_graph(compute_layout=True):
+    """
+    Build the company graph and save it, pickled and in the compact format.
+
+    :param compute_layout: Compute the node positions drawn by the network views,
+        stored as the "x" and "y" node attributes (see utils/graph_layout.py)
+    """
+    # Load datasets
+    mna = load_dataset(
+        "mna_with_symbols",
+        columns=["Parent", "Child", "symbol", "Industry", "Year Acquired", "Deal Date"],
+        root=DATASETS_ROOT,
+    )
+    us_market_data = load_dataset(
+        "us_market_data", columns=["symbol", "market_cap"], root=DATASETS_ROOT
+    )
+
+    G = build_company_graph(mna, us_market_data)
+
+    # Lay out the graph once here instead of in the browser on every view
+    if compute_layout:
+        positions = graph_layout(G)
+        nx.set_node_attributes(
+            G, {node: {"x": x, "y": y} for node, (x, y) in positions.items()}
+        )
+
     # Save the graph to a file
+    data = pickle.dumps(G)
     with open("../graph_objs/company_graph.pkl", "wb") as f:
-        pickle.dump(G, f)
+        f.write(data)
+
+    # Save the compact, memory-mappable copy loaded by the app, with the same
+    # version as the pickle so prerendered network HTML stays valid
+    G.graph["version"] = hashlib.sha1(data).hexdigest()[:16]
+    CompactGraph.from_networkx(G).save("../graph_objs/company_graph")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the M&A datasets and company graph.")
+    parser.add_argument(
+        "--skip-layout",
+        action="store_true",
+        help="Do not compute the node positions (the browser lays out the graph)",
+    )
+    args = parser.parse_args()
+
     preprocess_mna_data()
-    create_company_graph()
+    create_company_graph(compute_layout=not args.skip_layout)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+# Allow importing the app utilities when running from the scripts folder
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from utils.data_loader import load_company_graph
+from utils.graphs import (
+    graph_version,
+    prerendered_graph_path,
+    render_pyvis_network_graph,
+)
+from utils.settings import COMPANY_GRAPH_RADII, PYVIS_PRERENDER_DIR
+
+
+def prerender_company_graphs(
+    graph_path=os.path.join(ROOT_DIR, "graph_objs", "company_graph.pkl"),
+    compact_path=os.path.join(ROOT_DIR, "graph_objs", "company_graph"),
+    output_dir=PYVIS_PRERENDER_DIR,
+    radii=COMPANY_GRAPH_RADII,
+):
+    """
+    Write the network HTML of every company (and of the industry overview) to disk.
+
+    The files are stored under a folder named after the graph version, so a
+    rebuilt graph never serves stale renderings.
+
+    :param graph_path: Path of the pickled company graph
+    :param compact_path: Folder of the company graph in the compact format
+    :param output_dir: Root directory of the prerendered files
+    :param radii: Ego graph radii to prerender for every company
+    """
+    G = load_company_graph(graph_path, compact_path, index_radius=max(radii))
+    version = graph_version(G)
+
+    # The industry overview does not depend on the radius
+    renderings = [("All Companies", 1)] + [
+        (company, radius) for company in G.nodes() for radius in radii
+    ]
+    for i, (company, radius) in enumerate(renderings, start=1):
+        path = prerendered_graph_path(version, company, radius, root=output_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_pyvis_network_graph(G, company, radius))
+
+        if i % 100 == 0:
+            print(f"Prerendered {i}/{len(renderings)} graphs")
+
+    print(f"Prerendered {len(renderings)} graphs into {os.path.join(output_dir, version)}")
+
+
+if __name__ == "__main__":
+    prerender_company_graphs()
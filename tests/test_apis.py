@@ -0,0 +1,99 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openbb")
+
+from utils import apis  # noqa: E402
+
+
+class FakeOpenBB:
+    """obb stand-in whose account.login answers from a list of outcomes, True meaning success."""
+
+    def __init__(self, outcomes, release=None):
+        self.outcomes = list(outcomes)
+        self.release = release
+        self.logins = 0
+        self._lock = threading.Lock()
+        self.account = SimpleNamespace(login=self.login)
+        self.user = SimpleNamespace(credentials=None, preferences=SimpleNamespace())
+
+    def login(self, pat):
+        with self._lock:
+            self.logins += 1
+            outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        if isinstance(outcome, Exception):
+            raise outcome
+        self.user.credentials = {"token": pat} if outcome else None
+
+
+def wait_for_refresh(session):
+    for thread in threading.enumerate():
+        if thread.name == "openbb-login":
+            thread.join(timeout=5)
+    assert not session._refreshing
+
+
+def test_concurrent_callers_share_one_login(monkeypatch):
+    release = threading.Event()
+    obb = FakeOpenBB([True], release=release)
+    monkeypatch.setattr(apis, "obb", obb)
+    session = apis.CredentialSession(ttl=60, failure_ttl=1, refresh_margin=5)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(session.status("token")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == ["success"] * 5
+    assert obb.logins == 1
+    assert obb.user.preferences.output_type == "dataframe"
+
+
+def test_failure_is_cached_for_its_ttl_only(monkeypatch):
+    obb = FakeOpenBB([False, RuntimeError("offline"), True])
+    monkeypatch.setattr(apis, "obb", obb)
+    session = apis.CredentialSession(ttl=60, failure_ttl=0.2, refresh_margin=5)
+
+    assert session.status("token") == "fail"
+    assert session.status("token") == "fail"
+    assert obb.logins == 1
+
+    time.sleep(0.25)
+    assert session.status("token") == "error: offline"
+    time.sleep(0.25)
+    assert session.status("token") == "success"
+    assert session.status("token") == "success"
+    assert obb.logins == 3
+
+
+def test_failed_refresh_keeps_the_current_login(monkeypatch):
+    obb = FakeOpenBB([True, RuntimeError("offline"), True])
+    monkeypatch.setattr(apis, "obb", obb)
+    # Every cached login is within the refresh margin
+    session = apis.CredentialSession(ttl=60, failure_ttl=1, refresh_margin=60)
+
+    assert session.status("token") == "success"
+    # Served from the cache, the renewal fails in the background
+    assert session.status("token") == "success"
+    wait_for_refresh(session)
+    assert obb.logins == 2
+    assert session._status["token"][0] == "success"
+
+    # The next call renews it again, this time successfully
+    expires_at = session._status["token"][1]
+    assert session.status("token") == "success"
+    wait_for_refresh(session)
+    assert obb.logins == 3
+    assert session._status["token"][1] > expires_at
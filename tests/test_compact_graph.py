@@ -0,0 +1,50 @@
+import json
+import pickle
+
+import networkx as nx
+import pytest
+
+from utils.compact_graph import CompactGraph, convert_pickle
+from utils.data_loader import load_company_graph
+
+
+@pytest.fixture
+def graph():
+    G = nx.gnm_random_graph(60, 90, directed=True, seed=3)
+    G = nx.relabel_nodes(G, {i: f"Company {i}" for i in G})
+    nx.set_node_attributes(G, {node: {"Industry": f"Industry {i % 4}"} for i, node in enumerate(G)})
+    return G
+
+
+def test_ego_graphs_match_networkx(graph):
+    compact = CompactGraph.from_networkx(graph).build_neighborhood_index(2)
+
+    for node in graph:
+        for radius in (1, 2, 3):
+            expected = nx.ego_graph(graph, node, radius=radius, undirected=True)
+            ego = compact.ego_graph(node, radius=radius)
+            assert set(ego.nodes()) == set(expected.nodes())
+            assert set(ego.edges()) == set(expected.edges())
+
+
+def test_load_company_graph_refuses_a_stale_compact_graph(graph, tmp_path):
+    pickle_path = tmp_path / "company_graph.pkl"
+    compact_path = tmp_path / "company_graph"
+    pickle_path.write_bytes(pickle.dumps(graph))
+    convert_pickle(pickle_path, compact_path)
+
+    G = load_company_graph(str(pickle_path), str(compact_path), index_radius=1)
+    assert sorted(G.nodes()) == sorted(graph.nodes())
+
+    # Rebuilding the pickle without converting it again
+    graph.add_edge("Company 0", "Company 1")
+    pickle_path.write_bytes(pickle.dumps(graph))
+    with pytest.raises(RuntimeError, match="was not converted"):
+        load_company_graph(str(pickle_path), str(compact_path), index_radius=1)
+
+
+def test_committed_compact_graph_matches_the_pickle():
+    with open("graph_objs/company_graph/meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    G = load_company_graph()
+    assert G.graph["version"] == meta["version"]
@@ -0,0 +1,39 @@
+import importlib
+
+import dash
+import pytest
+
+from utils.data_service import DataService
+
+
+@pytest.fixture(scope="module")
+def page():
+    dash.Dash(__name__, use_pages=True, pages_folder="")
+    # Outside of a pages folder scan, Dash does not pick up the layout itself
+    module = importlib.import_module("pages.company_analysis")
+    dash.page_registry[module.__name__]["layout"] = module.layout
+    return module
+
+
+def test_prefetch_before_the_companies_are_loaded_is_retried(page, monkeypatch):
+    companies = []
+    service = DataService(retry_delay=0)
+    service.register("top_companies", lambda: list(companies))
+    service.register("company_profiles", page.prefetch_company_profiles)
+    monkeypatch.setattr(page, "data_service", service)
+    fetched = []
+    monkeypatch.setattr(
+        page,
+        "get_shared_company_profiles",
+        lambda symbols, path, max_age: fetched.append(symbols) or {s: {} for s in symbols},
+    )
+
+    # Nothing is cached nor shared while the list of companies is empty
+    assert service.get("company_profiles") is None
+    assert not service.is_ready("company_profiles")
+    assert fetched == []
+
+    companies.append({"symbol": "AAPL"})
+    service.invalidate("top_companies")
+    assert service.get("company_profiles") == {"AAPL": {}}
+    assert fetched == [["AAPL"]]
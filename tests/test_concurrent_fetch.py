@@ -0,0 +1,158 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from utils import data_loader, throttle
+from utils.throttle import RateLimiter, call_with_retry, get_rate_limiter
+
+
+def stub_frame(ticker):
+    dates = pd.bdate_range("2024-01-01", periods=3, name="date")
+    return pd.DataFrame({"close": [1.0, 2.0, 3.0], "ticker": ticker}, index=dates)
+
+
+def test_load_many_keeps_ticker_order_and_bounds_concurrency(monkeypatch):
+    monkeypatch.setitem(data_loader.PROVIDER_RATE_LIMITS, "stub", None)
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fetcher(ticker, start_date, provider):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return stub_frame(ticker)
+
+    tickers = [f"T{i}" for i in range(8)]
+    frames = data_loader.load_many_stock_data(
+        tickers, "2024-01-01", "stub", max_workers=3, fetcher=fetcher, use_cache=False
+    )
+
+    assert list(frames) == tickers
+    assert all(frames[t]["ticker"].iloc[0] == t for t in tickers)
+    assert 1 < peak <= 3
+
+
+def test_load_many_retries_failed_fetches(monkeypatch):
+    monkeypatch.setattr(throttle.time, "sleep", lambda seconds: None)
+    attempts = {}
+
+    def flaky(ticker, start_date, provider):
+        attempts[ticker] = attempts.get(ticker, 0) + 1
+        if attempts[ticker] < 3:
+            raise ConnectionError("rate limited")
+        return stub_frame(ticker)
+
+    frames = data_loader.load_many_stock_data(
+        ["A", "B"], "2024-01-01", "flaky", fetcher=flaky, use_cache=False
+    )
+
+    assert set(frames) == {"A", "B"}
+    assert attempts == {"A": 3, "B": 3}
+
+
+def test_load_many_skips_tickers_that_keep_failing(monkeypatch):
+    monkeypatch.setattr(throttle.time, "sleep", lambda seconds: None)
+
+    def fetcher(ticker, start_date, provider):
+        if ticker == "B":
+            raise ConnectionError("delisted")
+        return stub_frame(ticker)
+
+    with pytest.raises(ConnectionError):
+        data_loader.load_many_stock_data(
+            ["A", "B", "C"], "2024-01-01", "stub", fetcher=fetcher, use_cache=False
+        )
+
+    frames = data_loader.load_many_stock_data(
+        ["A", "B", "C"], "2024-01-01", "stub", fetcher=fetcher, use_cache=False, skip_failed=True
+    )
+    assert list(frames) == ["A", "C"]
+
+
+def test_main_indices_leave_out_an_index_that_fails(monkeypatch):
+    monkeypatch.setattr(throttle.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(data_loader, "PRICE_CACHE_ENABLED", False)
+    failing = {"^IXIC"}
+
+    def fetcher(ticker, start_date, provider):
+        if ticker in failing:
+            raise ConnectionError("upstream down")
+        return stub_frame(ticker)
+
+    indices = data_loader.load_main_indices_stock_data(fetcher=fetcher)
+    assert list(indices) == ["^BVSP", "^GSPC", "^DJI"]
+
+    # With nothing to show, the load fails so the data service retries it
+    failing.update(data_loader.MAIN_INDICES)
+    with pytest.raises(RuntimeError):
+        data_loader.load_main_indices_stock_data(fetcher=fetcher)
+
+
+def test_empty_ticker_list():
+    assert data_loader.load_many_stock_data([], "2024-01-01", "stub") == {}
+
+
+def test_rate_limiter_spaces_calls_across_threads():
+    limiter = RateLimiter(rate=50)  # One call every 20 ms
+    stamps = []
+    lock = threading.Lock()
+
+    def call():
+        limiter.acquire()
+        with lock:
+            stamps.append(time.monotonic())
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stamps.sort()
+    gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+    assert min(gaps) >= 0.015
+    assert stamps[-1] - stamps[0] >= 5 * 0.02 * 0.9
+
+
+def test_rate_limiter_is_shared_per_provider():
+    assert get_rate_limiter("provider-a", 5) is get_rate_limiter("provider-a", 10)
+    assert get_rate_limiter("provider-a", 5) is not get_rate_limiter("provider-b", 5)
+
+
+def test_call_with_retry_backs_off_then_raises(monkeypatch):
+    delays = []
+    monkeypatch.setattr(throttle.time, "sleep", delays.append)
+
+    def always_fails():
+        raise TimeoutError("down")
+
+    with pytest.raises(TimeoutError):
+        call_with_retry(always_fails, retries=3, backoff=0.5)
+
+    # Exponential backoff with up to 50% jitter
+    assert len(delays) == 3
+    for attempt, delay in enumerate(delays):
+        assert 0.5 * 2**attempt <= delay <= 0.75 * 2**attempt
+
+
+def test_calculate_monthly_returns_with_stub_provider(monkeypatch):
+    def fetcher(ticker, start_date, provider):
+        dates = pd.bdate_range("2024-01-01", "2024-04-30", name="date")
+        growth = {"UP": 1.001, "FLAT": 1.0}[ticker]
+        return pd.DataFrame({"close": [100 * growth**i for i in range(len(dates))]}, index=dates)
+
+    monkeypatch.setattr(data_loader, "fetch_stock_data", fetcher)
+    monkeypatch.setattr(data_loader, "PRICE_CACHE_ENABLED", False)
+
+    monthly = data_loader.calculate_monthly_returns(["UP", "FLAT"], "stub", max_workers=2)
+
+    assert list(monthly.columns) == ["UP", "FLAT"]
+    assert (monthly["UP"].dropna() > 0).all()
+    assert (monthly["FLAT"].dropna() == 0).all()
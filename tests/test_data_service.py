@@ -0,0 +1,100 @@
+import threading
+import time
+
+from utils import data_service as data_service_module
+from utils.data_service import DataService
+
+
+def test_failed_load_is_not_retried_before_the_delay(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(data_service_module.time, "monotonic", lambda: now[0])
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise ConnectionError("upstream down")
+
+    service = DataService(retry_delay=30)
+    service.register("prices", failing)
+
+    assert service.get("prices", default="placeholder") == "placeholder"
+    # Within the delay the default is returned at once, without loading or waiting
+    started = time.perf_counter()
+    assert service.get("prices", timeout=5, default="placeholder") == "placeholder"
+    assert time.perf_counter() - started < 1
+    service.warm_up(["prices"])
+    assert len(calls) == 1
+
+    now[0] += 31
+    assert service.get("prices", default="placeholder") == "placeholder"
+    assert len(calls) == 2
+
+
+def test_successful_load_after_a_failure_is_served():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("upstream down")
+        return "data"
+
+    service = DataService(retry_delay=0)
+    service.register("prices", flaky)
+
+    assert service.get("prices") is None
+    assert service.get("prices") == "data"
+    assert service.get("prices") == "data"
+    assert len(attempts) == 2
+
+
+def test_background_load_returns_default_on_timeout():
+    service = DataService()
+    service.register("slow", lambda: time.sleep(0.5) or "data")
+
+    assert service.get("slow", timeout=0.01, default="placeholder") == "placeholder"
+    assert service.get("slow") == "data"
+
+
+def test_failed_refresh_keeps_serving_the_previous_value():
+    calls = []
+    failed, release, refreshed = threading.Event(), threading.Event(), threading.Event()
+
+    def loader():
+        calls.append(1)
+        if len(calls) == 1:
+            return "first"
+        if len(calls) == 2:
+            failed.set()
+            raise ConnectionError("upstream down")
+        release.wait()
+        refreshed.set()
+        return "second"
+
+    service = DataService()
+    service.register("profiles", loader, refresh_interval=0.05)
+
+    assert service.get("profiles") == "first"
+    assert failed.wait(2)
+    assert service.get("profiles") == "first"
+
+    release.set()
+    assert refreshed.wait(2)
+    deadline = time.monotonic() + 2
+    while service.get("profiles") != "second" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service.get("profiles") == "second"
+
+
+def test_warm_up_only_loads_the_names_given():
+    loaded = []
+    service = DataService()
+    for name in ["heatmap", "market_overview"]:
+        service.register(name, lambda name=name: loaded.append(name) or name)
+
+    service.warm_up(["heatmap", "not_registered"])
+    assert service.get("heatmap", timeout=2) == "heatmap"
+    assert loaded == ["heatmap"]
+
+    service.warm_up([])
+    assert loaded == ["heatmap"]
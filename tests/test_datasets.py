@@ -0,0 +1,106 @@
+import os
+
+import pytest
+import requests
+
+from utils import datasets
+
+CITIES_CSV = b"name,pop,lat,lon\nNew York,8287238,40.73,-73.99\nLos Angeles,3826423,34.05,-118.24\n"
+
+
+class Response:
+    def __init__(self, content, status=200):
+        self.content = content
+        self.status = status
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise requests.HTTPError(f"{self.status} error")
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    """Serve the vendored datasets from a stub, recording the URLs requested."""
+    monkeypatch.setattr(datasets, "DATASETS_DIR", str(tmp_path))
+    urls = []
+    responses = {"default": Response(CITIES_CSV)}
+
+    def get(url, timeout):
+        urls.append(url)
+        return responses["default"]
+
+    monkeypatch.setattr(datasets.requests, "get", get)
+    datasets.load_vendored_dataset.cache_clear()
+    yield urls, responses
+    datasets.load_vendored_dataset.cache_clear()
+
+
+def test_missing_copy_is_refused_without_downloading(downloads, tmp_path):
+    urls, _ = downloads
+
+    with pytest.raises(FileNotFoundError, match="utils.datasets refresh us_cities_2014"):
+        datasets.load_vendored_dataset("us_cities_2014")
+    assert urls == []
+
+    # The failure is not cached: once the copy is refreshed it is loaded
+    datasets.refresh(["us_cities_2014"])
+    df = datasets.load_vendored_dataset("us_cities_2014")
+    assert df["name"].tolist() == ["New York", "Los Angeles"]
+    assert urls == [datasets.DATASETS["us_cities_2014"]["url"]]
+    recorded = datasets.read_checksums()["2014_us_cities.csv"]
+    assert recorded == datasets.file_sha256(tmp_path / "2014_us_cities.csv")
+
+
+def test_failed_refresh_keeps_the_previous_copy(downloads, tmp_path):
+    _, responses = downloads
+    datasets.refresh(["us_cities_2014"])
+    checksums = datasets.read_checksums()
+
+    responses["default"] = Response(b"", status=503)
+    with pytest.raises(requests.HTTPError):
+        datasets.refresh(["us_cities_2014"])
+
+    assert datasets.read_checksums() == checksums
+    assert len(datasets.load_vendored_dataset("us_cities_2014")) == 2
+
+
+def test_committed_copies_match_their_checksums():
+    checksums = datasets.read_checksums()
+    missing = [
+        name
+        for name in datasets.VENDORED_DATASETS
+        if not os.path.exists(datasets.dataset_path(name))
+    ]
+    if missing or not checksums:
+        pytest.skip(f"vendored copies not committed: {', '.join(missing) or 'vendored.json'}")
+
+    for name in datasets.VENDORED_DATASETS:
+        filename = datasets.DATASETS[name]["filename"]
+        assert checksums[filename] == datasets.file_sha256(datasets.dataset_path(name))
+
+
+def test_copy_without_or_not_matching_its_checksum_is_refused(downloads, tmp_path):
+    (tmp_path / "2014_us_cities.csv").write_bytes(CITIES_CSV)
+    with pytest.raises(ValueError, match="no recorded checksum"):
+        datasets.load_vendored_dataset("us_cities_2014")
+
+    datasets.refresh(["us_cities_2014"])
+    (tmp_path / "2014_us_cities.csv").write_bytes(CITIES_CSV + b"Chicago,2,41.8,-87.6\n")
+    with pytest.raises(ValueError, match="does not match"):
+        datasets.load_vendored_dataset("us_cities_2014")
+
+
+def test_sidecar_is_written_once_and_replaced_when_the_csv_changes(tmp_path):
+    path = tmp_path / "ticker_to_sector.csv"
+    path.write_text("symbol,sector\nAAPL,Technology\nXOM,Energy\n")
+
+    df = datasets.load_dataset("ticker_to_sector", root=str(tmp_path))
+    assert df["sector"].dtype == "category"
+    sidecars = list((tmp_path / datasets.SIDECAR_DIR).iterdir())
+    assert len(sidecars) == 1 and sidecars[0].suffix == ".parquet"
+
+    path.write_text("symbol,sector\nAAPL,Technology\nXOM,Energy\nJPM,Financials\n")
+    assert len(datasets.load_dataset("ticker_to_sector", root=str(tmp_path))) == 3
+    # The stale sidecar is removed and no temporary file is left behind
+    sidecars = list((tmp_path / datasets.SIDECAR_DIR).iterdir())
+    assert len(sidecars) == 1 and sidecars[0].suffix == ".parquet"
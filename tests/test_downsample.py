@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from utils.downsample import downsample, lttb_indices, minmax_indices
+
+
+def noisy_line(n, seed=0):
+    return np.random.default_rng(seed).normal(0, 1, n).cumsum()
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("n, max_points", [(10_000, 500), (1_001, 100), (37, 10)])
+def test_downsample_respects_the_budget_and_keeps_the_ends(method, n, max_points):
+    x = np.arange(n)
+    y = noisy_line(n)
+
+    x_out, y_out = downsample(x, y, max_points, method=method)
+
+    assert 3 <= len(x_out) <= max_points
+    assert x_out[0] == 0 and x_out[-1] == n - 1
+    assert np.all(np.diff(x_out) > 0)
+    np.testing.assert_array_equal(y_out, y[x_out])
+
+
+def test_lttb_keeps_exactly_the_budget():
+    assert len(lttb_indices(noisy_line(5_000), 250)) == 250
+
+
+def test_minmax_keeps_every_extreme():
+    y = noisy_line(5_000)
+    kept = minmax_indices(y, 100)
+    assert np.argmin(y) in kept and np.argmax(y) in kept
+
+
+def test_short_lines_are_returned_whole():
+    x, y = downsample(["a", "b", "c"], [1.0, 2.0, 3.0], 500)
+    assert x.tolist() == ["a", "b", "c"] and y.tolist() == [1.0, 2.0, 3.0]
+
+    x, y = downsample(np.arange(1_000), noisy_line(1_000), None)
+    assert len(x) == 1_000
+
+
+def test_missing_values_are_dropped_before_sampling():
+    y = noisy_line(2_000)
+    y[:100] = np.nan
+    y[-50:] = np.nan
+    values = [None if np.isnan(v) else v for v in y]
+
+    x_out, y_out = downsample(np.arange(2_000), values, 200)
+
+    assert len(x_out) <= 200
+    assert not np.isnan(y_out).any()
+    assert x_out[0] == 100 and x_out[-1] == 1_949
@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import enrichment  # noqa: E402
+
+ITEMS = {ticker: f"Ticker: {ticker}" for ticker in ["A", "B", "C", "D", "E", "F", "G"]}
+
+
+class FakeClient:
+    """OpenAI client answering "<ticker>-answer", skipping the tickers in skip when batched."""
+
+    def __init__(self, skip=()):
+        self.skip = set(skip)
+        self.batches = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature):
+        lines = messages[-1]["content"].splitlines()[1:]
+        tickers = [line.split()[1] for line in lines]
+        with self._lock:
+            self.batches.append(tickers)
+        answers = {
+            ticker: f"{ticker}-answer"
+            for ticker in tickers
+            if len(tickers) == 1 or ticker not in self.skip
+        }
+        content = f"Here you go:\n{json.dumps(answers)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(enrichment, "OpenAI", lambda base_url, api_key: fake)
+    return fake
+
+
+def run(tmp_path, system_prompt="Give the sector.", items=ITEMS):
+    return enrichment.run_enrichment(
+        items,
+        system_prompt,
+        batch_size=3,
+        max_concurrency=2,
+        cache_path=str(tmp_path / "cache.sqlite"),
+    )
+
+
+def test_items_are_sent_in_batches(client, tmp_path):
+    answers = run(tmp_path)
+
+    assert answers == {ticker: f"{ticker}-answer" for ticker in ITEMS}
+    assert sorted(len(batch) for batch in client.batches) == [1, 3, 3]
+    assert sorted(ticker for batch in client.batches for ticker in batch) == sorted(ITEMS)
+
+
+def test_cached_answers_are_not_asked_again(client, tmp_path):
+    run(tmp_path)
+    client.batches.clear()
+
+    assert run(tmp_path) == {ticker: f"{ticker}-answer" for ticker in ITEMS}
+    assert client.batches == []
+
+    # Only the item whose input changed is asked again
+    run(tmp_path, items=dict(ITEMS, C="Ticker: C (Technology)"))
+    assert client.batches == [["C"]]
+
+
+def test_edited_prompt_is_asked_again(client, tmp_path):
+    run(tmp_path)
+    client.batches.clear()
+
+    run(tmp_path, system_prompt="Give the industry.")
+    assert sorted(ticker for batch in client.batches for ticker in batch) == sorted(ITEMS)
+
+
+def test_skipped_tickers_are_asked_one_by_one(client, tmp_path):
+    client.skip = {"B", "E"}
+
+    answers = run(tmp_path)
+
+    assert answers == {ticker: f"{ticker}-answer" for ticker in ITEMS}
+    singles = sorted(batch[0] for batch in client.batches if len(batch) == 1)
+    # G is alone in its batch, B and E were skipped by the batched replies
+    assert singles == ["B", "E", "G"]
+
+
+def test_parse_answers_ignores_surrounding_text():
+    assert enrichment.parse_answers('Sure! {"AAPL": " Technology "} Done.') == {
+        "AAPL": "Technology"
+    }
+    assert enrichment.parse_answers("no json here") == {}
+    assert enrichment.parse_answers("{not json}") == {}
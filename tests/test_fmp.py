@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from utils import fmp
+
+
+@pytest.fixture
+def requests_made(monkeypatch):
+    """Replace the FMP API with a stub answering every profile, recording the paths."""
+    paths = []
+
+    def request(path, **params):
+        paths.append(path)
+        symbols = path.removeprefix("/profile/").split(",")
+        return [{"symbol": symbol, "companyName": f"{symbol} Inc."} for symbol in symbols]
+
+    monkeypatch.setattr(fmp, "_request", request)
+    fmp._profile_cache.clear()
+    yield paths
+    fmp._profile_cache.clear()
+
+
+def test_bulk_prefetch_fills_the_profile_cache(requests_made):
+    profiles = fmp.get_company_profiles(["A", "B", "C", "D", "E"], chunk_size=2)
+
+    assert sorted(profiles) == ["A", "B", "C", "D", "E"]
+    assert requests_made == ["/profile/A,B", "/profile/C,D", "/profile/E"]
+
+    # Opening a company is then served from the cache
+    assert fmp.get_company_profile("C")["companyName"] == "C Inc."
+    assert len(requests_made) == 3
+
+
+def test_shared_prefetch_reuses_a_fresh_snapshot(requests_made, tmp_path):
+    path = str(tmp_path / "profiles.json")
+
+    first = fmp.get_shared_company_profiles(["A", "B"], path, max_age=60)
+    # Another worker, with an empty in-memory cache
+    fmp._profile_cache.clear()
+    second = fmp.get_shared_company_profiles(["A", "B"], path, max_age=60)
+
+    assert first == second
+    assert requests_made == ["/profile/A,B"]
+    assert fmp.get_company_profile("B")["companyName"] == "B Inc."
+    assert len(requests_made) == 1
+
+
+def test_shared_prefetch_refetches_a_stale_or_incomplete_snapshot(requests_made, tmp_path):
+    path = str(tmp_path / "profiles.json")
+    fmp.get_shared_company_profiles(["A", "B"], path, max_age=60)
+
+    fmp.get_shared_company_profiles(["A", "B", "C"], path, max_age=60)
+    assert requests_made[-1] == "/profile/A,B,C"
+
+    stale = os.path.getmtime(path) - 120
+    os.utime(path, (stale, stale))
+    fmp.get_shared_company_profiles(["A"], path, max_age=60)
+    assert requests_made == ["/profile/A,B", "/profile/A,B,C", "/profile/A"]
+
+
+def test_shared_prefetch_without_symbols_keeps_the_snapshot(requests_made, tmp_path):
+    path = tmp_path / "profiles.json"
+    fmp.get_shared_company_profiles(["A"], str(path), max_age=60)
+    snapshot = path.read_text()
+
+    with pytest.raises(ValueError):
+        fmp.get_shared_company_profiles([], str(path), max_age=60)
+    assert path.read_text() == snapshot
+    assert requests_made == ["/profile/A"]
+
+
+def test_concurrent_callers_share_one_request(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    paths = []
+
+    def request(path, **params):
+        paths.append(path)
+        started.set()
+        release.wait(timeout=5)
+        return [{"symbol": "A", "companyName": "A Inc."}]
+
+    monkeypatch.setattr(fmp, "_request", request)
+    fmp._profile_cache.clear()
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        first = executor.submit(fmp.get_company_profile, "A")
+        assert started.wait(timeout=5)
+        # The others arrive while the first call is still in flight
+        others = [executor.submit(fmp.get_company_profile, "A") for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        profiles = [first.result()] + [future.result() for future in others]
+
+    assert paths == ["/profile/A"]
+    assert all(profile is profiles[0] for profile in profiles)
+    assert fmp._in_flight == {}
+    fmp._profile_cache.clear()
+
+
+def test_failed_request_is_not_cached(monkeypatch):
+    paths = []
+    responses = iter([requests.HTTPError("502 Bad Gateway"), [{"symbol": "A"}]])
+
+    def request(path, **params):
+        paths.append(path)
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(fmp, "_request", request)
+    fmp._profile_cache.clear()
+
+    with pytest.raises(requests.HTTPError):
+        fmp.get_company_profile("A")
+    assert fmp._profile_cache.get("A") is None
+    assert fmp._in_flight == {}
+
+    # The next call asks the API again, and only its answer is cached
+    assert fmp.get_company_profile("A") == {"symbol": "A"}
+    assert fmp.get_company_profile("A") == {"symbol": "A"}
+    assert paths == ["/profile/A", "/profile/A"]
+    fmp._profile_cache.clear()
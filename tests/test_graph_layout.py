@@ -0,0 +1,53 @@
+import networkx as nx
+import numpy as np
+
+from utils.graph_layout import breadth_first_spiral_positions, graph_layout
+
+
+def forest():
+    G = nx.DiGraph()
+    for root, size in [("A", 30), ("B", 8), ("C", 1)]:
+        G.add_node(root)
+        G.add_edges_from((root, f"{root}{i}") for i in range(size - 1))
+    return G
+
+
+def test_layout_is_deterministic_and_separates_components():
+    G = forest()
+    positions = graph_layout(G)
+
+    assert positions == graph_layout(forest())
+    assert set(positions) == set(G)
+    assert len(set(positions.values())) == len(G)
+
+    # The bounding boxes of two components do not overlap
+    def box(root):
+        points = np.array([positions[n] for n in G if str(n).startswith(root)])
+        return points.min(axis=0), points.max(axis=0)
+
+    (a_min, a_max), (b_min, b_max) = box("A"), box("B")
+    assert (a_max < b_min).any() or (b_max < a_min).any()
+
+
+def test_large_components_fall_back_to_the_spiral():
+    G = forest()
+    fallback = graph_layout(G, max_force_directed_nodes=10)
+    assert set(fallback) == set(G)
+    # The hub of the star comes first on the spiral, next to the middle of its component
+    points = np.array([fallback[n] for n in G if str(n).startswith("A")])
+    middle = (points.min(axis=0) + points.max(axis=0)) / 2
+    distances = np.linalg.norm(points - middle, axis=1)
+    assert np.linalg.norm(np.array(fallback["A"]) - middle) == distances.min()
+
+
+def test_spiral_positions_are_bounded_and_distinct():
+    n = 500
+    edges = np.column_stack([np.arange(1, n), np.arange(n - 1) // 2])
+    pos = breadth_first_spiral_positions(n, edges)
+
+    assert pos.shape == (n, 2)
+    assert np.abs(pos).max() == 1
+    assert len(np.unique(pos.round(9), axis=0)) == n
+    # The root is the most connected node and sits next to the center
+    root = np.argmax(np.bincount(edges.ravel()))
+    assert np.linalg.norm(pos[root]) == np.linalg.norm(pos, axis=1).min()
@@ -0,0 +1,58 @@
+import os
+
+import networkx as nx
+import pytest
+
+from utils import graphs
+
+
+@pytest.fixture
+def renderings(monkeypatch, tmp_path):
+    """Stub renderer recording its calls, with an empty cache and prerender folder."""
+    calls = []
+
+    def render(G, selected_company, radius=1, expanded=()):
+        calls.append(selected_company)
+        return f"<html>{selected_company} v{graphs.PYVIS_RENDERER_VERSION}</html>"
+
+    monkeypatch.setattr(graphs, "render_pyvis_network_graph", render)
+    monkeypatch.setattr(graphs, "PYVIS_PRERENDER_DIR", str(tmp_path))
+    graphs._pyvis_html_cache.clear()
+    yield calls
+    graphs._pyvis_html_cache.clear()
+
+
+def company_graph():
+    G = nx.DiGraph()
+    G.add_node("Alpha", Industry="Tech")
+    G.add_node("Beta", Industry="Tech")
+    G.add_edge("Alpha", "Beta")
+    return G
+
+
+def test_prerendered_path_carries_the_renderer_version(monkeypatch):
+    path = graphs.prerendered_graph_path("graph", "Alpha", root="out")
+
+    monkeypatch.setattr(graphs, "PYVIS_RENDERER_VERSION", "next")
+    new_path = graphs.prerendered_graph_path("graph", "Alpha", root="out")
+
+    assert new_path != path
+    assert os.path.dirname(new_path) == os.path.dirname(path) == os.path.join("out", "graph")
+
+
+def test_new_renderer_version_ignores_older_renderings(monkeypatch, renderings):
+    G = company_graph()
+    version = graphs.graph_version(G)
+    path = graphs.prerendered_graph_path(version, "Alpha")
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html>prerendered</html>")
+
+    assert graphs.create_pyvis_network_graph(G, "Alpha") == "<html>prerendered</html>"
+    assert renderings == []
+
+    # Neither the cached nor the prerendered HTML of the old renderer is served
+    monkeypatch.setattr(graphs, "PYVIS_RENDERER_VERSION", "next")
+    assert graphs.create_pyvis_network_graph(G, "Alpha") == "<html>Alpha vnext</html>"
+    assert graphs.create_pyvis_network_graph(G, "Alpha") == "<html>Alpha vnext</html>"
+    assert renderings == ["Alpha"]
@@ -0,0 +1,65 @@
+import importlib
+
+import dash
+import pytest
+
+from utils.data_service import DataService
+from utils.graphs import placeholder_figure
+
+
+@pytest.fixture(scope="module")
+def home():
+    dash.Dash(__name__, use_pages=True, pages_folder="")
+    # Outside of a pages folder scan, Dash does not pick up the layout itself
+    module = importlib.import_module("pages.home")
+    dash.page_registry[module.__name__]["layout"] = module.layout
+    return module
+
+
+@pytest.fixture
+def service(home, monkeypatch):
+    """Data service whose company graph failed to load, like a stale compact copy."""
+
+    def stale_graph():
+        raise RuntimeError("graph_objs/company_graph was not converted from company_graph.pkl")
+
+    def missing_copy():
+        raise FileNotFoundError("datasets/2014_us_cities.csv is missing")
+
+    service = DataService()
+    service.register("company_graph", stale_graph)
+    service.register("company_search_index", lambda: None)
+    service.register("gdp_initial_figure", lambda: placeholder_figure("GDP"))
+    service.register("gdp_frames", lambda: {"years": [], "z": []})
+    service.register("monthly_changes_heatmap", lambda: placeholder_figure("Returns"))
+    service.register("top_growing_companies_figure", missing_copy)
+    service.register("tech_companies_figure", missing_copy)
+    monkeypatch.setattr(home, "data_service", service)
+    return service
+
+
+def find(component, component_id):
+    if getattr(component, "id", None) == component_id:
+        return component
+    children = getattr(component, "children", None)
+    if not isinstance(children, (list, tuple)):
+        children = [children]
+    for child in children:
+        if isinstance(child, dash.development.base_component.Component):
+            found = find(child, component_id)
+            if found is not None:
+                return found
+    return None
+
+
+def test_home_renders_without_the_company_graph(home, service):
+    page = home.layout()
+
+    assert find(page, "expanded-industries").options == []
+    assert find(page, "company-dropdown") is not None
+
+
+def test_company_view_shows_a_message_without_the_company_graph(home, service):
+    view = home.update_graphs_and_info("All Companies", 1, [])
+    assert "not available" in view.children
+    assert home.search_companies("app", None) is dash.no_update
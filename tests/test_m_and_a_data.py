@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import m_and_a_data  # noqa: E402
+
+PAGES = {
+    1: [{"companyName": "Acme", "symbol": "ACM"}, {"companyName": "Beta", "symbol": "BET"}],
+    2: [{"companyName": "Gamma", "symbol": "GAM"}],
+    # A key that only appears from the third page on
+    3: [{"companyName": "Delta", "symbol": "DEL", "price": "12.5"}],
+    4: [],
+}
+
+
+class FeedServer:
+    """Local HTTP server serving PAGES, failing the pages listed in failing."""
+
+    def __init__(self):
+        self.failing = set()
+        self.requested = []
+        feed = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                page = int(parse_qs(urlparse(self.path).query)["page"][0])
+                feed.requested.append(page)
+                if page in feed.failing:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = json.dumps(PAGES[page]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/feed"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+
+@pytest.fixture
+def feed():
+    server = FeedServer()
+    yield server
+    server.server.shutdown()
+
+
+def run(feed, tmp_path):
+    return m_and_a_data.download(
+        total_pages=len(PAGES),
+        output_path=str(tmp_path / "mna.csv"),
+        checkpoint_dir=str(tmp_path / "pages"),
+        base_url=feed.url,
+        api_key="test",
+        max_workers=3,
+    )
+
+
+def test_download_writes_every_page_with_the_union_of_columns(feed, tmp_path):
+    assert run(feed, tmp_path) == []
+
+    df = pd.read_csv(tmp_path / "mna.csv", dtype=str, keep_default_na=False)
+    assert list(df.columns) == ["companyName", "symbol", "price"]
+    assert df["companyName"].tolist() == ["Acme", "Beta", "Gamma", "Delta"]
+    assert df["price"].tolist() == ["", "", "", "12.5"]
+    assert not (tmp_path / "pages").exists()
+
+
+def test_failed_run_keeps_the_previous_output_and_resumes(feed, tmp_path):
+    output = tmp_path / "mna.csv"
+    output.write_text("companyName,symbol\nPrevious,PRV\n")
+
+    feed.failing = {2}
+    assert run(feed, tmp_path) == [2]
+    assert output.read_text() == "companyName,symbol\nPrevious,PRV\n"
+
+    # The second run only asks for the page that failed
+    feed.failing = set()
+    feed.requested.clear()
+    assert run(feed, tmp_path) == []
+    assert feed.requested == [2]
+
+    df = pd.read_csv(output, dtype=str, keep_default_na=False)
+    assert df["companyName"].tolist() == ["Acme", "Beta", "Gamma", "Delta"]
+
+
+def test_interrupted_append_is_truncated_on_resume(feed, tmp_path):
+    feed.failing = {3}
+    run(feed, tmp_path)
+
+    # Rows appended after the last saved state, e.g. by a crash mid-page
+    with open(tmp_path / "pages" / m_and_a_data.PARTIAL_FILE, "a") as f:
+        f.write("Garbage,GRB\n")
+
+    feed.failing = set()
+    assert run(feed, tmp_path) == []
+    df = pd.read_csv(tmp_path / "mna.csv", dtype=str, keep_default_na=False)
+    assert df["companyName"].tolist() == ["Acme", "Beta", "Gamma", "Delta"]
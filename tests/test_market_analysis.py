@@ -0,0 +1,112 @@
+import importlib
+import json
+
+import dash
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_service import data_service
+from utils.market_overview import build_market_overview
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = dash.Dash(__name__, use_pages=True, pages_folder="")
+    # Outside of a pages folder scan, Dash does not pick up the layout itself
+    module = importlib.import_module("pages.market_analysis")
+    dash.page_registry[module.__name__]["layout"] = module.layout
+    return app
+
+
+@pytest.fixture
+def payload(monkeypatch):
+    dates = pd.bdate_range("2023-01-02", periods=300, name="date")
+    rng = np.random.default_rng(0)
+    indices = {
+        symbol: pd.DataFrame({"close": 100 + rng.normal(0, 1, len(dates)).cumsum()}, index=dates)
+        for symbol in ["^BVSP", "^GSPC", "^IXIC", "^DJI"]
+    }
+    payload = build_market_overview(indices)
+    monkeypatch.setitem(data_service._values, "market_overview", payload)
+    return payload
+
+
+def update(client, output, inputs):
+    response = client.post(
+        "/_dash-update-component",
+        json={"output": output, "outputs": _parse(output), "inputs": inputs, "changedPropIds": []},
+    )
+    assert response.status_code == 200, response.data
+    return json.loads(response.data)["response"]
+
+
+def _parse(output):
+    component_id, prop = output.rsplit(".", 1)
+    return {"id": component_id, "property": prop}
+
+
+def test_page_is_registered_at_the_navbar_link(app):
+    page = dash.page_registry["pages.market_analysis"]
+    assert page["path"] == "/market-analysis"
+
+    ids = set()
+
+    def collect(component):
+        if getattr(component, "id", None):
+            ids.add(component.id)
+        for child in getattr(component, "children", None) or []:
+            if isinstance(child, dash.development.base_component.Component):
+                collect(child)
+        child = getattr(component, "children", None)
+        if isinstance(child, dash.development.base_component.Component):
+            collect(child)
+
+    collect(page["layout"]())
+    assert {
+        "indices-data",
+        "market-overview-graph",
+        "grid1-bvsp-vs-gspc",
+        "grid2-bvsp-vs-ixic",
+        "grid3-bvsp-vs-dji",
+    } <= ids
+
+
+def test_store_is_filled_from_the_shared_payload(app, payload):
+    client = app.server.test_client()
+    outputs = [callback["output"] for callback in client.get("/_dash-dependencies").json]
+    assert "indices-data.data" in outputs
+    assert "market-overview-graph.figure" in outputs
+
+    data = update(
+        client,
+        "indices-data.data",
+        [{"id": "market-overview-graph", "property": "id", "value": "market-overview-graph"}],
+    )["indices-data"]["data"]
+    assert data["benchmark"] == "^BVSP"
+    assert set(data["rolling_corr"]) == {"^GSPC", "^IXIC", "^DJI"}
+    assert data["close"]["^GSPC"]["x"][0] == payload["dates"][0]
+
+
+def test_zoom_patches_the_visible_window(app, payload):
+    client = app.server.test_client()
+    relayout = {"xaxis.range[0]": "2023-03-01", "xaxis.range[1]": "2023-03-31"}
+
+    patch = update(
+        client,
+        "market-overview-graph.figure@" + _duplicate_suffix(client),
+        [{"id": "market-overview-graph", "property": "relayoutData", "value": relayout}],
+    )
+    operations = patch["market-overview-graph"]["figure"]["operations"]
+    # x and y of the four index lines, restricted to the sessions of March
+    assert len(operations) == 8
+    assert operations[0]["location"] == ["data", 0, "x"]
+    dates = operations[0]["params"]["value"]
+    assert dates[0] == "2023-03-01" and dates[-1] == "2023-03-31"
+
+
+def _duplicate_suffix(client):
+    for callback in client.get("/_dash-dependencies").json:
+        if callback["output"].startswith("market-overview-graph.figure@"):
+            return callback["output"].split("@", 1)[1]
+    raise AssertionError("The zoom callback is not registered")
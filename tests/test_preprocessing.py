@@ -0,0 +1,132 @@
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import preprocessing  # noqa: E402
+
+NAMES = pd.Series(
+    [
+        "Apple Inc.",
+        "Apple Hospitality REIT",
+        "Pineapple Co",
+        "Co-Diagnostics",
+        "Coca-Cola Co.",
+        "Co.Ltd Holdings",
+        "AT&T Inc.",
+        "ASP.NET Systems",
+        "Société Générale",
+        "Nestlé S.A.",
+        "İstanbul Holding",
+        "istanbul Partners",
+        "ſony Music",  # long s, matched by "s" when ignoring case
+        "Kellogg",  # Kelvin sign, matched by "k" when ignoring case
+        "Straße AG",
+        np.nan,
+        None,
+        "",
+        "3M Company",
+        "Alphabet (Google)",
+        "Meta_Platforms",
+    ]
+)
+
+QUERIES = [
+    "Apple",
+    "apple inc.",
+    "Co",
+    "Co.",
+    "Coca-Cola",
+    "AT&T",
+    ".NET",
+    "NET",
+    "Société",
+    "societe",
+    "Nestlé S.A.",
+    "İstanbul",
+    "Istanbul",
+    "Sony",
+    "Kellogg",
+    "STRASSE",
+    "Straße",
+    "3M",
+    "(Google)",
+    "Meta",
+    "Meta_Platforms",
+    "&",
+    "...",
+    " ",
+    "-",
+]
+
+
+def regex_scan(names, query):
+    mask = names.str.contains(r"\b" + re.escape(query) + r"\b", case=False, na=False)
+    return np.flatnonzero(mask.to_numpy()).tolist()
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_name_index_matches_the_regex_scan(query):
+    index = preprocessing.NameIndex(NAMES)
+    assert index.match(query) == regex_scan(NAMES, query)
+
+
+MNA = pd.DataFrame(
+    {
+        "Parent": ["Alpha", "Alpha", "Beta", "", "Gamma", "Beta", "Delta", "Alpha"],
+        "Child": ["One", "Two", "One", "Orphan", "Beta", "Three", "Alpha", "Two"],
+        "symbol": ["ALP", "ALP", np.nan, np.nan, "GAM", "BET", "ZZZ", "ALP2"],
+        "Industry": ["Tech", "Tech", "Retail", "Energy", "Media", "Retail", np.nan, "Health"],
+        "Year Acquired": [2001, 2005, 2010, 1999, 2015, 2020, 2021, 2022],
+        "Deal Date": [
+            "2001-01-01",
+            "2005-05-05",
+            "2010-10-10",
+            "1999-09-09",
+            "2015-01-15",
+            "2020-02-20",
+            np.nan,
+            "2022-12-12",
+        ],
+    }
+)
+US_MARKET_DATA = pd.DataFrame(
+    {"symbol": ["ALP", "BET", "GAM", "ALP", "OTHER"], "market_cap": [1.0, 2.0, 3.0, 4.0, 5.0]}
+)
+
+
+def graph_contents(G):
+    """Nodes in order with their attributes, and edges, with NaN made comparable."""
+
+    def comparable(value):
+        return "<NaN>" if pd.isna(value) else value
+
+    nodes = [
+        (node, {key: comparable(value) for key, value in data.items()})
+        for node, data in G.nodes(data=True)
+    ]
+    return nodes, list(G.edges())
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [
+        list(MNA.columns),
+        ["Parent", "Child", "symbol"],
+    ],
+)
+def test_bulk_graph_build_matches_the_row_by_row_build(columns):
+    mna = MNA[columns]
+
+    expected = preprocessing.build_company_graph_iterrows(mna, US_MARKET_DATA)
+    actual = preprocessing.build_company_graph(mna, US_MARKET_DATA)
+
+    assert graph_contents(actual) == graph_contents(expected)
+    # The row without a parent adds its nodes but no edge
+    assert "" in actual and "Orphan" in actual
+    assert not any("" in edge for edge in actual.edges())
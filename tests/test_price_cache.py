@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+from utils import data_loader, price_cache
+
+
+class StubProvider:
+    """Provider serving a fixed daily history, counting the calls it receives."""
+
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def __call__(self, ticker, start_date, provider):
+        self.calls.append(start_date)
+        return self.history.loc[pd.Timestamp(start_date) :]
+
+
+def daily_history(start, end):
+    dates = pd.bdate_range(start, end, name="date")
+    return pd.DataFrame({"close": range(len(dates))}, index=dates, dtype="float64")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_cache, "PRICE_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def set_last_session(monkeypatch, date):
+    monkeypatch.setattr(data_loader, "_last_complete_session", lambda: pd.Timestamp(date))
+
+
+def test_second_load_is_served_from_the_cache(monkeypatch):
+    set_last_session(monkeypatch, "2024-03-28")
+    provider = StubProvider(daily_history("2024-01-01", "2024-03-28"))
+
+    first = data_loader.load_stock_data("AAA", "2024-01-01", "stub", fetcher=provider, use_cache=True)
+    second = data_loader.load_stock_data("AAA", "2024-01-01", "stub", fetcher=provider, use_cache=True)
+
+    assert provider.calls == ["2024-01-01"]
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+
+def test_only_the_missing_tail_is_fetched(monkeypatch):
+    provider = StubProvider(daily_history("2024-01-01", "2024-02-29"))
+    set_last_session(monkeypatch, "2024-02-29")
+    data_loader.load_stock_data("AAA", "2024-01-01", "stub", fetcher=provider, use_cache=True)
+
+    set_last_session(monkeypatch, "2024-03-28")
+    provider.history = daily_history("2024-01-01", "2024-03-28")
+    df = data_loader.load_stock_data("AAA", "2024-01-01", "stub", fetcher=provider, use_cache=True)
+
+    assert provider.calls == ["2024-01-01", "2024-02-29"]
+    assert df.index[-1] == pd.Timestamp("2024-03-28")
+    assert df.index.is_unique
+
+
+def test_ticker_listed_after_the_start_date_is_not_fetched_again(monkeypatch):
+    set_last_session(monkeypatch, "2024-03-28")
+    # The provider has nothing before the listing date
+    provider = StubProvider(daily_history("2024-03-01", "2024-03-28"))
+
+    for _ in range(3):
+        df = data_loader.load_stock_data("NEW", "2024-01-01", "stub", fetcher=provider, use_cache=True)
+
+    assert provider.calls == ["2024-01-01"]
+    assert df.index[0] == pd.Timestamp("2024-03-01")
+
+
+def test_market_holiday_does_not_refetch_the_tail(monkeypatch):
+    # Good Friday 2024: the last business day had no session
+    provider = StubProvider(daily_history("2024-01-01", "2024-03-28"))
+    set_last_session(monkeypatch, "2024-03-28")
+    data_loader.load_stock_data("AAA", "2024-01-01", "stub", fetcher=provider, use_cache=True)
+
+    set_last_session(monkeypatch, "2024-03-29")
+    for _ in range(3):
+        df = data_loader.load_stock_data("AAA", "2024-01-01", "stub", fetcher=provider, use_cache=True)
+
+    # One tail request learns that the provider has nothing newer
+    assert provider.calls == ["2024-01-01", "2024-03-28"]
+    assert df.index[-1] == pd.Timestamp("2024-03-28")
+
+
+def test_failed_tail_refresh_serves_the_cached_bars(monkeypatch):
+    provider = StubProvider(daily_history("2024-01-01", "2024-02-29"))
+    set_last_session(monkeypatch, "2024-02-29")
+    cached = data_loader.load_stock_data("AAA", "2024-01-01", "stub", fetcher=provider, use_cache=True)
+
+    def failing(ticker, start_date, provider):
+        raise ConnectionError("provider down")
+
+    set_last_session(monkeypatch, "2024-03-28")
+    df = data_loader.load_stock_data("AAA", "2024-01-01", "stub", fetcher=failing, use_cache=True)
+
+    pd.testing.assert_frame_equal(df, cached, check_freq=False)
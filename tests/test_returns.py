@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from utils.returns import build_close_matrix, ytd_returns
+
+
+def frame(dates, closes):
+    return pd.DataFrame({"close": closes}, index=pd.DatetimeIndex(dates, name="date"))
+
+
+def test_ytd_returns():
+    close = build_close_matrix(
+        {
+            "UP": frame(["2023-12-29", "2024-01-02", "2024-03-28"], [100.0, 101.0, 110.0]),
+            # No prior year-end close
+            "NEW": frame(["2024-02-01", "2024-03-28"], [50.0, 55.0]),
+            # Stopped trading last year, its last close must not be carried into this year
+            "GONE": frame(["2023-06-30", "2023-12-29"], [10.0, 12.0]),
+        }
+    )
+
+    ytd = ytd_returns(close)
+
+    assert np.isclose(ytd["UP"], 10.0)
+    assert np.isnan(ytd["NEW"])
+    assert np.isnan(ytd["GONE"])
+
+
+def test_ytd_returns_of_an_empty_matrix():
+    assert ytd_returns(build_close_matrix({})).empty
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.rolling import rolling_corr, rolling_statistics, rolling_std
+
+
+def random_prices(n_rows=400, n_cols=4, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 100 + rng.normal(0, 1, (n_rows, n_cols)).cumsum(axis=0)
+    return pd.DataFrame(values, columns=[f"s{i}" for i in range(n_cols)])
+
+
+def with_gaps(df, seed=1):
+    df = df.copy()
+    rng = np.random.default_rng(seed)
+    for column in df.columns:
+        df.loc[rng.choice(len(df), 8, replace=False), column] = np.nan
+    return df
+
+
+# (prices, offset added to the prices given to utils.rolling). Standard
+# deviations and correlations do not change with a constant offset, so the
+# expected values are computed by pandas on the prices without it: pandas'
+# own rolling moments lose precision on prices around 1e6
+CASES = {
+    "plain": (random_prices(), 0.0),
+    "missing": (with_gaps(random_prices()), 0.0),
+    "offset": (random_prices(), 1e6),
+    "offset_missing": (with_gaps(random_prices(n_rows=3000)), 1e6),
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("window", [5, 50])
+def test_rolling_std_matches_pandas(case, window):
+    df, offset = CASES[case]
+    expected = df.rolling(window).std().to_numpy()
+
+    actual = rolling_std(df.to_numpy() + offset, window)
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-9)
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("window", [5, 50])
+def test_rolling_corr_against_a_benchmark_matches_pandas(case, window):
+    df, offset = CASES[case]
+    expected = df.rolling(window).corr(df["s0"]).to_numpy()
+
+    actual = rolling_corr(df.to_numpy() + offset, window, benchmark=0)
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-7)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_pairwise_rolling_corr_matches_pandas(case):
+    df, offset = CASES[case]
+    window = 20
+    expected = df.rolling(window).corr().to_numpy().reshape(len(df), df.shape[1], df.shape[1])
+
+    actual = rolling_corr(df.to_numpy() + offset, window)
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-7)
+
+
+def test_window_longer_than_the_series_is_all_missing():
+    df = random_prices(n_rows=10)
+
+    assert np.isnan(rolling_std(df.to_numpy(), 20)).all()
+    assert np.isnan(rolling_corr(df.to_numpy(), 20, benchmark=0)).all()
+    assert np.isnan(rolling_corr(df.to_numpy(), 20)).all()
+    assert df.rolling(20).std().isna().all().all()
+
+
+def test_rolling_statistics_match_pandas():
+    close, _ = CASES["missing"]
+    statistics = rolling_statistics(close, "s0", window=50)
+
+    pd.testing.assert_frame_equal(statistics["volatility"], close.rolling(50).std())
+    pd.testing.assert_frame_equal(
+        statistics["rolling_corr"], close.rolling(50).corr(close["s0"]), atol=1e-7
+    )
+    pd.testing.assert_frame_equal(
+        statistics["price_ratio"], close[["s0"]].to_numpy() / close, check_names=False
+    )
@@ -1,8 +1,18 @@
+# package imports
+import threading
+import time
+
 from openbb import obb
 
-# Function to check API credentials
-def verify_api_credentials(token):
-    """Attempts to log in and verify if OpenBB API credentials are valid."""
+from utils.settings import (
+    OPENBB_FAILURE_TTL,
+    OPENBB_REFRESH_MARGIN,
+    OPENBB_SESSION_TTL,
+)
+
+
+def _login(token):
+    """Log in to OpenBB and return "success", "fail" or "error: <message>"."""
     try:
         obb.account.login(pat=token)
         if obb.user.credentials:
@@ -12,3 +22,102 @@ def verify_api_credentials(token):
             return "fail"
     except Exception as e:
         return f"error: {str(e)}"
+
+
+class CredentialSession:
+    """
+    Process-wide cache of the OpenBB login.
+
+    A successful login is reused for ttl seconds and renewed in the background
+    refresh_margin seconds before it expires, so callers never wait for it
+    again. Failures are cached for failure_ttl seconds only, so a fixed token
+    is picked up quickly without every request retrying the login.
+
+    :param ttl: Lifetime of a successful login, in seconds
+    :param failure_ttl: Lifetime of a failed login, in seconds
+    :param refresh_margin: Seconds before expiry at which the login is renewed
+    """
+
+    def __init__(self, ttl, failure_ttl, refresh_margin):
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.refresh_margin = refresh_margin
+        self._status = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # Serializes logins, so concurrent callers share a single one
+        self._login_lock = threading.Lock()
+
+    def status(self, token):
+        """
+        Return the login status of a token, logging in only if no valid status is cached.
+
+        :param token: OpenBB personal access token
+        :return: "success", "fail" or "error: <message>"
+        """
+        cached = self._cached(token)
+        if cached is not None:
+            return cached
+
+        with self._login_lock:
+            # Another thread may have logged in while this one was waiting
+            cached = self._cached(token)
+            if cached is not None:
+                return cached
+            return self._store(token, _login(token))
+
+    def invalidate(self):
+        """Forget every cached login."""
+        with self._lock:
+            self._status.clear()
+
+    def _cached(self, token):
+        now = time.monotonic()
+        with self._lock:
+            item = self._status.get(token)
+            if item is None or item[1] <= now:
+                return None
+            status, expires_at = item
+            if (
+                status == "success"
+                and expires_at - now <= self.refresh_margin
+                and token not in self._refreshing
+            ):
+                self._refreshing.add(token)
+                threading.Thread(
+                    target=self._refresh, args=(token,), name="openbb-login", daemon=True
+                ).start()
+            return status
+
+    def _store(self, token, status):
+        ttl = self.ttl if status == "success" else self.failure_ttl
+        with self._lock:
+            self._status[token] = (status, time.monotonic() + ttl)
+        return status
+
+    def _refresh(self, token):
+        try:
+            with self._login_lock:
+                status = _login(token)
+            if status == "success":
+                self._store(token, status)
+            else:
+                # Keep the current login until it expires, the next call retries
+                print(f"Failed to refresh the OpenBB login: {status}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(token)
+
+
+# Process-wide session shared by the request threads
+credential_session = CredentialSession(
+    ttl=OPENBB_SESSION_TTL,
+    failure_ttl=OPENBB_FAILURE_TTL,
+    refresh_margin=OPENBB_REFRESH_MARGIN,
+)
+
+
+# Function to check API credentials
+def verify_api_credentials(token):
+    """Attempts to log in and verify if OpenBB API credentials are valid."""
+    return credential_session.status(token)
@@ -0,0 +1,97 @@
+# notes
+"""
+This file is used for the in-memory caches shared by the request handlers.
+"""
+
+# package imports
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class ByteLRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by the size of its values.
+
+    :param max_bytes: Maximum total size of the cached values, in bytes
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value of a key and mark it as recently used."""
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def set(self, key, value):
+        """
+        Cache a value, evicting the least recently used ones to stay under max_bytes.
+
+        Values larger than max_bytes are not cached.
+        """
+        size = sys.getsizeof(value)
+        with self._lock:
+            if key in self._items:
+                self._size -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        """Remove every cached value."""
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+class TTLCache:
+    """
+    Thread-safe cache whose entries expire ttl seconds after being set.
+
+    :param ttl: Lifetime of an entry, in seconds
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value of a key, or default if it is missing or expired."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        """Cache a value for ttl seconds."""
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.ttl)
+
+    def clear(self):
+        """Remove every cached value."""
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,494 @@
+# notes
+"""
+This file is used for the compact, memory-mappable storage of the company graph.
+
+Instead of a pickled networkx graph (a dict of dicts per node and edge) the
+graph is stored as a folder of NumPy arrays:
+
+- nodes get integer IDs in sorted name order; names are one UTF-8 blob plus offsets,
+- adjacency is stored in CSR form, both outgoing and incoming,
+- node attributes are columns: float64 for numbers (NaN when missing) and
+  int32 codes into a string table for text (-1 when missing).
+
+The arrays are opened with mmap so every worker shares the same pages, and
+CompactGraph answers the queries the pages need (membership, node
+attributes, ego graphs) without building the networkx graph.
+
+Ego graphs are served from a neighborhood index built once when the graph is
+loaded (build_neighborhood_index): for every radius up to a maximum, the
+sorted IDs of the nodes within that many hops, in CSR form. A lookup is then
+a slice, whatever the size of the graph.
+"""
+
+# package imports
+import hashlib
+import json
+import numbers
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+
+META_FILE = "meta.json"
+ARRAYS = (
+    "names_blob",
+    "names_offsets",
+    "out_indptr",
+    "out_indices",
+    "in_indptr",
+    "in_indices",
+)
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _encode_attribute(values):
+    """
+    Encode the values of one attribute (None when a node does not have it) as a column.
+
+    :param values: List of values, one per node in ID order
+    :return: Tuple (array, kind, table) where kind is "int", "float" or "str"
+    """
+    present = [v for v in values if not _is_missing(v)]
+    is_number = all(
+        isinstance(v, numbers.Number) and not isinstance(v, bool) for v in present
+    )
+
+    if is_number:
+        kind = "int" if all(isinstance(v, numbers.Integral) for v in present) else "float"
+        column = np.array(
+            [np.nan if _is_missing(v) else float(v) for v in values], dtype=np.float64
+        )
+        return column, kind, None
+
+    table = sorted({str(v) for v in present})
+    codes = {value: i for i, value in enumerate(table)}
+    column = np.array(
+        [-1 if _is_missing(v) else codes[str(v)] for v in values], dtype=np.int32
+    )
+    return column, "str", table
+
+
+def _csr(sources, targets, n):
+    """Build CSR (indptr, indices) arrays of the edges sources -> targets."""
+    order = np.lexsort((targets, sources))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32)
+
+
+def _unique_csr(sources, targets, n):
+    """Build CSR arrays of the pairs sources -> targets, without duplicates or self-loops."""
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    keep = sources != targets
+    keys = np.unique(sources[keep] * n + targets[keep])
+    return _csr(keys // n, keys % n, n)
+
+
+def _expand(indptr, indices, sources, middles):
+    """
+    Follow one more hop: pair every source with the CSR neighbors of its middle node.
+
+    :return: Tuple (sources, targets) of int64 arrays
+    """
+    starts = indptr[middles]
+    counts = indptr[middles + 1] - starts
+    # Position of every gathered neighbor inside indices
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    targets = indices[np.repeat(starts, counts) + offsets]
+    return np.repeat(sources, counts), targets.astype(np.int64)
+
+
+class CompactGraph:
+    """
+    Read-only directed graph backed by NumPy arrays.
+
+    Use CompactGraph.from_networkx to convert a graph and CompactGraph.load
+    to open a saved one.
+    """
+
+    def __init__(self, arrays, attributes, version=None):
+        self._arrays = arrays
+        self._attributes = attributes  # name -> (column, kind, table)
+        self._neighborhoods = {}  # radius -> (indptr, indices), see build_neighborhood_index
+        self.graph = {"version": version or self._digest()}
+
+    @classmethod
+    def from_networkx(cls, G):
+        """
+        Convert a networkx graph.
+
+        :param G: networkx DiGraph whose node names are strings
+        :return: CompactGraph
+        """
+        names = sorted(str(node) for node in G.nodes())
+        ids = {name: i for i, name in enumerate(names)}
+        n = len(names)
+
+        encoded = [name.encode("utf-8") for name in names]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        edges = np.array(
+            [(ids[str(u)], ids[str(v)]) for u, v in G.edges()], dtype=np.int64
+        ).reshape(-1, 2)
+        out_indptr, out_indices = _csr(edges[:, 0], edges[:, 1], n)
+        in_indptr, in_indices = _csr(edges[:, 1], edges[:, 0], n)
+
+        node_data = [None] * n
+        for node, data in G.nodes(data=True):
+            node_data[ids[str(node)]] = data
+        keys = sorted({key for data in node_data for key in data})
+        attributes = {
+            key: _encode_attribute([data.get(key) for data in node_data])
+            for key in keys
+        }
+
+        arrays = {
+            "names_blob": blob,
+            "names_offsets": offsets,
+            "out_indptr": out_indptr,
+            "out_indices": out_indices,
+            "in_indptr": in_indptr,
+            "in_indices": in_indices,
+        }
+        return cls(arrays, attributes, version=G.graph.get("version"))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Open a graph saved with save().
+
+        :param path: Folder of the saved graph
+        :param mmap: Memory-map the arrays instead of reading them
+        :return: CompactGraph
+        """
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAYS
+        }
+        attributes = {
+            key: (
+                np.load(os.path.join(path, f"attr_{i}.npy"), mmap_mode=mmap_mode),
+                info["kind"],
+                info["table"],
+            )
+            for i, (key, info) in enumerate(meta["attributes"].items())
+        }
+        return cls(arrays, attributes, version=meta["version"])
+
+    def save(self, path):
+        """
+        Save the graph as a folder of .npy arrays plus a JSON description.
+
+        :param path: Destination folder, created if needed
+        """
+        os.makedirs(path, exist_ok=True)
+
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), self._arrays[name])
+
+        meta_attributes = {}
+        for i, (key, (column, kind, table)) in enumerate(self._attributes.items()):
+            np.save(os.path.join(path, f"attr_{i}.npy"), column)
+            meta_attributes[key] = {"kind": kind, "table": table}
+
+        meta = {"version": self.graph["version"], "attributes": meta_attributes}
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _digest(self):
+        """Hash the arrays, used as version when none is given."""
+        digest = hashlib.sha1()
+        for name in ARRAYS:
+            digest.update(np.ascontiguousarray(self._arrays[name]).tobytes())
+        for key, (column, kind, table) in self._attributes.items():
+            digest.update(json.dumps([key, kind, table]).encode("utf-8"))
+            digest.update(np.ascontiguousarray(column).tobytes())
+        return digest.hexdigest()[:16]
+
+    # ---- Nodes
+
+    def __len__(self):
+        return len(self._arrays["names_offsets"]) - 1
+
+    def _name_bytes(self, node_id):
+        offsets = self._arrays["names_offsets"]
+        return self._arrays["names_blob"][offsets[node_id] : offsets[node_id + 1]].tobytes()
+
+    def node_name(self, node_id):
+        """Return the name of a node ID."""
+        return self._name_bytes(node_id).decode("utf-8")
+
+    def node_id(self, name):
+        """
+        Return the ID of a node name (binary search over the sorted names).
+
+        :param name: Node name
+        :return: Node ID, or -1 if the graph has no such node
+        """
+        if not isinstance(name, str):
+            return -1
+        target = name.encode("utf-8")
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self._name_bytes(low) == target:
+            return low
+        return -1
+
+    def __contains__(self, name):
+        return self.node_id(name) >= 0
+
+    def nodes(self):
+        """Return the names of all nodes, sorted."""
+        blob = self._arrays["names_blob"].tobytes()
+        offsets = self._arrays["names_offsets"]
+        return [
+            blob[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(len(self))
+        ]
+
+    def __iter__(self):
+        return iter(self.nodes())
+
+    def _attribute_value(self, key, node_id):
+        column, kind, table = self._attributes[key]
+        value = column[node_id]
+        if kind == "str":
+            return None if value < 0 else table[value]
+        if np.isnan(value):
+            return None
+        return int(value) if kind == "int" else float(value)
+
+    def node_attributes(self, name):
+        """
+        Return the attributes of a node, like G.nodes[name] on a networkx graph.
+
+        :param name: Node name
+        :return: Dictionary of the attributes the node has
+        """
+        node_id = self.node_id(name)
+        if node_id < 0:
+            raise KeyError(name)
+        return self._node_attributes(node_id)
+
+    def _node_attributes(self, node_id):
+        attributes = {}
+        for key in self._attributes:
+            value = self._attribute_value(key, node_id)
+            if value is not None:
+                attributes[key] = value
+        return attributes
+
+    def get_node_attributes(self, key):
+        """
+        Return the value of an attribute for every node having it, like nx.get_node_attributes.
+
+        :param key: Attribute name
+        :return: Dictionary mapping node names to values
+        """
+        if key not in self._attributes:
+            return {}
+        column, kind, table = self._attributes[key]
+        if kind == "str":
+            node_ids = np.flatnonzero(column >= 0)
+        else:
+            node_ids = np.flatnonzero(~np.isnan(column))
+        return {
+            self.node_name(i): self._attribute_value(key, i) for i in node_ids
+        }
+
+    def attribute_column(self, key):
+        """
+        Return the encoded column of an attribute.
+
+        :param key: Attribute name
+        :return: Tuple (column, kind, table), see _encode_attribute
+        """
+        return self._attributes[key]
+
+    def attribute_values(self, key):
+        """
+        Return the distinct values of an attribute.
+
+        :param key: Attribute name
+        :return: Set of values
+        """
+        column, kind, table = self._attributes[key]
+        if kind == "str":
+            return {table[code] for code in np.unique(column) if code >= 0}
+        values = np.unique(column[~np.isnan(column)])
+        return {int(v) if kind == "int" else float(v) for v in values}
+
+    # ---- Edges
+
+    def number_of_edges(self):
+        return len(self._arrays["out_indices"])
+
+    def edge_array(self):
+        """Return the edges as an (E, 2) array of (source, target) node IDs."""
+        indptr = self._arrays["out_indptr"]
+        sources = np.repeat(np.arange(len(self)), np.diff(indptr))
+        return np.column_stack([sources, self._arrays["out_indices"]]).astype(np.int64)
+
+    def successors(self, node_id):
+        """Return the IDs of the nodes a node points to."""
+        indptr = self._arrays["out_indptr"]
+        return self._arrays["out_indices"][indptr[node_id] : indptr[node_id + 1]]
+
+    def predecessors(self, node_id):
+        """Return the IDs of the nodes pointing to a node."""
+        indptr = self._arrays["in_indptr"]
+        return self._arrays["in_indices"][indptr[node_id] : indptr[node_id + 1]]
+
+    def build_neighborhood_index(self, max_radius=2):
+        """
+        Precompute, for every node, the sorted IDs of the nodes within 1..max_radius hops.
+
+        Edge direction is ignored and a node is not part of its own
+        neighborhood. Each radius is stored in CSR form; radius 2 holds the
+        union of every neighbor's neighbors, so its size grows with the square
+        of the degree of the hubs.
+
+        :param max_radius: Largest radius served from the index, 0 drops the index
+        :return: The graph, for chaining
+        """
+        n = len(self)
+        edges = self.edge_array()
+        out_sources, out_targets = edges[:, 0], edges[:, 1]
+        first = _unique_csr(
+            np.concatenate([out_sources, out_targets]),
+            np.concatenate([out_targets, out_sources]),
+            n,
+        )
+
+        neighborhoods = {1: first} if max_radius >= 1 else {}
+        indptr, indices = first
+        for radius in range(2, max_radius + 1):
+            # Pairs (node, node within radius - 1 hops), extended by one hop
+            previous_indptr, previous_indices = neighborhoods[radius - 1]
+            sources = np.repeat(np.arange(n), np.diff(previous_indptr))
+            middles = np.asarray(previous_indices, dtype=np.int64)
+            far_sources, far_targets = _expand(indptr, indices, sources, middles)
+            neighborhoods[radius] = _unique_csr(
+                np.concatenate([sources, far_sources]),
+                np.concatenate([middles, far_targets]),
+                n,
+            )
+
+        self._neighborhoods = neighborhoods
+        return self
+
+    def neighborhood_radius(self):
+        """Return the largest radius served from the neighborhood index (0 without index)."""
+        return max(self._neighborhoods, default=0)
+
+    def neighbors(self, node_id):
+        """Return the sorted IDs of the nodes connected to a node in either direction."""
+        if 1 in self._neighborhoods:
+            indptr, indices = self._neighborhoods[1]
+            return indices[indptr[node_id] : indptr[node_id + 1]]
+        return np.union1d(self.successors(node_id), self.predecessors(node_id))
+
+    def ego_node_ids(self, name, radius=1):
+        """
+        Return the IDs of the nodes within radius hops of a node, ignoring edge direction.
+
+        Radii covered by the neighborhood index are a lookup, larger ones a
+        breadth-first search.
+
+        :param name: Name of the center node
+        :param radius: Number of hops
+        :return: Sorted array of node IDs
+        """
+        node_id = self.node_id(name)
+        if node_id < 0:
+            raise KeyError(name)
+
+        if radius in self._neighborhoods:
+            indptr, indices = self._neighborhoods[radius]
+            neighborhood = indices[indptr[node_id] : indptr[node_id + 1]]
+            position = np.searchsorted(neighborhood, node_id)
+            return np.insert(neighborhood.astype(np.int64), position, node_id)
+
+        reached = np.array([node_id], dtype=np.int64)
+        frontier = reached
+        for _ in range(radius):
+            if len(frontier) == 0:
+                break
+            candidates = np.unique(
+                np.concatenate([self.neighbors(i) for i in frontier])
+            )
+            frontier = np.setdiff1d(candidates, reached, assume_unique=True)
+            reached = np.union1d(reached, frontier)
+        return reached
+
+    def subgraph(self, node_ids):
+        """
+        Build the networkx subgraph induced by a set of nodes, with their attributes.
+
+        :param node_ids: Array of node IDs
+        :return: networkx DiGraph
+        """
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        H = nx.DiGraph()
+        H.add_nodes_from(
+            (self.node_name(i), self._node_attributes(i)) for i in node_ids
+        )
+        for i in node_ids:
+            targets = self.successors(i)
+            targets = targets[np.isin(targets, node_ids)]
+            source = self.node_name(i)
+            H.add_edges_from((source, self.node_name(j)) for j in targets)
+        return H
+
+    def ego_graph(self, name, radius=1):
+        """
+        Equivalent of nx.ego_graph(G, name, radius=radius, undirected=True).
+
+        :param name: Name of the center node
+        :param radius: Number of hops
+        :return: networkx DiGraph
+        """
+        return self.subgraph(self.ego_node_ids(name, radius))
+
+    def to_networkx(self):
+        """Build the full networkx graph."""
+        H = self.subgraph(np.arange(len(self)))
+        H.graph.update(self.graph)
+        return H
+
+
+def convert_pickle(pickle_path, output_path):
+    """
+    Convert a pickled networkx graph into the compact format.
+
+    :param pickle_path: Path of the pickled graph
+    :param output_path: Destination folder
+    """
+    import pickle
+
+    with open(pickle_path, "rb") as f:
+        data = f.read()
+    G = pickle.loads(data)
+    # Same version as the pickle, so prerendered HTML stays valid
+    G.graph["version"] = hashlib.sha1(data).hexdigest()[:16]
+    CompactGraph.from_networkx(G).save(output_path)
+
+
+if __name__ == "__main__":
+    # python -m utils.compact_graph graph_objs/company_graph.pkl graph_objs/company_graph
+    convert_pickle(sys.argv[1], sys.argv[2])
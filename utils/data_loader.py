@@ -2,63 +2,278 @@ import numpy as np
 import pandas as pd
 from openbb import obb
 import datetime
+import hashlib
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from utils.compact_graph import META_FILE, CompactGraph
+from utils.datasets import load_dataset
+from utils.price_cache import (
+    merge_price_frames,
+    normalize_price_frame,
+    read_cache_meta,
+    read_cached_prices,
+    write_cached_prices,
+)
+from utils.returns import build_close_matrix, period_returns
+from utils.settings import (
+    COMPANY_GRAPH_DIR,
+    COMPANY_GRAPH_PICKLE,
+    COMPANY_GRAPH_RADII,
+    PRICE_CACHE_ENABLED,
+    PRICE_FETCH_BACKOFF,
+    PRICE_FETCH_MAX_RETRIES,
+    PRICE_FETCH_MAX_WORKERS,
+)
+from utils.throttle import call_with_retry, get_rate_limiter
 
 # General configs
 obb.user.preferences.output_type = "dataframe"
 
+# How far after the requested start date the cached history may begin and
+# still be considered complete (weekends and market holidays)
+CACHE_HEAD_TOLERANCE = pd.Timedelta(days=7)
+
+# Indices shown in the market overview, the IBOVESPA first
+MAIN_INDICES = ["^BVSP", "^GSPC", "^IXIC", "^DJI"]
+
+# Maximum number of requests per second sent to each provider
+PROVIDER_RATE_LIMITS = {
+    "yfinance": 4,
+    "fmp": 5,
+    "polygon": 5,
+    "intrinio": 5,
+    "tiingo": 5,
+}
+
 
-def load_stock_data(ticker, start_date, provider):
+def fetch_stock_data(ticker, start_date, provider):
     """
-    Load stock data using OpenBB API or any other API.
+    Fetch daily bars from the provider through the OpenBB API.
 
     :param ticker: Stock ticker symbol
+    :param start_date: First date to fetch (YYYY-MM-DD)
     :param provider: Data provider for stock data
     :return: DataFrame with stock data
     """
-    # Replace with your actual data loading logic
-    df = obb.equity.price.historical(ticker, start_date, provider=provider)
-    return df
+    return obb.equity.price.historical(ticker, start_date, provider=provider)
 
 
-def calculate_monthly_returns(tickers, provider):
+def _last_complete_session():
+    """Return the date of the last trading session that has already closed."""
+    return pd.Timestamp.today().normalize() - pd.offsets.BDay(1)
+
+
+def load_stock_data(ticker, start_date, provider, fetcher=None, use_cache=None):
     """
-    Calculate monthly returns for given tickers and return a DataFrame.
+    Load stock data from the local price cache, fetching only what is missing.
+
+    Cached history is read first; if it covers the requested start date only
+    the bars after the last cached session are requested from the provider.
+    Bars of the current (still open) session are returned but never cached.
+
+    A history starting after the requested date (a ticker listed later) is
+    complete once the provider was asked from that date, and a history ending
+    before the last business day (a market holiday) is up to date once the
+    provider was asked after that day closed; both are recorded in the cache
+    metadata so neither is downloaded again.
+
+    :param ticker: Stock ticker symbol
+    :param start_date: First date of the history (YYYY-MM-DD)
+    :param provider: Data provider for stock data
+    :param fetcher: Callable (ticker, start_date, provider) -> DataFrame used to
+        reach the provider, defaults to fetch_stock_data
+    :param use_cache: Read and update the price cache (defaults to PRICE_CACHE_ENABLED)
+    :return: DataFrame with stock data
+    """
+    fetcher = fetcher or fetch_stock_data
+    if use_cache is None:
+        use_cache = PRICE_CACHE_ENABLED
+    if not use_cache:
+        return fetcher(ticker, start_date, provider)
+
+    start = pd.Timestamp(start_date)
+    last_session = _last_complete_session()
+    cached = read_cached_prices(ticker, provider)
+
+    head_complete = up_to_date = False
+    if cached is not None:
+        meta = read_cache_meta(ticker, provider)
+        # The first date the provider was asked for; it has nothing before the
+        # first cached bar when that date is earlier
+        requested_start = pd.Timestamp(meta.get("start", cached.index[0]))
+        head_complete = (
+            cached.index[0] <= start + CACHE_HEAD_TOLERANCE or requested_start <= start
+        )
+        # The provider had nothing newer when asked after the last closed session
+        checked = pd.Timestamp(meta.get("checked", cached.index[-1]))
+        up_to_date = max(cached.index[-1], checked) >= last_session
+
+    if not head_complete:
+        # Nothing usable on disk, download the full range
+        df = normalize_price_frame(fetcher(ticker, start_date, provider))
+        requested_start = start
+    elif up_to_date:
+        # The cache already holds every closed session
+        return cached.loc[start:]
+    else:
+        # Only request the tail, starting at the last cached bar so it is refreshed
+        tail_start = cached.index[-1].strftime("%Y-%m-%d")
+        try:
+            fresh = fetcher(ticker, tail_start, provider)
+        except Exception as e:
+            print(f"Failed to refresh {ticker} from {provider}, using cached data: {e}")
+            return cached.loc[start:]
+        df = merge_price_frames(cached, fresh)
+
+    # The current session is still open, keep its bar out of the cache
+    closed = df[df.index < pd.Timestamp.today().normalize()]
+    if not closed.empty:
+        write_cached_prices(
+            ticker,
+            provider,
+            closed,
+            meta={
+                "start": requested_start.strftime("%Y-%m-%d"),
+                "checked": last_session.strftime("%Y-%m-%d"),
+            },
+        )
+
+    return df.loc[start:]
+
+
+def load_many_stock_data(
+    tickers,
+    start_date,
+    provider,
+    max_workers=None,
+    fetcher=None,
+    use_cache=None,
+    skip_failed=False,
+):
+    """
+    Load stock data for several tickers concurrently.
+
+    Tickers are loaded on a bounded thread pool; requests reaching the
+    provider are spaced by the provider rate limit and retried with
+    exponential backoff.
 
     :param tickers: List of stock ticker symbols
+    :param start_date: First date of the history (YYYY-MM-DD)
     :param provider: Data provider for stock data
-    :return: DataFrame with monthly returns for all tickers
+    :param max_workers: Maximum number of tickers in flight (defaults to PRICE_FETCH_MAX_WORKERS)
+    :param fetcher: Callable (ticker, start_date, provider) -> DataFrame, defaults to fetch_stock_data
+    :param use_cache: Read and update the price cache (defaults to PRICE_CACHE_ENABLED)
+    :param skip_failed: Leave out (and log) the tickers that still fail after the
+        retries instead of raising
+    :return: Dictionary mapping each ticker to its DataFrame, in the order of tickers
     """
-    data_store = {}  # Dictionary to store dataframes for each ticker
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+
+    max_workers = max_workers or PRICE_FETCH_MAX_WORKERS
+    throttled_fetcher = partial(
+        call_with_retry,
+        fetcher or fetch_stock_data,
+        retries=PRICE_FETCH_MAX_RETRIES,
+        backoff=PRICE_FETCH_BACKOFF,
+        limiter=get_rate_limiter(provider, PROVIDER_RATE_LIMITS.get(provider, 5)),
+    )
+
+    def load(ticker):
+        try:
+            return load_stock_data(
+                ticker,
+                start_date,
+                provider,
+                fetcher=throttled_fetcher,
+                use_cache=use_cache,
+            )
+        except Exception as e:
+            if not skip_failed:
+                raise
+            print(f"Skipping {ticker}, its data could not be loaded: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+        frames = executor.map(load, tickers)
+        return {ticker: df for ticker, df in zip(tickers, frames) if df is not None}
+
 
-    # Define the date range
+def _ten_year_start_date():
+    """Return the start date (YYYY-MM-DD) of the ten-year history used by the app."""
     end_date = pd.Timestamp.today()  # Today
     start_date = end_date - pd.DateOffset(years=10)
-    start_date = start_date.strftime("%Y-%m-%d")
+    return start_date.strftime("%Y-%m-%d")
 
-    for ticker in tickers:
-        # Load stock data
-        df = load_stock_data(ticker, start_date, provider=provider)
 
-        # Ensure index is a datetime index
-        df.index = pd.to_datetime(df.index)
+def load_main_indices_stock_data(provider="yfinance", max_workers=None, fetcher=None):
+    """
+    Load ten years of daily bars of the main indices concurrently.
 
-        # Resample to get last price of each month
-        monthly_price = df["close"].resample("ME").last()
+    An index that cannot be loaded is left out, so the others are still shown.
 
-        # Calculate monthly percentage change
-        monthly_return = monthly_price.pct_change() * 100  # Convert to percentage
+    :param provider: Data provider for stock data
+    :param max_workers: Maximum number of indices fetched concurrently
+    :param fetcher: Callable (ticker, start_date, provider) -> DataFrame, defaults to fetch_stock_data
+    :return: Dictionary mapping the index symbols of MAIN_INDICES that loaded to their DataFrame
+    """
+    indices = load_many_stock_data(
+        MAIN_INDICES,
+        _ten_year_start_date(),
+        provider=provider,
+        max_workers=max_workers,
+        fetcher=fetcher,
+        skip_failed=True,
+    )
+    if not indices:
+        raise RuntimeError("None of the main indices could be loaded")
+    return indices
 
-        # Store monthly return DataFrame in the dictionary
-        data_store[ticker] = monthly_return
 
-    # Combine all monthly returns into a single DataFrame
-    combined_df = pd.DataFrame(data_store)
+def calculate_monthly_returns(tickers, provider, max_workers=None):
+    """
+    Calculate monthly returns for given tickers and return a DataFrame.
 
-    return combined_df
+    :param tickers: List of stock ticker symbols
+    :param provider: Data provider for stock data
+    :param max_workers: Maximum number of tickers fetched concurrently
+    :return: DataFrame with monthly returns for all tickers
+    """
+    return calculate_period_returns(
+        tickers, provider, periods=("monthly",), max_workers=max_workers
+    )["monthly"]
+
+
+def calculate_period_returns(
+    tickers, provider, periods=("weekly", "monthly", "quarterly", "ytd"), max_workers=None
+):
+    """
+    Calculate several period returns for given tickers over the last ten years.
+
+    The closes of all tickers are aligned into one wide matrix once and every
+    period is computed on that matrix.
+
+    :param tickers: List of stock ticker symbols
+    :param provider: Data provider for stock data
+    :param periods: Names of the periods to compute (see utils.returns.PERIOD_RULES, plus "ytd")
+    :param max_workers: Maximum number of tickers fetched concurrently
+    :return: Dictionary mapping each period name to its returns in percent
+    """
+    # Load stock data for every ticker concurrently
+    stock_data = load_many_stock_data(
+        tickers, _ten_year_start_date(), provider=provider, max_workers=max_workers
+    )
+
+    close_matrix = build_close_matrix(stock_data)
+    return period_returns(close_matrix, periods)
 
 
 def load_state_gdp():
-    df = pd.read_csv("./datasets/combined_summary_2000_2023.csv")
+    df = load_dataset("state_gdp")
     melted_data = df.melt(
         id_vars=["GeoFIPS", "State", "GeoName", "Unit"],
         value_vars=[str(year) for year in range(2000, 2024)],
@@ -67,3 +282,49 @@ def load_state_gdp():
     )
 
     return melted_data
+
+
+def load_company_graph(
+    path=COMPANY_GRAPH_PICKLE,
+    compact_path=COMPANY_GRAPH_DIR,
+    index_radius=max(COMPANY_GRAPH_RADII),
+):
+    """
+    Load the M&A company graph built by scripts/preprocessing.py.
+
+    The compact, memory-mapped format is used when it exists so every worker
+    shares the same pages; otherwise the pickled networkx graph is loaded and
+    converted. The hash of the pickle is used as the graph version, which keys
+    the cached and prerendered network renderings. A compact graph that was
+    not converted from the current pickle is refused.
+
+    The neighborhood index serving the ego graphs is built here, up to the
+    largest radius offered by the network view.
+
+    :param path: Path of the pickled networkx graph
+    :param compact_path: Folder of the graph in the compact format
+    :param index_radius: Largest radius of the neighborhood index
+    :return: CompactGraph
+    """
+    data = None
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read()
+    version = hashlib.sha1(data).hexdigest()[:16] if data is not None else None
+
+    if compact_path and os.path.exists(os.path.join(compact_path, META_FILE)):
+        G = CompactGraph.load(compact_path)
+        if version is not None and G.graph["version"] != version:
+            raise RuntimeError(
+                f"{compact_path} (version {G.graph['version']}) was not converted "
+                f"from {path} (version {version}), rebuild it with "
+                f"`python -m utils.compact_graph {path} {compact_path}`"
+            )
+    else:
+        if data is None:
+            raise FileNotFoundError(f"{path} is missing, run scripts/preprocessing.py")
+        nx_graph = pickle.loads(data)
+        nx_graph.graph["version"] = version
+        G = CompactGraph.from_networkx(nx_graph)
+
+    return G.build_neighborhood_index(index_radius)
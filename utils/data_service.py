@@ -0,0 +1,216 @@
+# notes
+"""
+This file is used for sharing the datasets the pages need.
+Pages register a loader for each dataset instead of loading it at import time.
+Eager (local, fast) datasets are loaded once before gunicorn forks its workers
+so every worker shares them copy-on-write; the rest are warmed up in the
+background after the fork and served lazily, so a slow upstream API never
+blocks a worker from starting.
+
+A failed load is not retried before a delay (DATA_RETRY_DELAY): meanwhile
+get() returns its default at once, so an upstream that is down neither blocks
+the requests for their whole timeout nor receives a new load per page view.
+
+Datasets registered with a refresh interval are reloaded by a background
+thread of each process; the previous value keeps being served until the new
+one is ready, and is kept if the reload fails.
+
+Values handed out by the service are shared between requests and must be
+treated as read-only.
+"""
+
+# package imports
+import os
+import threading
+import time
+
+from utils.settings import DATA_RETRY_DELAY
+
+
+class DataService:
+    """Registry of named datasets that are loaded once and shared."""
+
+    def __init__(self, retry_delay=DATA_RETRY_DELAY):
+        """
+        :param retry_delay: Seconds after a failed load during which the dataset is not loaded again
+        """
+        self.retry_delay = retry_delay
+        self._loaders = {}
+        self._eager = set()
+        self._refresh_intervals = {}
+        self._refresher_pids = {}
+        self._values = {}
+        self._loading = {}
+        self._failed_at = {}
+        self._preloading = False
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, eager=False, refresh_interval=None):
+        """
+        Register the loader of a dataset.
+
+        :param name: Name used to fetch the dataset
+        :param loader: Callable without arguments returning the dataset
+        :param eager: Load the dataset in preload(), i.e. before workers are forked
+        :param refresh_interval: Seconds between background reloads, None never reloads
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            if eager:
+                self._eager.add(name)
+            if refresh_interval:
+                self._refresh_intervals[name] = refresh_interval
+
+    def is_ready(self, name):
+        """Return True if the dataset has been loaded."""
+        with self._lock:
+            return name in self._values
+
+    def get(self, name, timeout=None, default=None):
+        """
+        Return a dataset, loading it if needed.
+
+        Without a timeout the dataset is loaded in the calling thread (or the
+        call waits for the thread already loading it). With a timeout the load
+        runs in the background and default is returned if it is not done in time.
+        Within retry_delay of a failed load, default is returned right away.
+
+        :param name: Name of the dataset
+        :param timeout: Maximum number of seconds to wait, None waits until loaded
+        :param default: Value returned if the dataset is not available
+        :return: The dataset, or default
+        """
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            if self._backing_off(name):
+                return default
+        if name not in self._loaders:
+            raise KeyError(f"No loader registered for dataset '{name}'")
+
+        event, owner = self._claim(name)
+        if owner:
+            if timeout is None:
+                self._load(name, event)
+            else:
+                self._start_background_load(name, event)
+        event.wait(timeout)
+
+        with self._lock:
+            return self._values.get(name, default)
+
+    def preload(self):
+        """
+        Load every eager dataset in the calling process.
+
+        Refresh threads are not started here, since this runs in the gunicorn
+        master before the fork; warm_up() starts them in each worker.
+        """
+        self._preloading = True
+        try:
+            for name in sorted(self._eager):
+                self.get(name)
+        finally:
+            self._preloading = False
+
+    def warm_up(self, names=None):
+        """
+        Start loading datasets in the background without waiting for them.
+
+        :param names: Names of the datasets to load (defaults to all registered
+            datasets); names without a registered loader are ignored
+        """
+        for name in list(self._loaders) if names is None else names:
+            if name not in self._loaders:
+                continue
+            with self._lock:
+                loaded = name in self._values
+                backing_off = self._backing_off(name)
+            if loaded:
+                # Refresh threads do not survive a fork, restart them in this process
+                self._start_refresher(name)
+                continue
+            if backing_off:
+                continue
+            event, owner = self._claim(name)
+            if owner:
+                self._start_background_load(name, event)
+
+    def invalidate(self, name):
+        """Drop a loaded dataset (or a failed load) so the next get() loads it again."""
+        with self._lock:
+            self._values.pop(name, None)
+            self._failed_at.pop(name, None)
+
+    def _backing_off(self, name):
+        """Return True if the last load of a dataset failed less than retry_delay ago (lock held)."""
+        failed_at = self._failed_at.get(name)
+        return failed_at is not None and time.monotonic() - failed_at < self.retry_delay
+
+    def _claim(self, name):
+        """Return the event of the load in flight, and whether the caller must run it."""
+        with self._lock:
+            if name in self._loading:
+                return self._loading[name], False
+            event = threading.Event()
+            self._loading[name] = event
+            return event, True
+
+    def _start_background_load(self, name, event):
+        thread = threading.Thread(
+            target=self._load, args=(name, event), name=f"load-{name}", daemon=True
+        )
+        thread.start()
+
+    def _load(self, name, event):
+        loaded = False
+        try:
+            value = self._loaders[name]()
+            with self._lock:
+                self._values[name] = value
+                self._failed_at.pop(name, None)
+            loaded = True
+        except Exception as e:
+            # Leave the dataset unloaded so a get() after the retry delay loads it again
+            print(f"Failed to load dataset '{name}': {e}")
+            with self._lock:
+                self._failed_at[name] = time.monotonic()
+        finally:
+            with self._lock:
+                self._loading.pop(name, None)
+            event.set()
+        if loaded:
+            self._start_refresher(name)
+
+    def _start_refresher(self, name):
+        """Start the refresh thread of a dataset, once per process."""
+        with self._lock:
+            interval = self._refresh_intervals.get(name)
+            if self._preloading or not interval:
+                return
+            if self._refresher_pids.get(name) == os.getpid():
+                return
+            self._refresher_pids[name] = os.getpid()
+        thread = threading.Thread(
+            target=self._refresh_forever,
+            args=(name, interval),
+            name=f"refresh-{name}",
+            daemon=True,
+        )
+        thread.start()
+
+    def _refresh_forever(self, name, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                value = self._loaders[name]()
+            except Exception as e:
+                # Keep serving the previous value
+                print(f"Failed to refresh dataset '{name}': {e}")
+                continue
+            with self._lock:
+                self._values[name] = value
+
+
+# Process-wide instance used by the pages
+data_service = DataService()
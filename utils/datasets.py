@@ -0,0 +1,319 @@
+# notes
+"""
+This file is used for loading the CSV datasets in datasets/.
+Every dataset is declared once with the columns it is loaded with and their
+dtypes: categoricals for low-cardinality labels (sector, industry, state),
+float32 where the precision is enough. Text used as identifiers (symbols,
+company names) stays as plain Python strings so graphs built from it are
+unchanged.
+
+The first load of a dataset parses the CSV and writes a Parquet sidecar in
+datasets/.sidecars; later loads read the sidecar, which is much faster and
+keeps the dtypes. A sidecar is keyed by the size and modification time of its
+CSV and by the declared dtypes, so editing either rebuilds it.
+
+Third-party sources (those with a "url") are vendored copies: the app reads
+the local file, so pages render without network access. They are downloaded
+(or updated) with
+
+    python -m utils.datasets refresh [name ...]
+
+which also records their SHA-256 in datasets/vendored.json; both the copies
+and vendored.json are committed. The app never downloads them itself: a
+missing copy, a copy without a recorded checksum, or one that no longer
+matches it is refused instead of being plotted.
+"""
+
+# package imports
+import argparse
+import glob
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import pandas as pd
+import requests
+
+from utils.settings import DATASETS_DIR
+
+# Checksums of the vendored copies, written by refresh()
+CHECKSUM_FILE = "vendored.json"
+# Folder of the Parquet sidecars, inside the datasets folder
+SIDECAR_DIR = ".sidecars"
+
+GDP_YEARS = [str(year) for year in range(2000, 2024)]
+
+DATASETS = {
+    # Built by scripts/get_state_gdp.py. GDP stays float64: the largest
+    # states need more than the 7 significant digits of float32
+    "state_gdp": {
+        "filename": "combined_summary_2000_2023.csv",
+        "dtype": {
+            **{year: "float64" for year in GDP_YEARS},
+            "GeoFIPS": "object",
+            "GeoName": "category",
+            "Unit": "category",
+            "State": "category",
+        },
+    },
+    "us_market_data": {
+        "filename": "us_market_data.csv",
+        "dtype": {
+            "symbol": "object",
+            "name": "object",
+            "last_price": "float32",
+            "change": "float32",
+            "change_percent": "float32",
+            # Market caps go up to trillions and are copied into the company graph
+            "market_cap": "float64",
+        },
+    },
+    # Built by scripts/get_ticker_name.py and scripts/get_ticker_sector.py
+    "ticker_to_name": {
+        "filename": "ticker_to_name.csv",
+        "dtype": {"symbol": "object", "name": "object"},
+    },
+    "ticker_to_sector": {
+        "filename": "ticker_to_sector.csv",
+        "dtype": {"symbol": "object", "sector": "category"},
+    },
+    "acquisitions": {
+        "filename": "Acquisitions.csv",
+        "dtype": {
+            "Acquisitions ID": "object",
+            "Acquired Company": "object",
+            "Acquiring Company": "object",
+            "Year of acquisition announcement": "int16",
+            "Deal announced on": "object",
+            "Price": "object",
+            "Status": "category",
+            "Terms": "category",
+            "Acquisition Profile": "object",
+            "News": "object",
+            "News Link": "object",
+        },
+    },
+    # Built by scripts/preprocessing.py
+    "mna_with_symbols": {
+        "filename": "mna_with_symbols.csv",
+        "dtype": {
+            "Acquisitions ID": "object",
+            "Child": "object",
+            "Parent": "object",
+            # Copied into the company graph, kept as int64 so the graph is unchanged
+            "Year Acquired": "int64",
+            "Deal Date": "object",
+            "Price": "object",
+            "Status": "category",
+            "Terms": "category",
+            "Acquisition Profile": "object",
+            "News": "object",
+            "News Link": "object",
+            "Location": "category",
+            "City": "category",
+            "symbol": "object",
+            "Industry": "category",
+        },
+    },
+    # Third-party sources vendored into datasets/
+    "us_cities_2014": {
+        "url": "https://raw.githubusercontent.com/plotly/datasets/master/2014_us_cities.csv",
+        "filename": "2014_us_cities.csv",
+        "dtype": {"name": "object", "pop": "int32", "lat": "float32", "lon": "float32"},
+    },
+    "walmart_store_openings": {
+        "url": "https://raw.githubusercontent.com/plotly/datasets/master/1962_2006_walmart_store_openings.csv",
+        "filename": "1962_2006_walmart_store_openings.csv",
+        "dtype": {"storenum": "int32", "YEAR": "int16", "LAT": "float32", "LON": "float32"},
+    },
+}
+
+VENDORED_DATASETS = [name for name, spec in DATASETS.items() if "url" in spec]
+
+
+def dataset_path(name, root=None):
+    """
+    Return the location of the CSV file of a dataset.
+
+    :param name: Name of the dataset in DATASETS
+    :param root: Folder of the datasets (defaults to DATASETS_DIR)
+    :return: Path of the file
+    """
+    return os.path.join(root or DATASETS_DIR, DATASETS[name]["filename"])
+
+
+def _sidecar_path(name, path):
+    """Return the sidecar location for the current version of a CSV file and of its spec."""
+    stat = os.stat(path)
+    spec = json.dumps(DATASETS[name]["dtype"], sort_keys=True)
+    key = hashlib.sha1(f"{stat.st_size}-{stat.st_mtime_ns}-{spec}".encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(path), SIDECAR_DIR, f"{stem}-{key}.parquet")
+
+
+def _write_sidecar(df, sidecar):
+    """Write a sidecar, removing the ones of previous versions of the same file."""
+    stem = os.path.basename(sidecar).rsplit("-", 1)[0]
+    os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+    for stale in glob.glob(os.path.join(os.path.dirname(sidecar), f"{glob.escape(stem)}-*.parquet")):
+        try:
+            os.remove(stale)
+        except FileNotFoundError:
+            # Already removed by another process
+            pass
+
+    # Write next to the destination and rename, so readers never see a partial
+    # file; the temporary name is per process since workers may write it at once
+    tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, sidecar)
+
+
+def load_dataset(name, columns=None, root=None, use_sidecar=True):
+    """
+    Load a dataset with its declared dtypes.
+
+    :param name: Name of the dataset in DATASETS
+    :param columns: Columns to return (defaults to every declared column)
+    :param root: Folder of the datasets (defaults to DATASETS_DIR)
+    :param use_sidecar: Read and write the Parquet sidecar
+    :return: DataFrame, owned by the caller
+    """
+    dtype = DATASETS[name]["dtype"]
+    columns = list(columns or dtype)
+    path = dataset_path(name, root)
+
+    if use_sidecar:
+        sidecar = _sidecar_path(name, path)
+        if os.path.exists(sidecar):
+            try:
+                return pd.read_parquet(sidecar, columns=columns)
+            except Exception as e:
+                # An unreadable sidecar is rebuilt from the CSV
+                print(f"Ignoring unreadable sidecar {sidecar}: {e}")
+
+    df = pd.read_csv(path, usecols=list(dtype), dtype=dtype)
+    if use_sidecar:
+        try:
+            _write_sidecar(df, sidecar)
+        except Exception as e:
+            print(f"Failed to write the sidecar of {path}: {e}")
+    return df[columns]
+
+
+def file_sha256(path):
+    """Return the SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_checksums(root=None):
+    """Return the recorded checksums, keyed by file name."""
+    path = os.path.join(root or DATASETS_DIR, CHECKSUM_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_vendored_dataset(name):
+    """
+    Load the vendored copy of a dataset, once per process.
+
+    The returned frame is shared and must be treated as read-only. Failed
+    loads are not cached.
+
+    :param name: Name of the dataset in VENDORED_DATASETS
+    :return: DataFrame
+    """
+    spec = DATASETS[name]
+    path = dataset_path(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} is missing, run `python -m utils.datasets refresh {name}` "
+            "and commit it with datasets/vendored.json"
+        )
+
+    expected = read_checksums().get(spec["filename"])
+    if expected is None:
+        raise ValueError(
+            f"{path} has no recorded checksum, "
+            f"run `python -m utils.datasets refresh {name}`"
+        )
+    if file_sha256(path) != expected:
+        raise ValueError(
+            f"{path} does not match its recorded checksum, "
+            f"run `python -m utils.datasets refresh {name}`"
+        )
+
+    return load_dataset(name)
+
+
+def refresh(names=None, root=None, timeout=60):
+    """
+    Download datasets from their upstream URL and record their checksums.
+
+    :param names: Names of the datasets to download (defaults to every dataset)
+    :param root: Folder of the vendored copies (defaults to DATASETS_DIR)
+    :param timeout: Timeout of each download, in seconds
+    :return: Dictionary mapping file names to their new SHA-256
+    """
+    root = root or DATASETS_DIR
+    checksums = read_checksums(root)
+    updated = {}
+    for name in names or VENDORED_DATASETS:
+        spec = DATASETS[name]
+        path = dataset_path(name, root)
+        response = requests.get(spec["url"], timeout=timeout)
+        response.raise_for_status()
+
+        # Write next to the destination and rename, so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp_path, path)
+
+        updated[spec["filename"]] = checksums[spec["filename"]] = file_sha256(path)
+        print(f"{name}: {path} ({updated[spec['filename']][:12]})")
+
+    checksum_path = os.path.join(root, CHECKSUM_FILE)
+    tmp_path = f"{checksum_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checksums, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, checksum_path)
+    load_vendored_dataset.cache_clear()
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the vendored third-party datasets.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    refresh_parser = subparsers.add_parser("refresh", help="Download datasets again")
+    refresh_parser.add_argument("names", nargs="*", help="Datasets to download (default: all)")
+    subparsers.add_parser("verify", help="Check the vendored copies against their checksums")
+    args = parser.parse_args()
+
+    if args.command == "refresh":
+        unknown = set(args.names) - set(VENDORED_DATASETS)
+        if unknown:
+            parser.error(f"unknown datasets: {', '.join(sorted(unknown))}")
+        refresh(args.names or None)
+    else:
+        checksums = read_checksums()
+        for name in VENDORED_DATASETS:
+            spec = DATASETS[name]
+            path = dataset_path(name)
+            if not os.path.exists(path):
+                status = "missing"
+            elif spec["filename"] not in checksums:
+                status = "no recorded checksum"
+            elif checksums[spec["filename"]] != file_sha256(path):
+                status = "checksum mismatch"
+            else:
+                status = "ok"
+            print(f"{name}: {status}")
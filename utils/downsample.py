@@ -0,0 +1,96 @@
+# notes
+"""
+This file is used for reducing the number of points of line charts.
+A chart never needs more points than it has pixels across, so long daily
+histories are reduced to a bounded number of points before being shipped to
+the browser, keeping the points that preserve the shape of the line.
+"""
+
+# package imports
+import numpy as np
+
+
+def lttb_indices(y, n_out):
+    """
+    Select points with the largest-triangle-three-buckets algorithm.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the point kept in the previous
+    bucket and the average of the next bucket. Points are assumed evenly spaced.
+
+    :param y: Values without NaN
+    :param n_out: Number of points to keep
+    :return: Sorted array of the indices kept
+    """
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            # The last bucket is followed by the last point only
+            next_start, next_end = n - 1, n
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = y[next_start:next_end].mean()
+
+        x = np.arange(start, end)
+        area = np.abs((a - avg_x) * (y[start:end] - y[a]) - (a - x) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Select the minimum and maximum of each bucket, keeping every peak and trough.
+
+    :param y: Values without NaN
+    :param n_out: Maximum number of points to keep
+    :return: Sorted array of the indices kept
+    """
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, (n_out - 2) // 2 + 1).astype("int64")
+    selected = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            selected.append(start + int(np.argmin(y[start:end])))
+            selected.append(start + int(np.argmax(y[start:end])))
+    return np.unique(selected)
+
+
+METHODS = {"lttb": lttb_indices, "minmax": minmax_indices}
+
+
+def downsample(x, y, max_points, method="lttb"):
+    """
+    Reduce a line to at most max_points points.
+
+    Missing values are dropped before selecting points.
+
+    :param x: Positions of the points (e.g. dates)
+    :param y: Values, NaN or None marking missing values
+    :param max_points: Maximum number of points to keep, None keeps every point
+    :param method: "lttb" or "minmax"
+    :return: Tuple (x, y) of numpy arrays
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype="float64")
+    valid = np.flatnonzero(~np.isnan(y))
+    if max_points is None or len(valid) <= max_points:
+        return x[valid], y[valid]
+
+    selected = valid[METHODS[method](y[valid], max_points)]
+    return x[selected], y[selected]
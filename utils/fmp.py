@@ -0,0 +1,227 @@
+# notes
+"""
+This file is used for calling the Financial Modeling Prep (FMP) API.
+Requests share a pooled requests.Session, always carry a timeout, and their
+results are cached per endpoint. Concurrent requests for the same resource
+(e.g. several clicks on the same company) wait for a single upstream call.
+
+Bulk profile prefetches are shared between the gunicorn workers through a
+snapshot file: the first worker to take its lock calls the API, the others
+load the snapshot it wrote.
+"""
+
+# package imports
+import fcntl
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.cache import TTLCache
+from utils.settings import (
+    FMP_API_KEY,
+    FMP_BASE_URL,
+    FMP_CONSTITUENTS_TTL,
+    FMP_POOL_SIZE,
+    FMP_PROFILE_CHUNK_SIZE,
+    FMP_PROFILE_TTL,
+    FMP_TIMEOUT,
+)
+
+# Cached responses, one cache per endpoint
+_constituents_cache = TTLCache(FMP_CONSTITUENTS_TTL)
+_profile_cache = TTLCache(FMP_PROFILE_TTL)
+
+# Calls in flight, keyed by (endpoint, key)
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the pooled session of the current process.
+
+    The session is created lazily per process, so gunicorn workers never
+    share the sockets of a session opened before the fork.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            retry = Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+            )
+            adapter = HTTPAdapter(
+                pool_connections=FMP_POOL_SIZE,
+                pool_maxsize=FMP_POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def _request(path, **params):
+    """
+    Call an FMP endpoint and return the decoded JSON.
+
+    :param path: Endpoint path relative to FMP_BASE_URL (e.g. "/profile/AAPL")
+    :return: Decoded JSON response
+    """
+    response = get_session().get(
+        f"{FMP_BASE_URL}{path}",
+        params={**params, "apikey": FMP_API_KEY},
+        timeout=FMP_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _cached_call(cache, endpoint, key, fetch):
+    """
+    Return a cached value, or fetch it once even if several threads ask at the same time.
+
+    :param cache: TTLCache of the endpoint
+    :param endpoint: Name of the endpoint, used to group calls in flight
+    :param key: Cache key within the endpoint
+    :param fetch: Callable without arguments calling the API
+    :return: The cached or fetched value
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    with _in_flight_lock:
+        future = _in_flight.get((endpoint, key))
+        owner = future is None
+        if owner:
+            future = Future()
+            _in_flight[(endpoint, key)] = future
+
+    if not owner:
+        # Another thread is already calling the API for this key
+        return future.result()
+
+    try:
+        value = fetch()
+        cache.set(key, value)
+        future.set_result(value)
+        return value
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop((endpoint, key), None)
+
+
+def get_sp500_constituents():
+    """
+    Fetch the S&P 500 constituents.
+
+    :return: List of constituent dictionaries
+    """
+    return _cached_call(
+        _constituents_cache,
+        "sp500_constituent",
+        "sp500",
+        lambda: _request("/sp500_constituent"),
+    )
+
+
+def get_company_profile(symbol):
+    """
+    Fetch the profile of a company.
+
+    :param symbol: Stock ticker symbol
+    :return: Profile dictionary
+    """
+    return _cached_call(
+        _profile_cache,
+        "profile",
+        symbol,
+        lambda: _request(f"/profile/{symbol}")[0],
+    )
+
+
+def get_company_profiles(symbols, chunk_size=FMP_PROFILE_CHUNK_SIZE):
+    """
+    Fetch several profiles with the bulk profile endpoint and cache each of them.
+
+    :param symbols: Stock ticker symbols
+    :param chunk_size: Number of symbols per request
+    :return: Dictionary mapping symbols to profiles (unknown symbols are left out)
+    """
+    profiles = {}
+    for i in range(0, len(symbols), chunk_size):
+        chunk = symbols[i : i + chunk_size]
+        for profile in _request(f"/profile/{','.join(chunk)}"):
+            _profile_cache.set(profile["symbol"], profile)
+            profiles[profile["symbol"]] = profile
+    return profiles
+
+
+def get_shared_company_profiles(symbols, path, max_age):
+    """
+    Fetch profiles in bulk at most once per max_age across processes, and cache each of them.
+
+    The snapshot at path is reused while it is younger than max_age and holds
+    every symbol; otherwise the profiles are fetched with get_company_profiles
+    and the snapshot is replaced. A lock file keeps the workers from fetching
+    at the same time.
+
+    :param symbols: Stock ticker symbols
+    :param path: Path of the JSON snapshot shared by the processes
+    :param max_age: Maximum age of a reused snapshot, in seconds
+    :return: Dictionary mapping symbols to profiles (unknown symbols are left out)
+    """
+    if not symbols:
+        raise ValueError("No symbols to fetch, the snapshot is left unchanged")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            profiles = _read_profile_snapshot(path, symbols, max_age)
+            if profiles is not None:
+                for symbol, profile in profiles.items():
+                    _profile_cache.set(symbol, profile)
+                return profiles
+
+            profiles = get_company_profiles(symbols)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"symbols": list(symbols), "profiles": profiles}, f)
+            os.replace(tmp_path, path)
+            return profiles
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_profile_snapshot(path, symbols, max_age):
+    """Return the profiles of a snapshot, or None if it is missing, stale or lacks a symbol."""
+    try:
+        if time.time() - os.path.getmtime(path) >= max_age:
+            return None
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    wanted = set(symbols)
+    if not wanted <= set(snapshot["symbols"]):
+        return None
+    return {
+        symbol: profile for symbol, profile in snapshot["profiles"].items() if symbol in wanted
+    }
@@ -0,0 +1,158 @@
+# notes
+"""
+This file is used for computing the positions of the nodes of the company graph.
+The positions are computed once, when scripts/preprocessing.py builds the
+graph, and stored as the "x" and "y" node attributes; the network views draw
+them with physics disabled instead of running a layout in the browser on
+every page view.
+
+Each connected component is laid out on its own with a Fruchterman-Reingold
+force-directed layout vectorized with NumPy, scaled by its size, and the
+components are packed in rows, largest first. An M&A graph is made of many
+small components (an acquirer and its acquisitions), so the repulsion step,
+quadratic in the number of nodes of a component, stays cheap. Components
+larger than MAX_FORCE_DIRECTED_NODES are instead placed on a spiral in
+breadth-first order, which is linear in their size.
+"""
+
+# package imports
+import networkx as nx
+import numpy as np
+
+from utils.graph_overview import spiral_positions
+
+# Approximate distance between two neighboring nodes, in vis.js pixels
+NODE_SPACING = 50
+# Iterations of the force-directed layout of each component
+ITERATIONS = 100
+# Maximum number of node pairs held in memory by the repulsion step
+MAX_PAIRS = 2**22
+# Largest component laid out with the force-directed layout, whose iterations
+# cost O(n^2); under half a second per iteration at this size
+MAX_FORCE_DIRECTED_NODES = 2000
+
+
+def force_directed_positions(n, edges, iterations=ITERATIONS, seed=0):
+    """
+    Lay out a connected graph with the Fruchterman-Reingold algorithm.
+
+    :param n: Number of nodes
+    :param edges: (E, 2) array of node indices, direction is ignored
+    :param iterations: Number of iterations
+    :param seed: Seed of the initial positions
+    :return: (n, 2) array of positions within [-1, 1]
+    """
+    if n < 2:
+        return np.zeros((n, 2))
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1, 1, size=(n, 2))
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    k = 2 / np.sqrt(n)  # Ideal distance between nodes in the [-1, 1] square
+    temperatures = np.linspace(0.2, 0, iterations, endpoint=False)
+    chunk = max(MAX_PAIRS // n, 1)
+
+    for temperature in temperatures:
+        displacement = np.zeros((n, 2))
+
+        # Every pair of nodes repels, k^2 / distance
+        for start in range(0, n, chunk):
+            delta = pos[start : start + chunk, None, :] - pos[None, :, :]
+            distance2 = np.maximum((delta**2).sum(axis=-1), 1e-9)
+            repulsion = delta * (k**2 / distance2)[..., None]
+            displacement[start : start + chunk] += repulsion.sum(axis=1)
+
+        # Connected nodes attract, distance^2 / k
+        delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+        force = delta * (np.linalg.norm(delta, axis=1) / k)[:, None]
+        np.subtract.at(displacement, edges[:, 0], force)
+        np.add.at(displacement, edges[:, 1], force)
+
+        # Move every node along its displacement, by at most the temperature
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+
+    pos -= pos.mean(axis=0)
+    return pos / max(np.abs(pos).max(), 1e-9)
+
+
+def breadth_first_spiral_positions(n, edges):
+    """
+    Lay out a connected graph on a spiral, in breadth-first order from its most connected node.
+
+    Neighbors end up on nearby turns of the spiral. Used for the components
+    too large for force_directed_positions.
+
+    :param n: Number of nodes
+    :param edges: (E, 2) array of node indices, direction is ignored
+    :return: (n, 2) array of positions within [-1, 1]
+    """
+    if n < 2:
+        return np.zeros((n, 2))
+    H = nx.Graph()
+    H.add_nodes_from(range(n))
+    H.add_edges_from(np.asarray(edges, dtype=np.int64).reshape(-1, 2).tolist())
+    root = max(range(n), key=lambda node: (H.degree(node), -node))
+    order = [root] + [child for _, child in nx.bfs_edges(H, root)]
+
+    pos = np.empty((n, 2))
+    pos[order] = spiral_positions((0, 0), n, spacing=1)
+    return pos / np.abs(pos).max()
+
+
+def graph_layout(
+    G,
+    spacing=NODE_SPACING,
+    iterations=ITERATIONS,
+    seed=0,
+    max_force_directed_nodes=MAX_FORCE_DIRECTED_NODES,
+):
+    """
+    Compute the positions of the nodes of a graph.
+
+    :param G: networkx graph
+    :param spacing: Approximate distance between neighboring nodes
+    :param iterations: Iterations of the force-directed layout of each component
+    :param seed: Seed of the initial positions, so a rebuild gives the same layout
+    :param max_force_directed_nodes: Larger components are placed with
+        breadth_first_spiral_positions instead of the force-directed layout
+    :return: Dictionary mapping nodes to (x, y)
+    """
+    undirected = G.to_undirected(as_view=True)
+    components = sorted(
+        (sorted(component, key=str) for component in nx.connected_components(undirected)),
+        key=lambda component: (-len(component), str(component[0])),
+    )
+
+    # Half-width of each component, so the area grows with its number of nodes
+    radii = [
+        spacing * (np.sqrt(len(component)) if len(component) > 1 else 0.5)
+        for component in components
+    ]
+    row_width = np.sqrt(sum((2 * radius) ** 2 for radius in radii))
+
+    positions = {}
+    x = y = row_height = 0.0
+    for component, radius in zip(components, radii):
+        # Start a new row when the component does not fit in the current one
+        if x > 0 and x + 2 * radius > row_width:
+            x, y, row_height = 0.0, y + row_height + spacing, 0.0
+
+        index = {node: i for i, node in enumerate(component)}
+        # Sorted so the sums, and the layout, do not depend on the hash seed
+        edges = sorted(
+            tuple(sorted((index[u], index[v])))
+            for u, v in undirected.subgraph(component).edges()
+        )
+        if len(component) > max_force_directed_nodes:
+            pos = breadth_first_spiral_positions(len(component), edges)
+        else:
+            pos = force_directed_positions(len(component), edges, iterations, seed)
+
+        center = np.array([x + radius, y + radius])
+        for node, (px, py) in zip(component, center + radius * pos):
+            positions[node] = (float(px), float(py))
+        x += 2 * radius + spacing
+        row_height = max(row_height, 2 * radius)
+
+    return positions
@@ -0,0 +1,167 @@
+# notes
+"""
+This file is used for the level-of-detail view of the full company graph.
+Drawing every company and acquisition of the M&A graph makes the browser run
+a physics simulation over thousands of nodes. The "All Companies" view instead
+shows one super-node per industry, linked by edges weighted with the number of
+acquisitions between the two industries. Industries can be expanded on demand
+into their companies, up to a limit, the rest staying aggregated.
+
+Every position is computed here, on the server, so the browser draws the
+view with physics disabled. The sizes of the view are bounded by the number of
+industries and the expansion limit, not by the size of the graph.
+"""
+
+# package imports
+import networkx as nx
+import numpy as np
+
+from utils.compact_graph import CompactGraph
+from utils.settings import COMPANY_GRAPH_EXPAND_LIMIT
+
+# Label of the companies without industry
+UNKNOWN_INDUSTRY = "Unknown"
+# Half-width of the area of the industry super-nodes, in vis.js pixels
+CLUSTER_SCALE = 600
+# Distance between the companies of an expanded industry, in vis.js pixels
+MEMBER_SPACING = 30
+GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+
+def spiral_positions(center, count, spacing=MEMBER_SPACING):
+    """
+    Place points evenly on a sunflower spiral around a center.
+
+    :param center: (x, y) of the center
+    :param count: Number of points
+    :param spacing: Approximate distance between neighboring points
+    :return: (count, 2) array of positions
+    """
+    k = np.arange(1, count + 1)
+    radius = spacing * np.sqrt(k)
+    angle = k * GOLDEN_ANGLE
+    return np.asarray(center) + np.column_stack([radius * np.cos(angle), radius * np.sin(angle)])
+
+
+class IndustryOverview:
+    """
+    Industry clusters of a company graph, computed once per graph version.
+
+    Use IndustryOverview.from_graph to build it and view() to get the nodes
+    and edges to draw for a set of expanded industries.
+    """
+
+    def __init__(self, G):
+        """
+        :param G: CompactGraph of companies
+        """
+        self._graph = G
+        column, _, table = G.attribute_column("Industry")
+        self.industries = list(table)
+        self._industry = np.array(column, dtype=np.int64)
+        missing = self._industry < 0
+        if missing.any():
+            if UNKNOWN_INDUSTRY not in self.industries:
+                self.industries.append(UNKNOWN_INDUSTRY)
+            self._industry[missing] = self.industries.index(UNKNOWN_INDUSTRY)
+        self._edges = G.edge_array()
+
+        # Members of every industry, most connected first
+        degree = np.bincount(self._edges.ravel(), minlength=len(G))
+        order = np.lexsort((np.arange(len(G)), -degree, self._industry))
+        bounds = np.searchsorted(self._industry[order], np.arange(len(self.industries) + 1))
+        self._members = [order[bounds[i] : bounds[i + 1]] for i in range(len(self.industries))]
+
+        self.positions = self._cluster_positions()
+
+    @classmethod
+    def from_graph(cls, G):
+        """
+        Build the overview of a graph.
+
+        :param G: networkx graph or CompactGraph of companies
+        :return: IndustryOverview
+        """
+        if not isinstance(G, CompactGraph):
+            G = CompactGraph.from_networkx(G)
+        return cls(G)
+
+    def _cluster_weights(self, display):
+        """
+        Aggregate the edges between display nodes.
+
+        :param display: Display node of every company
+        :return: Tuple (pairs, weights) of the edges between distinct display nodes
+        """
+        pairs = display[self._edges]
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        if len(pairs) == 0:
+            return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.unique(pairs, axis=0, return_counts=True)
+
+    def _cluster_positions(self):
+        """Lay out the industry super-nodes with a weighted spring layout."""
+        pairs, weights = self._cluster_weights(self._industry)
+        H = nx.Graph()
+        H.add_nodes_from(range(len(self.industries)))
+        H.add_weighted_edges_from(
+            (int(a), int(b), float(w)) for (a, b), w in zip(pairs, weights)
+        )
+        # Fixed seed so every worker (and the prerender step) draws the same view
+        layout = nx.spring_layout(H, weight="weight", seed=42, scale=CLUSTER_SCALE)
+        return np.array([layout[i] for i in range(len(self.industries))]).reshape(-1, 2)
+
+    def view(self, expanded=(), expand_limit=COMPANY_GRAPH_EXPAND_LIMIT):
+        """
+        Build the nodes and edges to draw.
+
+        :param expanded: Industries shown as their companies
+        :param expand_limit: Maximum number of companies shown per expanded industry,
+            the less connected ones stay in the industry super-node
+        :return: Dictionary with "nodes" (dicts with id, label, industry, count,
+            x and y; count is None for companies) and "edges" (source, target, weight)
+        """
+        expanded = set(expanded)
+        n_clusters = len(self.industries)
+
+        # Display node of every company: its industry unless it is shown itself
+        display = self._industry.copy()
+        nodes = []
+        for i, industry in enumerate(self.industries):
+            members = self._members[i]
+            shown = members[:expand_limit] if industry in expanded else members[:0]
+            hidden = len(members) - len(shown)
+
+            if hidden:
+                label = f"{industry} (+{hidden} more)" if len(shown) else f"{industry} ({hidden})"
+                x, y = self.positions[i]
+                nodes.append(
+                    {
+                        "id": i,
+                        "label": label,
+                        "industry": industry,
+                        "count": hidden,
+                        "x": float(x),
+                        "y": float(y),
+                    }
+                )
+
+            display[shown] = n_clusters + shown
+            for node_id, (x, y) in zip(shown, spiral_positions(self.positions[i], len(shown))):
+                name = self._graph.node_name(node_id)
+                nodes.append(
+                    {
+                        "id": n_clusters + int(node_id),
+                        "label": name,
+                        "industry": industry,
+                        "count": None,
+                        "x": float(x),
+                        "y": float(y),
+                    }
+                )
+
+        pairs, weights = self._cluster_weights(display)
+        edges = [
+            (int(a), int(b), int(w)) for (a, b), w in zip(pairs, weights)
+        ]
+        return {"nodes": nodes, "edges": edges}
@@ -1,11 +1,71 @@
+import hashlib
+import os
 import plotly.graph_objs as go
-import plotly.subplots as sp
 import plotly.express as px
 import pandas as pd
 import numpy as np
 import networkx as nx
 from pyvis.network import Network
 
+from utils.cache import ByteLRUCache
+from utils.compact_graph import CompactGraph
+from utils.datasets import load_vendored_dataset
+from utils.graph_overview import IndustryOverview
+from utils.settings import (
+    PYVIS_CACHE_MAX_BYTES,
+    PYVIS_PRERENDER_DIR,
+)
+
+# Version of the network HTML renderer, bump it whenever the rendered HTML changes
+# (styles, options, labels) so cached and prerendered renderings are not reused
+PYVIS_RENDERER_VERSION = "1"
+
+# Rendered network HTML keyed by
+# (renderer version, graph version, selected company, radius, expanded industries)
+_pyvis_html_cache = ByteLRUCache(PYVIS_CACHE_MAX_BYTES)
+# Industry -> color map keyed by graph version
+_industry_color_maps = {}
+# Industry overview of the "All Companies" view keyed by graph version
+_industry_overviews = {}
+
+# Custom CSS of the network HTML: transparent background and centering
+NETWORK_STYLE = """
+    <style>
+        #mynetwork {
+            background-color: rgba(255, 255, 255, 0); /* Transparent background */
+            margin: auto; /* Center the graph */
+            display: block; /* Make it a block element */
+        }
+    </style>
+    """
+
+
+def placeholder_figure(message):
+    """
+    Create an empty figure showing a message, used while data is not available.
+
+    :param message: Text displayed in the middle of the figure
+    :return: Plotly figure
+    """
+    fig = go.Figure()
+    fig.add_annotation(
+        text=message,
+        showarrow=False,
+        font=dict(size=14),
+        xref="paper",
+        yref="paper",
+        x=0.5,
+        y=0.5,
+    )
+    fig.update_layout(
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        dragmode=False,
+    )
+    return fig
+
 
 def plot_heatmap_monthly_changes(monthly_changes):
     """
@@ -61,117 +121,85 @@ def plot_heatmap_monthly_changes(monthly_changes):
     return fig
 
 
-def create_comparison_figure(ibov_df, index_df, title):
-    # Calculate required metrics for the comparison
-    rolling_corr = ibov_df["close"].rolling(50).corr(index_df["close"])
-    price_ratio = ibov_df["close"] / index_df["close"]
-    rolling_std_ibov = ibov_df["close"].rolling(50).std()
-    rolling_std_index = index_df["close"].rolling(50).std()
-    cumulative_returns_ibov = (1 + ibov_df["close"].pct_change()).cumprod()
-    cumulative_returns_index = (1 + index_df["close"].pct_change()).cumprod()
-
-    # Create a 2x2 subplot figure with a shared axis template
-    fig = sp.make_subplots(
-        rows=2,
-        cols=2,
-        subplot_titles=(
-            "50-Day Rolling Correlation",
-            "Price Ratio",
-            "Volatility",
-            "Cumulative Returns",
-        ),
-        horizontal_spacing=0.1,  # Adjust for even spacing between subplots
-        vertical_spacing=0.2,
-    )
+def relayout_range(relayout_data, axis="xaxis"):
+    """
+    Read the range of an axis from a graph's relayoutData.
 
-    # Plot each metric in the subplots
-    fig.add_trace(
-        go.Scatter(
-            x=ibov_df["date"],
-            y=rolling_corr,
-            name="50-Day Rolling Correlation",
-            mode="lines",
-        ),
-        row=1,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scatter(x=ibov_df["date"], y=price_ratio, name="Price Ratio", mode="lines"),
-        row=1,
-        col=2,
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=ibov_df["date"], y=rolling_std_ibov, name="IBOV Volatility", mode="lines"
-        ),
-        row=2,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=index_df["date"],
-            y=rolling_std_index,
-            name="Index Volatility",
-            mode="lines",
-        ),
-        row=2,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=ibov_df["date"],
-            y=cumulative_returns_ibov,
-            name="IBOV Cumulative Returns",
-            mode="lines",
-        ),
-        row=2,
-        col=2,
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=index_df["date"],
-            y=cumulative_returns_index,
-            name="Index Cumulative Returns",
-            mode="lines",
-        ),
-        row=2,
-        col=2,
-    )
+    :param relayout_data: relayoutData of a dcc.Graph
+    :param axis: Name of the axis (e.g. "xaxis2")
+    :return: (start, end) after a zoom, (None, None) after a reset, or None if
+        the axis did not change
+    """
+    if not relayout_data:
+        return None
+    if relayout_data.get(f"{axis}.autorange"):
+        return None, None
+    if f"{axis}.range[0]" in relayout_data:
+        return relayout_data[f"{axis}.range[0]"], relayout_data[f"{axis}.range[1]"]
+    if f"{axis}.range" in relayout_data:
+        start, end = relayout_data[f"{axis}.range"]
+        return start, end
+    return None
+
+
+def gdp_choropleth_frames(df):
+    """
+    Precompute the data of every yearly frame of the GDP choropleth.
 
-    # Update layout for the figure
-    fig.update_layout(
-        height=800,
-        width=1000,
-        title_text=title,
-        template="plotly_white",  # Use a white template instead of plotly_dark
-        paper_bgcolor="white",  # Set the outer background to white
-        plot_bgcolor="white",  # Set the plotting area background to white
-        font=dict(color="black"),  # Change font color to black
-        xaxis=dict(showgrid=True, gridcolor="lightgrey", zerolinecolor="lightgrey"),
-        yaxis=dict(showgrid=True, gridcolor="lightgrey", zerolinecolor="lightgrey"),
-        legend=dict(bgcolor="white", bordercolor="lightgrey"),
-    )
+    The melted GDP frame is pivoted once so each year becomes a plain list of
+    values in a fixed state order, and the color scale bounds are computed
+    once over all years.
 
-    return fig
+    :param df: Melted state GDP DataFrame from utils.data_loader.load_state_gdp
+    :return: Dictionary with "locations", "years", "z" (one list per year), "zmin" and "zmax"
+    """
+    # Keep the states in the order they appear in the dataset
+    states = df["State"].drop_duplicates()
+    pivot = (
+        df.drop_duplicates(["State", "Year"])
+        .pivot(index="State", columns="Year", values="GDP")
+        .reindex(states)
+    )
+    years = sorted(pivot.columns, key=int)
+
+    return {
+        "locations": states.tolist(),
+        "years": [int(year) for year in years],
+        # None instead of NaN so the lists can be serialized to JSON
+        "z": [
+            pivot[year].astype(object).where(pivot[year].notna(), None).tolist()
+            for year in years
+        ],
+        "zmin": float(df["GDP"].min()),
+        "zmax": float(df["GDP"].max()),
+    }
 
 
 def gdp_per_state(df, year):
-    min_gdp = df["GDP"].min()
-    max_gdp = df["GDP"].max()
-    df = df[df["Year"] == str(year)]
+    return gdp_choropleth_figure(gdp_choropleth_frames(df), year)
 
-    # Check if the filtered DataFrame is empty
-    if df.empty:
+
+def gdp_choropleth_figure(frames, year):
+    """
+    Create the GDP choropleth of a year from precomputed frames.
+
+    :param frames: Dictionary from gdp_choropleth_frames
+    :param year: Year to display
+    :return: Plotly figure, or None if there is no data for the year
+    """
+    # Check if there is data for the year
+    if int(year) not in frames["years"]:
         print(f"No data available for the year {year}.")
         return
+    z = frames["z"][frames["years"].index(int(year))]
 
     # Create the choropleth map using go.Figure
     fig = go.Figure(
         data=go.Choropleth(
-            locations=df["State"],  # Spatial coordinates (state codes)
-            z=df["GDP"],  # Data to be color-coded
-            zmin=min_gdp,  # Minimum value for color scale
-            zmax=max_gdp,  # Maximum value for color scale
+            locations=frames["locations"],  # Spatial coordinates (state codes)
+            z=z,  # Data to be color-coded
+            zmin=frames["zmin"],  # Minimum value for color scale
+            zmax=frames["zmax"],  # Maximum value for color scale
             locationmode="USA-states",  # Set of locations match entries in `locations`
             colorscale="Blues",  # Color scale for GDP
             colorbar_title="GDP in Billions USD",  # Title for the color bar
@@ -211,13 +239,11 @@ def plot_top_growing_companies():
 
     :param df: DataFrame containing company growth data with columns 'Company', 'Growth', 'Longitude', 'Latitude'.
     """
-    df = pd.read_csv(
-        "https://raw.githubusercontent.com/plotly/datasets/master/2014_us_cities.csv"
-    )
-    df.head()
+    df = load_vendored_dataset("us_cities_2014")
 
-    df["text"] = (
-        df["name"] + "<br>Population " + (df["pop"] / 1e6).astype(str) + " million"
+    # The vendored frame is shared, add the hover text to a copy
+    df = df.assign(
+        text=df["name"] + "<br>Population " + (df["pop"] / 1e6).astype(str) + " million"
     )
     limits = [(0, 3), (3, 11), (11, 21), (21, 50), (50, 3000)]
     colors = ["royalblue", "crimson", "lightseagreen", "orange", "lightgrey"]
@@ -275,9 +301,7 @@ def plot_top_growing_companies():
 
 
 def num_tech_companies():
-    df = pd.read_csv(
-        "https://raw.githubusercontent.com/plotly/datasets/master/1962_2006_walmart_store_openings.csv"
-    )
+    df = load_vendored_dataset("walmart_store_openings")
 
     data = []
     layout = dict(
@@ -414,51 +438,213 @@ def num_tech_companies():
     return fig
 
 
-def create_pyvis_network_graph(G, selected_company):
-    # Create a color map for industries globally
-    unique_industries = set(nx.get_node_attributes(G, "Industry").values())
-    color_scale = px.colors.qualitative.Plotly
-    industry_color_map = {
-        industry: color_scale[i % len(color_scale)]
-        for i, industry in enumerate(unique_industries)
-    }
+def graph_version(G):
+    """
+    Return an identifier of the content of a graph, used to key cached renderings.
+
+    Graphs loaded with utils.data_loader.load_company_graph (and every
+    CompactGraph) carry a version; other graphs are hashed from their nodes
+    and edges once.
+
+    :param G: networkx graph or CompactGraph
+    :return: Version string
+    """
+    if "version" not in G.graph:
+        digest = hashlib.sha1()
+        digest.update(repr(list(G.nodes(data=True))).encode("utf-8"))
+        digest.update(repr(list(G.edges())).encode("utf-8"))
+        G.graph["version"] = digest.hexdigest()[:16]
+    return G.graph["version"]
+
+
+def prerendered_graph_path(version, selected_company, radius=1, expanded=(), root=None):
+    """
+    Build the path of the prerendered network HTML of a company.
+
+    The file name carries PYVIS_RENDERER_VERSION, so files written by an
+    older renderer are ignored.
+
+    :param version: Graph version from graph_version
+    :param selected_company: Company name or "All Companies"
+    :param radius: Radius of the ego graph
+    :param expanded: Sorted industries expanded in the "All Companies" view
+    :param root: Directory of the prerendered files (defaults to PYVIS_PRERENDER_DIR)
+    :return: Path of the HTML file
+    """
+    # Company names may contain characters that are not valid in file names
+    name = hashlib.sha1(selected_company.encode("utf-8")).hexdigest()[:16]
+    if radius != 1:
+        name = f"{name}-r{radius}"
+    if selected_company == "All Companies":
+        name = f"{name}-overview"
+    if expanded:
+        name = f"{name}-{hashlib.sha1(chr(31).join(expanded).encode('utf-8')).hexdigest()[:8]}"
+    return os.path.join(
+        root or PYVIS_PRERENDER_DIR, version, f"{name}-v{PYVIS_RENDERER_VERSION}.html"
+    )
+
+
+def _industry_color_map(G):
+    """Return the industry -> color map of a graph, computed once per graph version."""
+    version = graph_version(G)
+    if version not in _industry_color_maps:
+        if isinstance(G, CompactGraph):
+            industries = G.attribute_values("Industry")
+        else:
+            industries = set(nx.get_node_attributes(G, "Industry").values())
+        # Sorted so every worker (and the prerender step) assigns the same colors
+        unique_industries = sorted(industries, key=str)
+        color_scale = px.colors.qualitative.Plotly
+        _industry_color_maps[version] = {
+            industry: color_scale[i % len(color_scale)]
+            for i, industry in enumerate(unique_industries)
+        }
+    return _industry_color_maps[version]
+
+
+def industry_overview(G):
+    """Return the industry overview of a graph, computed once per graph version."""
+    version = graph_version(G)
+    if version not in _industry_overviews:
+        _industry_overviews[version] = IndustryOverview.from_graph(G)
+    return _industry_overviews[version]
+
+
+def create_pyvis_network_graph(G, selected_company, radius=1, expanded=()):
+    """
+    Return the Pyvis network HTML of a company's ego graph (or of the industry overview).
+
+    Renderings are cached in memory per (renderer version, graph version,
+    company, radius, expanded industries), and read from the prerendered files written by
+    scripts/prerender_graphs.py when available, so repeated selections are a
+    dictionary lookup.
+
+    :param G: networkx graph or CompactGraph of companies
+    :param selected_company: Company name, or "All Companies" for the industry overview
+    :param radius: Number of hops around the company
+    :param expanded: Industries shown as their companies in the industry overview
+    :return: HTML string
+    """
+    if selected_company not in G:
+        selected_company = "All Companies"  # Fallback to the overview if selection is invalid
+    if selected_company == "All Companies":
+        radius = 1  # The overview does not depend on the radius
+        expanded = tuple(sorted(expanded or ()))
+    else:
+        expanded = ()  # Only the overview has industries to expand
+
+    version = graph_version(G)
+    key = (PYVIS_RENDERER_VERSION, version, selected_company, radius, expanded)
+    html = _pyvis_html_cache.get(key)
+    if html is not None:
+        return html
+
+    path = prerendered_graph_path(version, selected_company, radius, expanded)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = render_pyvis_network_graph(G, selected_company, radius, expanded)
+
+    _pyvis_html_cache.set(key, html)
+    return html
+
+
+def render_pyvis_network_graph(G, selected_company, radius=1, expanded=()):
+    """
+    Render the Pyvis network HTML of a company's ego graph (or of the industry overview).
+
+    :param G: networkx graph or CompactGraph of companies
+    :param selected_company: Company name, or "All Companies" for the industry overview
+    :param radius: Number of hops around the company
+    :param expanded: Industries shown as their companies in the industry overview
+    :return: HTML string
+    """
+    if selected_company not in G:
+        # "All Companies" (or an invalid selection) shows the industry overview
+        return render_overview_network_graph(G, expanded)
+
+    # Get the color map for industries
+    industry_color_map = _industry_color_map(G)
 
     # Create a Pyvis Network object
     net = Network(height="600px", width="800px", notebook=True)
 
-    # Get the subgraph for the selected company or use the full graph
-    if selected_company == "All Companies":
-        subgraph = G
-    elif selected_company in G:
-        subgraph = nx.ego_graph(G, selected_company, radius=1, undirected=True)
+    # Get the subgraph for the selected company
+    if isinstance(G, CompactGraph):
+        subgraph = G.ego_graph(selected_company, radius=radius)
     else:
-        subgraph = G  # Fallback to full graph if selection is invalid
+        subgraph = nx.ego_graph(G, selected_company, radius=radius, undirected=True)
+
+    # Positions computed when the graph was built (see utils/graph_layout.py)
+    # are drawn as they are, without running physics in the browser
+    positioned = all(
+        "x" in attributes and "y" in attributes
+        for _, attributes in subgraph.nodes(data=True)
+    )
 
     # Add nodes and edges to the Pyvis network
-    for node in subgraph.nodes():
-        industry = G.nodes[node]["Industry"]
+    for node, attributes in subgraph.nodes(data=True):
+        industry = attributes["Industry"]
+        position = (
+            {"x": attributes["x"], "y": attributes["y"], "physics": False}
+            if positioned
+            else {}
+        )
         net.add_node(
             node,
             label=node,
             title=f"Industry: {industry}",
             color=industry_color_map[industry],
+            **position,
         )
 
     for edge in subgraph.edges():
         net.add_edge(edge[0], edge[1])
 
+    if positioned:
+        net.toggle_physics(False)
+
     # Generate the HTML for the Pyvis graph
     html = net.generate_html()
 
-    # Add custom CSS for transparent background and centering
-    custom_style = """
-    <style>
-        #mynetwork {
-            background-color: rgba(255, 255, 255, 0); /* Transparent background */
-            margin: auto; /* Center the graph */
-            display: block; /* Make it a block element */
-        }
-    </style>
+    return NETWORK_STYLE + html
+
+
+def render_overview_network_graph(G, expanded=()):
+    """
+    Render the Pyvis network HTML of the industry overview of a graph.
+
+    Industries are drawn as super-nodes sized by their number of companies,
+    at positions computed on the server, so the browser runs no physics.
+
+    :param G: networkx graph or CompactGraph of companies
+    :param expanded: Industries shown as their companies
+    :return: HTML string
     """
-    
-    return custom_style + html
+    industry_color_map = _industry_color_map(G)
+    view = industry_overview(G).view(expanded)
+
+    net = Network(height="600px", width="800px", notebook=True)
+    for node in view["nodes"]:
+        industry = node["industry"]
+        if node["count"] is None:
+            title, value = f"Industry: {industry}", 1
+        else:
+            title, value = f"{node['count']} companies in {industry}", node["count"]
+        net.add_node(
+            node["id"],
+            label=node["label"],
+            title=title,
+            color=industry_color_map.get(industry, "#999999"),
+            value=value,
+            x=node["x"],
+            y=node["y"],
+            physics=False,
+        )
+
+    for source, target, weight in view["edges"]:
+        net.add_edge(source, target, value=weight, title=f"{weight} acquisitions")
+
+    net.toggle_physics(False)
+    return NETWORK_STYLE + net.generate_html()
@@ -0,0 +1,143 @@
+# notes
+"""
+This file is used for the market overview: the main indices compared to the
+IBOVESPA. The indices are loaded once per refresh interval (see
+utils.data_service) and every derived series is computed in one pass on the
+aligned close matrix. The result is a compact, JSON-serializable payload that
+is shipped to the browser through the indices-data dcc.Store, so viewers only
+receive numbers and never trigger an upstream fetch.
+
+The full-resolution payload stays on the server; the browser receives a view
+downsampled to a bounded number of points per line (market_overview_view) and
+asks for the visible window again when the user zooms (series_window).
+"""
+
+# package imports
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from utils.downsample import downsample
+from utils.rolling import align_closes, rolling_statistics
+from utils.settings import DOWNSAMPLE_MAX_POINTS
+
+# Index every other index is compared to
+BENCHMARK = "^BVSP"
+# Window, in sessions, of the rolling statistics
+ROLLING_WINDOW = 50
+# Significant digits kept in the payload, enough for charts and much shorter JSON
+SIGNIFICANT_DIGITS = 6
+
+
+def _to_list(values):
+    """Convert a float array to a JSON list of rounded values, with None for NaN."""
+    values = np.asarray(values, dtype="float64")
+    return [
+        None if np.isnan(value) else float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+        for value in values.tolist()
+    ]
+
+
+def build_market_overview(indices, benchmark=BENCHMARK, window=ROLLING_WINDOW):
+    """
+    Compute the market overview payload from the daily bars of the indices.
+
+    The closes are aligned on the union of the trading days, a missing close
+    inside an index's history being carried forward (holidays differ between
+    exchanges). Rolling statistics, price ratios and cumulative returns of
+    every index are then computed at once on the whole matrix, see utils.rolling.
+
+    :param indices: Dictionary mapping index symbols to DataFrames indexed by date
+    :param benchmark: Symbol every other index is compared to
+    :param window: Window of the rolling statistics, in sessions
+    :return: Dictionary with "dates", "benchmark" and, for each series name,
+        a dictionary mapping index symbols to values: "close", "volatility",
+        "cumulative_returns" (every index), "rolling_corr" and "price_ratio"
+        (every index but the benchmark)
+    """
+    indices = {symbol: df for symbol, df in indices.items() if not df.empty}
+    close = align_closes(indices)
+
+    def columns(frame, symbols):
+        return {symbol: _to_list(frame[symbol]) for symbol in symbols}
+
+    payload = {
+        "dates": close.index.strftime("%Y-%m-%d").tolist(),
+        "benchmark": benchmark,
+        "close": columns(close, close.columns),
+    }
+    if benchmark not in close.columns:
+        return payload
+
+    statistics = rolling_statistics(close, benchmark, window)
+    others = close.columns.drop(benchmark)
+    payload["volatility"] = columns(statistics["volatility"], close.columns)
+    payload["cumulative_returns"] = columns(statistics["cumulative_returns"], close.columns)
+    payload["rolling_corr"] = columns(statistics["rolling_corr"], others)
+    payload["price_ratio"] = columns(statistics["price_ratio"], others)
+    return payload
+
+
+def overview_traces(payload):
+    """
+    List the lines of the overview graph, in the order drawn by assets/market_overview.js.
+
+    :return: List of (series, symbol, x axis) tuples
+    """
+    return [("close", symbol, "xaxis") for symbol in payload["close"]]
+
+
+def comparison_traces(payload, symbol):
+    """
+    List the lines of the comparison graph of an index, in the order drawn by assets/market_overview.js.
+
+    :return: List of (series, symbol, x axis) tuples
+    """
+    benchmark = payload["benchmark"]
+    return [
+        ("rolling_corr", symbol, "xaxis"),
+        ("price_ratio", symbol, "xaxis2"),
+        ("volatility", benchmark, "xaxis3"),
+        ("volatility", symbol, "xaxis3"),
+        ("cumulative_returns", benchmark, "xaxis4"),
+        ("cumulative_returns", symbol, "xaxis4"),
+    ]
+
+
+def series_window(payload, series, symbol, start=None, end=None, max_points=DOWNSAMPLE_MAX_POINTS):
+    """
+    Return one line of the payload between two dates, downsampled to max_points.
+
+    A window holding fewer points than max_points is returned at full resolution.
+
+    :param payload: Payload from build_market_overview
+    :param series: Name of the series (e.g. "volatility")
+    :param symbol: Index symbol
+    :param start: First date shown (any string starting with YYYY-MM-DD), None from the start
+    :param end: Last date shown, None until the end
+    :param max_points: Maximum number of points of the line
+    :return: Dictionary with the "x" dates and "y" values of the line
+    """
+    dates = payload["dates"]
+    lo = bisect_left(dates, start[:10]) if start else 0
+    hi = bisect_right(dates, end[:10]) if end else len(dates)
+    x, y = downsample(dates[lo:hi], payload[series][symbol][lo:hi], max_points)
+    return {"x": x.tolist(), "y": y.tolist()}
+
+
+def market_overview_view(payload, max_points=DOWNSAMPLE_MAX_POINTS):
+    """
+    Downsample every line of the payload for the indices-data store.
+
+    :param payload: Payload from build_market_overview
+    :param max_points: Maximum number of points per line
+    :return: Dictionary with "benchmark" and, for each series name, a dictionary
+        mapping index symbols to lines ({"x": dates, "y": values})
+    """
+    view = {"benchmark": payload["benchmark"]}
+    for series in ("close", "volatility", "cumulative_returns", "rolling_corr", "price_ratio"):
+        view[series] = {
+            symbol: series_window(payload, series, symbol, max_points=max_points)
+            for symbol in payload.get(series, {})
+        }
+    return view
@@ -0,0 +1,143 @@
+# notes
+"""
+This file is used for the local price store.
+Daily bars are kept as one Parquet file per (provider, ticker) so that workers
+can read history from disk and only ask the provider for the missing tail.
+A small JSON file next to each one records what the provider was asked for
+(see read_cache_meta), so a history starting later than requested, or ending
+before a market holiday, is not downloaded again on every call.
+"""
+
+# package imports
+import json
+import os
+import pandas as pd
+
+from utils.settings import PRICE_CACHE_DIR
+
+
+def _cache_path(ticker, provider, cache_dir=None):
+    """
+    Build the on-disk location of the cached bars for a ticker.
+
+    :param ticker: Stock ticker symbol
+    :param provider: Data provider the bars were fetched from
+    :param cache_dir: Root directory of the store (defaults to PRICE_CACHE_DIR)
+    :return: Path of the Parquet file
+    """
+    cache_dir = cache_dir or PRICE_CACHE_DIR
+    # Tickers such as "BRK/B" must not create sub directories
+    filename = ticker.replace(os.sep, "_") + ".parquet"
+    return os.path.join(cache_dir, provider, filename)
+
+
+def _meta_path(ticker, provider, cache_dir=None):
+    """Build the location of the metadata of the cached bars of a ticker."""
+    return os.path.splitext(_cache_path(ticker, provider, cache_dir))[0] + ".json"
+
+
+def normalize_price_frame(df):
+    """
+    Put a provider frame in the shape stored in the cache.
+
+    :param df: DataFrame indexed by date as returned by the provider
+    :return: Copy of the frame with a sorted, de-duplicated DatetimeIndex named "date"
+    """
+    df = df.copy()
+    df.index = pd.to_datetime(df.index)
+    df.index.name = "date"
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def read_cached_prices(ticker, provider, cache_dir=None):
+    """
+    Read the cached daily bars of a ticker.
+
+    :param ticker: Stock ticker symbol
+    :param provider: Data provider the bars were fetched from
+    :param cache_dir: Root directory of the store (defaults to PRICE_CACHE_DIR)
+    :return: DataFrame indexed by date, or None if nothing is cached
+    """
+    path = _cache_path(ticker, provider, cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        df = pd.read_parquet(path)
+    except Exception as e:
+        # A corrupt file is treated as a cache miss and rewritten on the next fetch
+        print(f"Ignoring unreadable price cache {path}: {e}")
+        return None
+
+    if df.empty:
+        return None
+    return df
+
+
+def read_cache_meta(ticker, provider, cache_dir=None):
+    """
+    Read what the provider was asked for when the bars of a ticker were cached.
+
+    :param ticker: Stock ticker symbol
+    :param provider: Data provider the bars were fetched from
+    :param cache_dir: Root directory of the store (defaults to PRICE_CACHE_DIR)
+    :return: Dictionary with "start" (first date requested from the provider)
+        and "checked" (last closed session the provider was asked about), empty
+        if unknown
+    """
+    path = _meta_path(ticker, provider, cache_dir)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable price cache metadata {path}: {e}")
+        return {}
+
+
+def write_cached_prices(ticker, provider, df, cache_dir=None, meta=None):
+    """
+    Store the daily bars of a ticker, replacing any previous file.
+
+    The file is written next to its final location and renamed into place so
+    that concurrent readers never see a partially written file.
+
+    :param ticker: Stock ticker symbol
+    :param provider: Data provider the bars were fetched from
+    :param df: DataFrame indexed by date
+    :param cache_dir: Root directory of the store (defaults to PRICE_CACHE_DIR)
+    :param meta: Metadata stored with the bars, see read_cache_meta
+    """
+    path = _cache_path(ticker, provider, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+    if meta is not None:
+        meta_path = _meta_path(ticker, provider, cache_dir)
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+
+def merge_price_frames(cached, fresh):
+    """
+    Combine cached bars with newly fetched ones.
+
+    Rows present in both frames are taken from the fresh data, since the last
+    cached bar may have been stored before the session closed.
+
+    :param cached: DataFrame read from the cache
+    :param fresh: DataFrame fetched from the provider
+    :return: Combined DataFrame sorted by date
+    """
+    if fresh is None or fresh.empty:
+        return cached
+    combined = pd.concat([cached, normalize_price_frame(fresh)])
+    combined = combined[~combined.index.duplicated(keep="last")]
+    return combined.sort_index()
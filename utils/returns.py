@@ -0,0 +1,103 @@
+# notes
+"""
+This file is used for computing period returns over many tickers at once.
+All closes are aligned into one wide float64 matrix (date x ticker) and every
+resampling / return step runs on the whole matrix instead of ticker by ticker.
+"""
+
+# package imports
+import numpy as np
+import pandas as pd
+
+# Resampling rule used for each supported period
+PERIOD_RULES = {
+    "weekly": "W-FRI",
+    "monthly": "ME",
+    "quarterly": "QE",
+}
+
+
+def build_close_matrix(stock_data, column="close"):
+    """
+    Align the closes of several tickers into one wide matrix.
+
+    :param stock_data: Dictionary mapping ticker symbols to DataFrames indexed by date
+    :param column: Price column to use
+    :return: float64 DataFrame indexed by date with one column per ticker
+    """
+    if not stock_data:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="date"), dtype="float64")
+
+    matrix = pd.concat(
+        {ticker: df[column] for ticker, df in stock_data.items()}, axis=1
+    )
+    matrix.index = pd.to_datetime(matrix.index)
+    matrix.index.name = "date"
+    return matrix.astype("float64").sort_index()
+
+
+def resample_returns(close_matrix, rule="ME"):
+    """
+    Calculate period returns in percent for every column of a close matrix.
+
+    Periods without a close inside a ticker's own history are carried forward
+    (matching pandas' default pct_change padding); periods before its first
+    or after its last close stay empty.
+
+    :param close_matrix: Wide close matrix from build_close_matrix
+    :param rule: Pandas resampling rule (e.g. "ME" for month end)
+    :return: DataFrame of percentage returns indexed by period end
+    """
+    period_close = close_matrix.resample(rule).last()
+    period_close = period_close.ffill(limit_area="inside")
+    return period_close.pct_change(fill_method=None) * 100
+
+
+def ytd_returns(close_matrix):
+    """
+    Calculate year-to-date returns in percent for every column of a close matrix.
+
+    :param close_matrix: Wide close matrix from build_close_matrix
+    :return: Series of percentage returns indexed by ticker (NaN without a prior
+        year-end close, or without a close in the current year)
+    """
+    if close_matrix.empty:
+        return pd.Series(dtype="float64")
+
+    values = close_matrix.to_numpy()
+    years = close_matrix.index.year.to_numpy()
+    current_year = years[-1]
+
+    # Last close of each column, and last close before the current year started.
+    # A ticker that stopped trading before this year has no YTD return
+    last_close = close_matrix.ffill().to_numpy()[-1]
+    traded_this_year = ~np.isnan(values[years == current_year]).all(axis=0)
+    last_close = np.where(traded_this_year, last_close, np.nan)
+    previous = values[years < current_year]
+    if len(previous) == 0:
+        base_close = np.full(values.shape[1], np.nan)
+    else:
+        base_close = pd.DataFrame(previous).ffill().to_numpy()[-1]
+
+    return pd.Series(
+        (last_close / base_close - 1) * 100, index=close_matrix.columns, name="ytd"
+    )
+
+
+def period_returns(close_matrix, periods=("weekly", "monthly", "quarterly", "ytd")):
+    """
+    Calculate several kinds of period returns from the same close matrix.
+
+    :param close_matrix: Wide close matrix from build_close_matrix
+    :param periods: Names of the periods to compute (keys of PERIOD_RULES or "ytd")
+    :return: Dictionary mapping each period name to its returns
+    """
+    results = {}
+    for period in periods:
+        if period == "ytd":
+            results[period] = ytd_returns(close_matrix)
+        elif period in PERIOD_RULES:
+            results[period] = resample_returns(close_matrix, PERIOD_RULES[period])
+        else:
+            raise ValueError(f"Unknown period: {period}")
+    return results
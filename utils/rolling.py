@@ -0,0 +1,169 @@
+# notes
+"""
+This file is used for rolling statistics over many price series at once.
+Series are first aligned on explicit dates into one (date x series) matrix;
+every statistic is then computed with sliding-window sums built from
+cumulative sums, so a window costs O(T) whatever its length, and all series
+(or all pairs of series) are handled by the same NumPy operations.
+
+Like pandas' rolling(window) defaults, a window containing a missing value
+gives NaN.
+"""
+
+# package imports
+import numpy as np
+import pandas as pd
+
+
+def align_closes(frames, column="close", fill="inside"):
+    """
+    Align the closes of several frames on the union of their dates.
+
+    :param frames: Dictionary mapping series names to DataFrames indexed by date
+        (or with a "date" column)
+    :param column: Price column to use
+    :param fill: "inside" carries a close forward over the days a series did not
+        trade inside its own history (e.g. exchange holidays), None keeps the gaps
+    :return: float64 DataFrame indexed by date with one column per series
+    """
+    closes = {}
+    for name, df in frames.items():
+        if "date" in df.columns:
+            df = df.set_index("date")
+        closes[name] = df[column]
+
+    if not closes:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="date"), dtype="float64")
+
+    matrix = pd.concat(closes, axis=1)
+    matrix.index = pd.to_datetime(matrix.index)
+    matrix.index.name = "date"
+    matrix = matrix[~matrix.index.duplicated(keep="last")].sort_index().astype("float64")
+    if fill == "inside":
+        matrix = matrix.ffill(limit_area="inside")
+    return matrix
+
+
+def rolling_sum(values, window):
+    """
+    Sum every trailing window of a (T,) or (T, ...) array along its first axis.
+
+    :param values: Array of floats, NaN marking missing values
+    :param window: Window length
+    :return: Array of the same shape, NaN for the first window - 1 rows and for
+        windows containing a missing value
+    """
+    values = np.asarray(values, dtype="float64")
+    missing = np.isnan(values)
+
+    # Prepend a zero row so that window sums are differences of cumulative sums
+    zeros = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([zeros, np.cumsum(np.where(missing, 0.0, values), axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(missing, axis=0)])
+
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        window_sums = sums[window:] - sums[:-window]
+        window_missing = counts[window:] - counts[:-window]
+        result[window - 1 :] = np.where(window_missing > 0, np.nan, window_sums)
+    return result
+
+
+def _centered(values):
+    # Rolling moments do not change when a constant is subtracted; centering
+    # each column keeps the cumulative sums small and the differences accurate
+    values = np.asarray(values, dtype="float64")
+    valid = ~np.isnan(values)
+    sums = np.where(valid, values, 0.0).sum(axis=0)
+    counts = valid.sum(axis=0)
+    offsets = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+    return values - offsets
+
+
+def rolling_std(values, window, ddof=1):
+    """
+    Rolling standard deviation of every column of a (T, N) array.
+
+    :param values: Array of floats
+    :param window: Window length
+    :param ddof: Delta degrees of freedom (1, like pandas)
+    :return: (T, N) array
+    """
+    x = _centered(values)
+    mean = rolling_sum(x, window) / window
+    sum_squares = rolling_sum(x * x, window)
+    variance = (sum_squares - window * mean * mean) / (window - ddof)
+    return np.sqrt(np.clip(variance, 0.0, None))
+
+
+def rolling_corr(values, window, benchmark=None):
+    """
+    Rolling Pearson correlations of the columns of a (T, N) array.
+
+    :param values: Array of floats
+    :param window: Window length
+    :param benchmark: Column index every column is correlated with; None
+        correlates every pair of columns
+    :return: (T, N) array against the benchmark, or (T, N, N) array of every pair
+    """
+    x = _centered(values)
+    if benchmark is None:
+        a, b = x[:, :, None], x[:, None, :]
+    else:
+        a, b = x, x[:, [benchmark]]
+
+    sum_a, sum_b = rolling_sum(a, window), rolling_sum(b, window)
+    # A missing value in either series invalidates the window of the pair
+    pair_missing = np.isnan(a) | np.isnan(b)
+    sum_ab = rolling_sum(np.where(pair_missing, np.nan, a * b), window)
+    sum_aa, sum_bb = rolling_sum(a * a, window), rolling_sum(b * b, window)
+
+    covariance = sum_ab - sum_a * sum_b / window
+    variance_a = sum_aa - sum_a * sum_a / window
+    variance_b = sum_bb - sum_b * sum_b / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = covariance / np.sqrt(variance_a * variance_b)
+    # A constant window has no correlation, and rounding may push values past +-1
+    corr[~(variance_a * variance_b > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def cumulative_returns(values):
+    """
+    Growth of one unit invested at the first close of every column of a (T, N) array.
+
+    :param values: Array of closes
+    :return: (T, N) array, 1 at each column's first close
+    """
+    values = np.asarray(values, dtype="float64")
+    first_valid = np.argmax(~np.isnan(values), axis=0)
+    first = values[first_valid, np.arange(values.shape[1])]
+    return values / first
+
+
+def rolling_statistics(close, benchmark, window=50):
+    """
+    Compute the comparison statistics of every series against a benchmark in one pass.
+
+    :param close: Aligned close matrix from align_closes
+    :param benchmark: Name of the benchmark column
+    :param window: Window of the rolling statistics, in sessions
+    :return: Dictionary of DataFrames shaped like close: "volatility",
+        "cumulative_returns", "rolling_corr" (with the benchmark) and
+        "price_ratio" (benchmark close divided by each close)
+    """
+    values = close.to_numpy(dtype="float64")
+    b = close.columns.get_loc(benchmark)
+
+    def frame(array):
+        return pd.DataFrame(array, index=close.index, columns=close.columns)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_ratio = values[:, [b]] / values
+
+    return {
+        "volatility": frame(rolling_std(values, window)),
+        "cumulative_returns": frame(cumulative_returns(values)),
+        "rolling_corr": frame(rolling_corr(values, window, benchmark=b)),
+        "price_ratio": frame(price_ratio),
+    }
@@ -0,0 +1,110 @@
+# notes
+"""
+This file is used for searching the companies of the M&A graph by name or ticker.
+The company dropdown only ships a handful of options with the page; the
+options matching what the user types are looked up here, on the server, by
+binary search over sorted lowercase keys, so neither the page weight nor a
+search grows with the number of companies.
+"""
+
+# package imports
+import bisect
+
+import networkx as nx
+
+from utils.compact_graph import CompactGraph
+from utils.settings import COMPANY_SEARCH_LIMIT
+
+
+class PrefixIndex:
+    """
+    Sorted lowercase keys, each pointing to a value, searched by prefix.
+    """
+
+    def __init__(self, entries):
+        """
+        :param entries: Iterable of (key, value) pairs; a value may have several keys
+        """
+        entries = sorted((key.lower(), value) for key, value in entries)
+        self._keys = [key for key, _ in entries]
+        self._values = [value for _, value in entries]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def iter_prefix(self, prefix):
+        """
+        Yield the values whose key starts with a prefix, in key order.
+
+        :param prefix: Prefix, matched case-insensitively
+        """
+        prefix = prefix.lower()
+        i = bisect.bisect_left(self._keys, prefix)
+        while i < len(self._keys) and self._keys[i].startswith(prefix):
+            yield self._values[i]
+            i += 1
+
+
+class CompanySearchIndex:
+    """
+    Search over the names and tickers of the companies of a graph.
+
+    Matches on the start of a name or on a ticker come first, then matches on
+    the start of any other word of a name ("sys" finds "Cisco Systems").
+    """
+
+    def __init__(self, names, tickers):
+        """
+        :param names: Company names
+        :param tickers: Dictionary mapping company names to tickers
+        """
+        self.labels = {
+            name: f"{name} ({tickers[name]})" if name in tickers else name
+            for name in names
+        }
+        self._primary = PrefixIndex(
+            [(name, name) for name in names]
+            + [(ticker, name) for name, ticker in tickers.items()]
+        )
+        self._words = PrefixIndex(
+            (word, name) for name in names for word in name.split()[1:]
+        )
+
+    @classmethod
+    def from_graph(cls, G):
+        """
+        Build the index of the companies of a graph.
+
+        :param G: networkx graph or CompactGraph of companies
+        :return: CompanySearchIndex
+        """
+        if isinstance(G, CompactGraph):
+            tickers = G.get_node_attributes("Ticker")
+        else:
+            tickers = nx.get_node_attributes(G, "Ticker")
+        tickers = {str(name): str(ticker) for name, ticker in tickers.items()}
+        return cls([str(node) for node in G.nodes()], tickers)
+
+    def option(self, name):
+        """Return the dropdown option of a company."""
+        return {"label": self.labels.get(name, name), "value": name}
+
+    def search(self, query, limit=COMPANY_SEARCH_LIMIT):
+        """
+        Return the companies matching a query, best matches first.
+
+        :param query: Text typed by the user
+        :param limit: Maximum number of companies returned
+        :return: List of company names
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        found = {}  # Ordered set of the matches
+        for index in (self._primary, self._words):
+            for name in index.iter_prefix(query):
+                found[name] = None
+                if len(found) >= limit:
+                    return list(found)
+        return list(found)
@@ -7,8 +7,91 @@ dotenv_path = os.path.join(cwd, os.getenv("ENVIRONMENT_FILE", ".env.development"
 load_dotenv(dotenv_path=dotenv_path, override=True)
 
 APP_HOST = os.environ.get("HOST")
-APP_PORT = int(os.environ.get("PORT"))
+APP_PORT = int(os.environ.get("PORT", 8089))
 APP_DEBUG = bool(os.environ.get("DEBUG"))
 DEV_TOOLS_PROPS_CHECK = bool(os.environ.get("DEV_TOOLS_PROPS_CHECK"))
 FMP_API_KEY = os.environ.get("FMP_API_KEY", None)
 OPENBB_TOKEN = os.environ.get("OPENBB_TOKEN", None)
+
+# Local price store used by utils.data_loader.load_stock_data
+PRICE_CACHE_DIR = os.environ.get(
+    "PRICE_CACHE_DIR", os.path.join(cwd, "cache", "prices")
+)
+PRICE_CACHE_ENABLED = os.environ.get("PRICE_CACHE_ENABLED", "1") != "0"
+
+# Concurrent price fetching used by utils.data_loader.load_many_stock_data
+PRICE_FETCH_MAX_WORKERS = int(os.environ.get("PRICE_FETCH_MAX_WORKERS", 8))
+PRICE_FETCH_MAX_RETRIES = int(os.environ.get("PRICE_FETCH_MAX_RETRIES", 3))
+PRICE_FETCH_BACKOFF = float(os.environ.get("PRICE_FETCH_BACKOFF", 0.5))
+
+# Seconds a page waits for network-backed data before rendering placeholders
+HOME_DATA_TIMEOUT = float(os.environ.get("HOME_DATA_TIMEOUT", 2))
+
+# Seconds after a failed dataset load before it is tried again (utils.data_service)
+DATA_RETRY_DELAY = float(os.environ.get("DATA_RETRY_DELAY", 60))
+# Network-backed datasets every worker starts loading right after the fork; the
+# others (e.g. the market overview) are loaded on the first page that needs them
+WARM_UP_DATASETS = [
+    name
+    for name in os.environ.get(
+        "WARM_UP_DATASETS", "monthly_changes_heatmap,top_companies,company_profiles"
+    ).split(",")
+    if name
+]
+
+# "clientside" cycles the GDP map in the browser, "server" patches it from a callback
+GDP_ANIMATION_MODE = os.environ.get("GDP_ANIMATION_MODE", "clientside")
+
+# Rendered company network HTML (utils.graphs.create_pyvis_network_graph)
+PYVIS_CACHE_MAX_BYTES = int(os.environ.get("PYVIS_CACHE_MAX_BYTES", 64 * 1024**2))
+PYVIS_PRERENDER_DIR = os.environ.get(
+    "PYVIS_PRERENDER_DIR", os.path.join(cwd, "graph_objs", "html")
+)
+
+# Company graph built by scripts/preprocessing.py
+COMPANY_GRAPH_PICKLE = os.environ.get(
+    "COMPANY_GRAPH_PICKLE", os.path.join(cwd, "graph_objs", "company_graph.pkl")
+)
+COMPANY_GRAPH_DIR = os.environ.get(
+    "COMPANY_GRAPH_DIR", os.path.join(cwd, "graph_objs", "company_graph")
+)
+# Ego graph radii offered by the company network view; the neighborhood index
+# built when the graph is loaded covers up to the largest one
+COMPANY_GRAPH_RADII = [
+    int(radius) for radius in os.environ.get("COMPANY_GRAPH_RADII", "1,2").split(",")
+]
+# Maximum number of companies drawn per expanded industry in the "All Companies"
+# view (utils.graph_overview), the others stay aggregated
+COMPANY_GRAPH_EXPAND_LIMIT = int(os.environ.get("COMPANY_GRAPH_EXPAND_LIMIT", 200))
+# Maximum number of companies returned by a search of the company dropdown (utils.search)
+COMPANY_SEARCH_LIMIT = int(os.environ.get("COMPANY_SEARCH_LIMIT", 20))
+
+# Financial Modeling Prep client (utils.fmp)
+FMP_BASE_URL = os.environ.get("FMP_BASE_URL", "https://financialmodelingprep.com/api/v3")
+FMP_TIMEOUT = float(os.environ.get("FMP_TIMEOUT", 10))
+FMP_POOL_SIZE = int(os.environ.get("FMP_POOL_SIZE", 10))
+FMP_PROFILE_TTL = float(os.environ.get("FMP_PROFILE_TTL", 24 * 3600))
+FMP_CONSTITUENTS_TTL = float(os.environ.get("FMP_CONSTITUENTS_TTL", 3600))
+
+# Background prefetch of the profiles shown on the company analysis page
+FMP_PREFETCH_PROFILES = os.environ.get("FMP_PREFETCH_PROFILES", "1") != "0"
+FMP_PROFILE_REFRESH_INTERVAL = float(os.environ.get("FMP_PROFILE_REFRESH_INTERVAL", 6 * 3600))
+FMP_PROFILE_CHUNK_SIZE = int(os.environ.get("FMP_PROFILE_CHUNK_SIZE", 50))
+# Snapshot of the prefetched profiles shared by the gunicorn workers
+FMP_PROFILE_SNAPSHOT = os.environ.get(
+    "FMP_PROFILE_SNAPSHOT", os.path.join(cwd, "cache", "fmp_profiles.json")
+)
+
+# OpenBB login cache (utils.apis.verify_api_credentials)
+OPENBB_SESSION_TTL = float(os.environ.get("OPENBB_SESSION_TTL", 3600))
+OPENBB_FAILURE_TTL = float(os.environ.get("OPENBB_FAILURE_TTL", 30))
+OPENBB_REFRESH_MARGIN = float(os.environ.get("OPENBB_REFRESH_MARGIN", 300))
+
+# Seconds between two refreshes of the market overview indices (pages/market_analysis.py)
+MARKET_OVERVIEW_REFRESH_INTERVAL = float(os.environ.get("MARKET_OVERVIEW_REFRESH_INTERVAL", 3600))
+
+# Maximum number of points per line sent to the browser (utils.downsample)
+DOWNSAMPLE_MAX_POINTS = int(os.environ.get("DOWNSAMPLE_MAX_POINTS", 500))
+
+# Folder of the local datasets (utils.datasets)
+DATASETS_DIR = os.environ.get("DATASETS_DIR", os.path.join(cwd, "datasets"))
@@ -0,0 +1,76 @@
+# notes
+"""
+This file is used for throttling calls to upstream APIs.
+It holds a thread-safe rate limiter and a retry helper with exponential backoff
+shared by the loaders that fan requests out over a thread pool.
+"""
+
+# package imports
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls at least 1 / rate seconds apart.
+
+    :param rate: Maximum number of calls per second, None disables the limit
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        """Block until the caller is allowed to make its call."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key, rate):
+    """
+    Return the process-wide limiter for a key, creating it on first use.
+
+    :param key: Name of the upstream (e.g. the data provider)
+    :param rate: Maximum number of calls per second for that upstream
+    :return: RateLimiter shared by every caller using the same key
+    """
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(rate)
+        return _limiters[key]
+
+
+def call_with_retry(func, *args, retries=3, backoff=0.5, limiter=None, **kwargs):
+    """
+    Call a function, retrying with exponential backoff and jitter on failure.
+
+    :param func: Callable to invoke
+    :param retries: Number of retries after the first attempt
+    :param backoff: Delay in seconds before the first retry, doubled on each retry
+    :param limiter: Optional RateLimiter acquired before every attempt
+    :return: Whatever func returns
+    :raises: The last exception raised by func once the retries are exhausted
+    """
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            if attempt == retries:
+                raise
+            delay = backoff * (2**attempt)
+            time.sleep(delay + random.uniform(0, delay / 2))